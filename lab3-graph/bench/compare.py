@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import random
+import logging
+import argparse
+import statistics
+
+log = logging.getLogger(__name__)
+
+import suite
+
+#
+# Exit codes: 0 if no operation regressed, 1 if some did, and 2 if the
+# results could not be compared.
+#
+EXIT_REGRESSION = 1
+EXIT_INVALID = 2
+
+MIN_SAMPLES = 3 # fewer samples give no verdict
+
+def load(path):
+    '''
+    Returns the results in a JSON file written by bench/suite.py, keyed by
+    (graph, n, op).
+    '''
+    with open(path) as f:
+        data = json.load(f)
+    return { (r["graph"], r["n"], r["op"]): r["samples"] for r in data["results"] }
+
+def common(base, cand):
+    '''
+    Returns the sorted keys that both `base` and `cand` have, and a sorted
+    list of those keys that cannot be compared since some sample is not
+    positive or there are none, e.g., from a coarse clock or a hand-edited
+    file.
+    '''
+    keys, skipped = [], []
+    for key in sorted(set(base) & set(cand)):
+        if all([ samples and min(samples) > 0 for samples in [base[key], cand[key]] ]):
+            keys.append(key)
+        else:
+            skipped.append(key)
+    return keys, skipped
+
+def bootstrap(base, cand, confidence, rounds, seed):
+    '''
+    Returns a `confidence` interval (low, high) for the ratio of the median of
+    `cand` to the median of `base`, by resampling both `rounds` times.
+    '''
+    rand = random.Random(seed)
+    ratios = sorted([
+        statistics.median(rand.choices(cand, k=len(cand))) /
+        statistics.median(rand.choices(base, k=len(base)))
+        for _ in range(rounds) ])
+    tail = (1 - confidence) / 2
+    return ratios[int(tail*(rounds-1))], ratios[int((1-tail)*(rounds-1))]
+
+def drift(base, cand, keys=None):
+    '''
+    Returns the median over all operations that both `base` and `cand` have of
+    the ratio of their median times, i.e., how much slower the candidate
+    machine or run was overall.  The operations are `keys` from common(), or
+    computed if None.
+    '''
+    if keys is None:
+        keys = common(base, cand)[0]
+    if not keys:
+        return 1.0
+    return statistics.median([ statistics.median(cand[k]) / statistics.median(base[k])
+                               for k in keys ])
+
+def compare(base, cand, thresholds, confidence=0.95, rounds=2000, seed=1337, scale=1.0,
+            keys=None):
+    '''
+    Compares the samples of every operation that both `base` and `cand` have,
+    except for those that common() skips, after dividing the candidate times
+    by `scale`, e.g., the drift().  The operations are `keys` from common(),
+    or computed if None.  An operation regressed if its median time grew by
+    more than its threshold, e.g., 0.25 for 25%, and the confidence interval
+    of the ratio of medians lies above 1, i.e., the slowdown is unlikely to be
+    noise.
+
+    Returns a list of dicts with keys graph, n, op, base, cand (medians),
+    ratio, low, high and verdict, which is one of "regression",
+    "improvement", "unchanged" and "too few" (samples).
+    '''
+    if keys is None:
+        keys = common(base, cand)[0]
+    rows = []
+    for key in keys:
+        graph, n, op = key
+        b, c = base[key], [ t/scale for t in cand[key] ]
+        row = { "graph": graph, "n": n, "op": op,
+                "base": statistics.median(b), "cand": statistics.median(c) }
+        row["ratio"] = row["cand"] / row["base"]
+        if min(len(b), len(c)) < MIN_SAMPLES:
+            row.update(low=None, high=None, verdict="too few")
+            rows.append(row)
+            continue
+
+        low, high = bootstrap(b, c, confidence, rounds, seed)
+        threshold = thresholds.get(op, thresholds[None])
+        if row["ratio"] > 1 + threshold and low > 1:
+            verdict = "regression"
+        elif row["ratio"] < 1 / (1 + threshold) and high < 1:
+            verdict = "improvement"
+        else:
+            verdict = "unchanged"
+        row.update(low=low, high=high, verdict=verdict)
+        rows.append(row)
+    return rows
+
+def report(rows, everything=False):
+    '''
+    Returns a table of the compared operations, only including regressions
+    and improvements unless `everything` is True.
+    '''
+    lines = [ "{: <11} {: >7} {: <16} {: >10} {: >10} {: >7} {: >15}  {}".format(
+        "graph", "n", "op", "base", "candidate", "ratio", "interval", "verdict") ]
+    for r in rows:
+        if not everything and r["verdict"] in ["unchanged", "too few"]:
+            continue
+        interval = "-"
+        if r["low"] is not None:
+            interval = "[{:.2f}, {:.2f}]".format(r["low"], r["high"])
+        lines.append("{: <11} {: >7} {: <16} {: >10} {: >10} {: >7.2f} {: >15}  {}".format(
+            r["graph"], r["n"], r["op"], suite.format_time(r["base"]),
+            suite.format_time(r["cand"]), r["ratio"], interval, r["verdict"]))
+    return "\n".join(lines)
+
+def get_thresholds(args):
+    '''
+    Returns thresholds by op, where None maps to the default, or None and an
+    error message if an --op-threshold is invalid.
+    '''
+    thresholds = { None: args.threshold }
+    for spec in args.op_threshold:
+        op, _, value = spec.partition("=")
+        try:
+            thresholds[op] = float(value)
+        except ValueError:
+            return None, "invalid --op-threshold: {}".format(spec)
+        if op not in suite.OPS:
+            return None, "invalid op in --op-threshold: {}".format(op)
+    return thresholds, None
+
+def main(args):
+    logging.basicConfig(format="[%(levelname)s] %(message)s",
+                        level=logging.INFO if args.verbose else logging.WARNING)
+    thresholds, err = get_thresholds(args)
+    if err is not None:
+        log.critical(err)
+        return EXIT_INVALID
+    if (args.candidate is None) == (not args.quick):
+        log.critical("give either a candidate file or --quick")
+        return EXIT_INVALID
+
+    try:
+        base = load(args.baseline)
+        if not args.quick:
+            cand = load(args.candidate)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.critical("failed to load results: {}".format(e))
+        return EXIT_INVALID
+    if args.quick:
+        results = suite.run_quick(args.seed)
+        cand = { (r["graph"], r["n"], r["op"]): r["samples"] for r in results }
+        if args.output is not None:
+            try:
+                suite.save(args.output, suite.metadata(args.label, args.seed,
+                           suite.QUICK["repeat"]), results)
+            except OSError as e:
+                log.critical("failed to write results: {}".format(e))
+                return EXIT_INVALID
+
+    keys, skipped = common(base, cand)
+    for key in skipped:
+        log.warning("skipping {}: samples must be positive".format(key))
+    scale = drift(base, cand, keys)
+    rows = compare(base, cand, thresholds, args.confidence, seed=args.seed,
+                   scale=scale if args.normalize else 1.0, keys=keys)
+    if not rows:
+        log.critical("the results have no operations in common")
+        return EXIT_INVALID
+    for key in sorted(set(base) ^ set(cand)):
+        log.warning("only in {}: {}".format("baseline" if key in base else "candidate", key))
+
+    print(report(rows, args.all))
+    print("\noverall ratio of medians: {:.2f}{}".format(
+        scale, " (divided out)" if args.normalize else ""))
+    regressions = [ r for r in rows if r["verdict"] == "regression" ]
+    print("{} compared, {} regressed, {} improved, {} with too few samples".format(
+        len(rows), len(regressions),
+        len([ r for r in rows if r["verdict"] == "improvement" ]),
+        len([ r for r in rows if r["verdict"] == "too few" ])))
+    return EXIT_REGRESSION if regressions else 0
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser("Performance regression gate for bench/suite.py results")
+    parser.add_argument("baseline", type=str,
+        help="JSON results of the baseline, e.g., from suite.py --quick --output.",
+    )
+    parser.add_argument("candidate", type=str, nargs="?", default=None,
+        help="JSON results of the candidate.",
+    )
+    parser.add_argument("--quick", "-q", action="store_true",
+        help="Run the quick suite now and use it as the candidate.",
+    )
+    parser.add_argument("--output", "-o", type=str, default=None, metavar="FILE",
+        help="Write the results of --quick as JSON, e.g., as the next baseline.",
+    )
+    parser.add_argument("--label", type=str, default="",
+        help="Label stored with the results of --quick, e.g., a git revision.",
+    )
+    parser.add_argument("--threshold", "-t", type=float, default=0.25,
+        help="Slowdown of the median that counts as a regression, e.g., 0.25 "
+        "for 25%%.  Default: 0.25.",
+    )
+    parser.add_argument("--op-threshold", type=str, action="append", default=[],
+        metavar="OP=T",
+        help="Threshold for one operation, e.g., floyd=0.1.  Repeatable.",
+    )
+    parser.add_argument("--normalize", "-n", action="store_true",
+        help="Divide the candidate times by the overall ratio of medians, "
+        "e.g., when the runs are from different or busy machines.  This "
+        "hides slowdowns that hit all operations alike.",
+    )
+    parser.add_argument("--confidence", "-c", type=float, default=0.95,
+        help="Confidence level of the bootstrap interval.  Default: 0.95.",
+    )
+    parser.add_argument("--all", "-a", action="store_true",
+        help="List all compared operations, not only changed ones.",
+    )
+    parser.add_argument("--seed", "-s", type=int, default=1337,
+        help="Random seed for --quick and the bootstrap.",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true",
+        help="Log the progress of --quick.",
+    )
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+log = logging.getLogger(__name__)
+
+from adjlist import AdjacencyList
+from algorithm import dijkstra
+from sharedgraph import SharedGraph
+import generators
+
+def reader(shared, nodes, strategy, stop, counts, seed):
+    '''
+    Issues a mix of find_node, find_edge, list_edges and dijkstra reads until
+    `stop` is set, and appends the number of completed reads to `counts`.
+    '''
+    rand, done = random.Random(seed), 0
+    while not stop.is_set():
+        a, b, op = rand.choice(nodes), rand.choice(nodes), rand.random()
+        if strategy == "lock":
+            if op < 0.45:
+                shared.find_node(a)
+            elif op < 0.9:
+                shared.find_edge(a, b)
+            elif op < 0.98:
+                shared.list_edges()
+            else:
+                shared.read(dijkstra, a)
+        else:
+            view = shared.snapshot()
+            if op < 0.45:
+                view.find_node(a)
+            elif op < 0.9:
+                view.find_edge(a, b)
+            elif op < 0.98:
+                view.list_edges()
+            else:
+                dijkstra(view, a)
+        done += 1
+    counts.append(done)
+
+def writer(shared, nodes, rate, stop, counts, seed):
+    '''
+    Adds or deletes a random edge `rate` times per second until `stop` is set.
+    '''
+    rand, done = random.Random(seed), 0
+    start = time.perf_counter()
+    while not stop.is_set():
+        a, b = rand.choice(nodes), rand.choice(nodes)
+        if rand.random() < 0.5:
+            shared.add_edge(a, b, rand.randint(1, 99))
+        else:
+            shared.delete_edge(a, b)
+        done += 1
+        delay = start + done/rate - time.perf_counter()
+        if delay > 0:
+            stop.wait(delay)
+    counts.append(done)
+
+def run(n, degree, threads, rate, strategy, duration, seed):
+    nodes, edges = generators.erdos_renyi(n, int(n*degree), seed)
+    l = AdjacencyList().extend(nodes, edges)
+    shared = SharedGraph(l)
+    stop, reads, writes = threading.Event(), [], []
+    workers = [ threading.Thread(target=reader,
+                args=(shared, nodes, strategy, stop, reads, seed+i))
+                for i in range(threads) ]
+    if rate > 0:
+        workers.append(threading.Thread(target=writer,
+            args=(shared, nodes, rate, stop, writes, seed)))
+
+    for t in workers:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in workers:
+        t.join()
+
+    return {
+        "strategy": strategy,
+        "threads": threads,
+        "rate": rate,
+        "reads_per_s": sum(reads)/duration,
+        "writes_per_s": sum(writes)/duration,
+    }
+
+def main(args):
+    logging.basicConfig(format="[%(levelname)s] %(message)s", level=logging.INFO)
+    print("{: >8} {: >7} {: >8} | {: >10} {: >9}".format(
+        "strategy", "threads", "writes/s", "reads/s", "writes/s"))
+    for strategy in args.strategies:
+        for rate in args.rates:
+            for threads in args.threads:
+                r = run(args.nodes, args.degree, threads, rate, strategy,
+                        args.duration, args.seed)
+                print("{: >8} {: >7} {: >8} | {: >10.0f} {: >9.0f}".format(
+                    r["strategy"], r["threads"], r["rate"],
+                    r["reads_per_s"], r["writes_per_s"]))
+    return 0
+
+def get_args():
+    parser = argparse.ArgumentParser("Read throughput of a shared graph under writes")
+    parser.add_argument("--nodes", "-n", type=int, default=200,
+        help="Number of nodes in the random graph.",
+    )
+    parser.add_argument("--degree", "-d", type=float, default=2,
+        help="Average out-degree of the random graph.",
+    )
+    parser.add_argument("--threads", "-t", type=int, nargs="+", default=[1, 2, 4, 8],
+        help="Numbers of reader threads to benchmark.",
+    )
+    parser.add_argument("--rates", "-r", type=float, nargs="+", default=[0, 100, 1000],
+        help="Writer frequencies in writes per second, 0 for no writer.",
+    )
+    parser.add_argument("--strategies", nargs="+", default=["lock", "snapshot"],
+        choices=["lock", "snapshot"],
+        help="Read under the reader/writer lock, or from snapshots.",
+    )
+    parser.add_argument("--duration", type=float, default=1.0,
+        help="Seconds per configuration.",
+    )
+    parser.add_argument("--seed", "-s", type=int, default=1337,
+        help="Random seed.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import sys
+import math
+import random
+import logging
+
+log = logging.getLogger(__name__)
+
+#
+# Seeded generators of synthetic graphs.  Each returns (nodes, edges), where
+# nodes are named n000000, n000001, ..., so that name order is numeric order,
+# and edges are (src, dst, weight) with integer weights in [1,99].  Build an
+# adjacency list with AdjacencyList().extend(nodes, edges), or use build().
+#
+# The same arguments always give the same graph.
+#
+
+def names(n):
+    '''
+    Returns the names of `n` nodes.
+    '''
+    return [ "n{:06d}".format(i) for i in range(n) ]
+
+def erdos_renyi(n, m, seed):
+    '''
+    Returns a random sparse graph with `n` nodes and `m` distinct edges that
+    are chosen uniformly, i.e., G(n,m).  Loops are included.
+    '''
+    rand, nodes = random.Random(seed), names(n)
+    m, pairs = min(m, n*n), set()
+    while len(pairs) < m:
+        pairs.add((rand.randrange(n), rand.randrange(n)))
+    return nodes, [ (nodes[i], nodes[j], rand.randint(1, 99)) for (i, j) in sorted(pairs) ]
+
+def dense(n, p, seed):
+    '''
+    Returns a random graph with `n` nodes where each of the n*(n-1) edges
+    between distinct nodes exists with probability `p`, i.e., G(n,p).
+    '''
+    rand, nodes = random.Random(seed), names(n)
+    edges = [ (nodes[i], nodes[j], rand.randint(1, 99))
+              for i in range(n) for j in range(n) if i != j and rand.random() < p ]
+    return nodes, edges
+
+def grid(n, seed):
+    '''
+    Returns the first `n` nodes of a square grid in row-major order, with
+    edges in both directions between horizontal and vertical neighbours.
+    '''
+    rand, nodes = random.Random(seed), names(n)
+    side, edges = math.isqrt(max(n-1, 0)) + 1, []
+    for i in range(n):
+        for j in [ i+1 if (i+1) % side else n, i+side ]:
+            if j < n:
+                edges.append((nodes[i], nodes[j], rand.randint(1, 99)))
+                edges.append((nodes[j], nodes[i], rand.randint(1, 99)))
+    return nodes, edges
+
+def scale_free(n, k, seed):
+    '''
+    Returns a Barabási–Albert graph: nodes are added one at a time, and each
+    new node gets edges towards `k` distinct earlier nodes that are chosen
+    with probability proportional to their degree.  Degrees thus follow a
+    power law, with a few hubs and many leaves.
+    '''
+    rand, nodes = random.Random(seed), names(n)
+    edges, ends = [], [] # ends has one entry per edge endpoint
+    for i in range(1, n):
+        targets = set()
+        while len(targets) < min(k, i):
+            targets.add(rand.choice(ends) if ends and rand.random() < 0.9
+                        else rand.randrange(i))
+        for j in sorted(targets):
+            edges.append((nodes[i], nodes[j], rand.randint(1, 99)))
+            ends += [i, j]
+    return nodes, edges
+
+def chain(n, seed):
+    '''
+    Returns a path n0 -> n1 -> ... -> n{n-1}.
+    '''
+    rand, nodes = random.Random(seed), names(n)
+    return nodes, [ (nodes[i], nodes[i+1], rand.randint(1, 99)) for i in range(n-1) ]
+
+def tree(n, seed):
+    '''
+    Returns a random recursive tree with edges from parents to children,
+    where the parent of each node is chosen uniformly among earlier nodes.
+    '''
+    rand, nodes = random.Random(seed), names(n)
+    return nodes, [ (nodes[rand.randrange(i)], nodes[i], rand.randint(1, 99))
+                    for i in range(1, n) ]
+
+#
+# Generators by kind, with default parameters for a given number of nodes
+#
+KINDS = {
+    "sparse": lambda n, seed: erdos_renyi(n, 4*n, seed),
+    "dense": lambda n, seed: dense(n, 0.5, seed),
+    "grid": grid,
+    "scale-free": lambda n, seed: scale_free(n, 3, seed),
+    "chain": chain,
+    "tree": tree,
+}
+
+def generate(kind, n, seed):
+    '''
+    Returns (nodes, edges) for a graph of a kind in KINDS with `n` nodes.
+    '''
+    return KINDS[kind](n, seed)
+
+def build(kind, n, seed, cls=None):
+    '''
+    Returns an adjacency list of class `cls`, AdjacencyList by default, that
+    holds generate(kind, n, seed).
+
+    Pre: src/ is on sys.path.
+    '''
+    from adjlist import AdjacencyList
+    cls = AdjacencyList if cls is None else cls
+    return cls().extend(*generate(kind, n, seed))
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+
+current_path = os.path.dirname(__file__)
+server_path = os.path.abspath(os.path.join(current_path, "../bin/server.py"))
+
+log = logging.getLogger(__name__)
+
+def workload(n, count, algorithms, seed):
+    '''
+    Returns `count` random requests on nodes n0..n{n-1}, where a fraction
+    `algorithms` of them run Dijkstra's algorithm.
+    '''
+    rand = random.Random(seed)
+    nodes = [ "n{}".format(i) for i in range(n) ]
+    requests = []
+    for i in range(count):
+        a, b, op = rand.choice(nodes), rand.choice(nodes), rand.random()
+        if op < algorithms:
+            requests.append({ "op": "dijkstra", "args": { "start": a } })
+        elif op < 0.4:
+            requests.append({ "op": "find_node", "args": { "name": a } })
+        elif op < 0.75:
+            requests.append({ "op": "find_edge", "args": { "src": a, "dst": b } })
+        elif op < 0.9:
+            requests.append({ "op": "add_edge", "args": { "src": a, "dst": b,
+                "weight": rand.randint(1, 99) } })
+        else:
+            requests.append({ "op": "delete_edge", "args": { "src": a, "dst": b } })
+    return nodes, requests
+
+async def connect(args):
+    if args.unix is not None:
+        return await asyncio.open_unix_connection(args.unix, limit=2**24)
+    return await asyncio.open_connection(args.host, args.port, limit=2**24)
+
+async def client(args, requests, depth, latencies, errors):
+    '''
+    Sends `requests` on one connection with up to `depth` of them in flight,
+    and appends the latency of each response in seconds to `latencies`.
+    '''
+    reader, writer = await connect(args)
+    window, sent = asyncio.Semaphore(depth), {}
+
+    async def send():
+        for (i, request) in enumerate(requests):
+            await window.acquire()
+            sent[i] = time.perf_counter()
+            writer.write(json.dumps(dict(request, id=i)).encode("utf-8") + b"\n")
+            if writer.transport.get_write_buffer_size() > 2**16:
+                await writer.drain()
+        await writer.drain()
+
+    sender = asyncio.ensure_future(send())
+    for _ in range(len(requests)):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        response = json.loads(line)
+        latencies.append(time.perf_counter() - sent.pop(response["id"]))
+        if "error" in response:
+            errors.append(response["error"])
+        window.release()
+    await sender
+    writer.close()
+
+async def setup(args, nodes, seed):
+    '''
+    Adds `nodes` and about two edges per node to the served graph.
+    '''
+    rand = random.Random(seed)
+    requests = [ { "op": "add_node", "args": { "name": name } } for name in nodes ]
+    requests += [ { "op": "add_edge", "args": { "src": rand.choice(nodes),
+        "dst": rand.choice(nodes), "weight": rand.randint(1, 99) } }
+        for _ in range(2*len(nodes)) ]
+    await client(args, requests, 256, [], [])
+
+async def run(args):
+    nodes, requests = workload(args.nodes, args.requests, args.algorithms, args.seed)
+    await setup(args, nodes, args.seed)
+
+    latencies, errors = [], []
+    shares = [ requests[i::args.clients] for i in range(args.clients) ]
+    t0 = time.perf_counter()
+    await asyncio.gather(*[ client(args, share, args.depth, latencies, errors)
+                            for share in shares ])
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "rps": len(latencies)/elapsed,
+        "p50_ms": latencies[len(latencies)//2]*1e3,
+        "p99_ms": latencies[min(len(latencies)-1, int(len(latencies)*0.99))]*1e3,
+    }
+
+def spawn(args, tmp):
+    '''
+    Starts a local server on a Unix socket in `tmp`, and waits until it
+    accepts clients.
+    '''
+    args.unix = os.path.join(tmp, "graph.sock")
+    proc = subprocess.Popen([sys.executable, server_path, "--unix", args.unix,
+                             "--log-level", "warning"])
+    for _ in range(100):
+        if os.path.exists(args.unix):
+            return proc
+        time.sleep(0.05)
+    proc.kill()
+    raise OSError("server did not start")
+
+def main(args):
+    logging.basicConfig(format="[%(levelname)s] %(message)s", level=logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = spawn(args, tmp) if args.spawn else None
+        try:
+            r = asyncio.run(run(args))
+        except (OSError, ConnectionError) as e:
+            log.critical("load generation failed: {}".format(e))
+            return 1
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+
+    print("requests: {} ({} errors, e.g., deleting non-member edges)".format(
+        r["requests"], r["errors"]))
+    print("elapsed:  {:.3f}s".format(r["seconds"]))
+    print("rate:     {:.0f} requests/s".format(r["rps"]))
+    print("latency:  p50 {:.3f}ms, p99 {:.3f}ms".format(r["p50_ms"], r["p99_ms"]))
+    return 0
+
+def get_args():
+    parser = argparse.ArgumentParser("Load generator for bin/server.py")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+        help="Server address.  Default: 127.0.0.1.",
+    )
+    parser.add_argument("--port", "-p", type=int, default=7878,
+        help="Server TCP port.  Default: 7878.",
+    )
+    parser.add_argument("--unix", type=str, default=None, metavar="PATH",
+        help="Connect to a Unix socket at PATH instead of TCP.",
+    )
+    parser.add_argument("--spawn", action="store_true",
+        help="Start a local server on a temporary Unix socket.",
+    )
+    parser.add_argument("--clients", "-c", type=int, default=4,
+        help="Number of concurrent connections.",
+    )
+    parser.add_argument("--depth", "-d", type=int, default=32,
+        help="Requests in flight per connection, i.e., the pipeline depth.",
+    )
+    parser.add_argument("--requests", "-r", type=int, default=20000,
+        help="Total number of requests.",
+    )
+    parser.add_argument("--nodes", "-n", type=int, default=200,
+        help="Number of nodes in the served graph.",
+    )
+    parser.add_argument("--algorithms", "-a", type=float, default=0.01,
+        help="Fraction of requests that run Dijkstra's algorithm.",
+    )
+    parser.add_argument("--seed", "-s", type=int, default=1337,
+        help="Random seed.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+log = logging.getLogger(__name__)
+
+from adjlist import AdjacencyList
+from algorithm import warshall
+from reachability import ReachabilityIndex
+import generators
+
+def matrix_nbytes(matrix):
+    '''
+    Returns the number of bytes used by a list-of-lists matrix, excluding the
+    shared True/False objects.
+    '''
+    return sys.getsizeof(matrix) + sum([ sys.getsizeof(row) for row in matrix ])
+
+def run(n, degree, queries, seed):
+    nodes, edges = generators.erdos_renyi(n, int(n*degree), seed)
+    l = AdjacencyList().extend(nodes, edges)
+    rand = random.Random(seed)
+    pairs = [ (rand.choice(nodes), rand.choice(nodes)) for _ in range(queries) ]
+
+    t0 = time.perf_counter()
+    matrix = warshall(l)
+    t1 = time.perf_counter()
+    index = ReachabilityIndex(l)
+    t2 = time.perf_counter()
+
+    position = { name: i for i, name in enumerate(nodes) }
+    t3 = time.perf_counter()
+    want = [ matrix[position[src]][position[dst]] for (src, dst) in pairs ]
+    t4 = time.perf_counter()
+    got = [ index.reaches(src, dst) for (src, dst) in pairs ]
+    t5 = time.perf_counter()
+    if got != want:
+        log.error("index and warshall disagree for n={}".format(n))
+
+    return {
+        "n": n,
+        "edges": l.edge_cardinality(),
+        "components": index.component_cardinality(),
+        "warshall_build_s": t1-t0,
+        "index_build_s": t2-t1,
+        "warshall_entries": n*n,
+        "index_entries": index.size(),
+        "warshall_bytes": matrix_nbytes(matrix),
+        "index_bytes": index.nbytes(),
+        "warshall_query_ns": (t4-t3)/queries*1e9,
+        "index_query_ns": (t5-t4)/queries*1e9,
+    }
+
+def main(args):
+    logging.basicConfig(format="[%(levelname)s] %(message)s", level=logging.INFO)
+    print("{: >6} {: >7} {: >6} | {: >10} {: >10} | {: >9} {: >9} | {: >8} {: >8}".format(
+        "n", "edges", "sccs", "W bytes", "idx bytes", "W build", "idx build",
+        "W ns/q", "idx ns/q"))
+    for n in args.sizes:
+        r = run(n, args.degree, args.queries, args.seed)
+        print("{: >6} {: >7} {: >6} | {: >10} {: >10} | {: >8.3f}s {: >8.3f}s | {: >8.0f} {: >8.0f}".format(
+            r["n"], r["edges"], r["components"], r["warshall_bytes"],
+            r["index_bytes"], r["warshall_build_s"], r["index_build_s"],
+            r["warshall_query_ns"], r["index_query_ns"]))
+    return 0
+
+def get_args():
+    parser = argparse.ArgumentParser("Reachability index vs. Warshall matrix")
+    parser.add_argument("--sizes", "-n", type=int, nargs="+", default=[10, 20, 40],
+        help="Number of nodes per benchmarked graph.",
+    )
+    parser.add_argument("--degree", "-d", type=float, default=1.5,
+        help="Average out-degree of the random graphs.",
+    )
+    parser.add_argument("--queries", "-q", type=int, default=10000,
+        help="Number of random reachability queries.",
+    )
+    parser.add_argument("--seed", "-s", type=int, default=1337,
+        help="Random seed.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
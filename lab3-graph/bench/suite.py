@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+
+import os
+import gc
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import statistics
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+log = logging.getLogger(__name__)
+
+from adjlist import AdjacencyList, UndirectedAdjacencyList
+from algorithm import dijkstra, prim, floyd, warshall
+import generators
+
+OPS = [ "add_node", "delete_node", "add_edge", "find_edge", "adjacency_matrix",
+        "dijkstra", "prim", "floyd", "warshall" ]
+
+#
+# Largest graphs that an operation is benchmarked on by default, since
+# matrices take O(n^2) memory and Floyd and Warshall O(n^3) time.  Dense
+# graphs have O(n^2) edges, so they are only generated up to DENSE_LIMIT.
+#
+LIMITS = {
+    "adjacency_matrix": 2000,
+    "floyd": 200,
+    "warshall": 200,
+}
+DENSE_LIMIT = 1000
+
+#
+# The core micro-benchmarks that --quick runs in well under a minute, e.g.,
+# before every commit, see bench/compare.py.
+#
+QUICK = {
+    "kinds": [ "sparse", "grid", "scale-free" ],
+    "sizes": [ 100, 1000 ],
+    "repeat": 9,
+    "limits": { "adjacency_matrix": 1000, "floyd": 100, "warshall": 100 },
+}
+
+class Fixture:
+    '''
+    A generated graph as a directed and an undirected adjacency list, and a
+    source of random arguments for the operations.
+    '''
+    def __init__(self, kind, n, seed):
+        self.nodes, self.edges = generators.generate(kind, n, seed)
+        self.directed = AdjacencyList().extend(self.nodes, self.edges)
+        self.undirected = UndirectedAdjacencyList().extend(self.nodes, self.edges)
+        self.rand = random.Random(seed)
+
+    def sample(self, count):
+        return [ self.rand.choice(self.nodes) for _ in range(count) ]
+
+def cold(adjlist):
+    '''
+    Returns `adjlist` after dropping its memoized values, e.g., the CSR form,
+    so that the next operation is timed from scratch.
+    '''
+    adjlist._state.derived.clear()
+    return adjlist
+
+def timed(func, count):
+    '''
+    Returns the wall time per call of func(), which makes `count` calls.  As
+    in timeit, the garbage collector is off while timing.
+    '''
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        func()
+        return (time.perf_counter() - t0) / count
+    finally:
+        if enabled:
+            gc.enable()
+
+def measure(op, f, count):
+    '''
+    Runs `count` calls of the operation `op` on the fixture `f`, leaving the
+    graph as it was.
+
+    Returns the wall time per call in seconds.
+    '''
+    if op == "add_node" or op == "delete_node":
+        names = [ name + "x" for name in f.sample(count) ] # between existing nodes
+        def add():
+            l = f.directed
+            for name in names:
+                l = l.add_node(name)
+            f.directed = l
+        def delete():
+            l = f.directed
+            for name in names:
+                l = l.delete_node(name)
+            f.directed = l
+        t_add, t_delete = timed(add, count), timed(delete, count)
+        return t_add if op == "add_node" else t_delete
+
+    if op == "add_edge":
+        pairs = [ (src, dst) for (src, dst) in zip(f.sample(count), f.sample(count))
+                  if not f.directed.find_edge(src, dst) ]
+        def add():
+            l = f.directed
+            for (src, dst) in pairs:
+                l = l.add_edge(src, dst, 1)
+            f.directed = l
+        t = timed(add, max(len(pairs), 1))
+        for (src, dst) in pairs:
+            f.directed = f.directed.delete_edge(src, dst)
+        return t
+
+    if op == "find_edge":
+        half = count // 2
+        pairs = [ (src, dst) for (src, dst, w) in
+                  f.rand.sample(f.edges, min(half, len(f.edges))) ]
+        pairs += list(zip(f.sample(count - len(pairs)), f.sample(count - len(pairs))))
+        return timed(lambda: [ f.directed.find_edge(src, dst) for (src, dst) in pairs ],
+                     count)
+
+    if op == "adjacency_matrix":
+        return timed(lambda: cold(f.directed).adjacency_matrix(), 1)
+
+    if op == "dijkstra":
+        starts = f.sample(count)
+        return timed(lambda: [ dijkstra(cold(f.directed), s) for s in starts ], count)
+
+    if op == "prim":
+        starts = f.sample(count)
+        return timed(lambda: [ prim(cold(f.undirected), s) for s in starts ], count)
+
+    if op == "floyd":
+        return timed(lambda: floyd(cold(f.directed)), 1)
+
+    if op == "warshall":
+        return timed(lambda: warshall(cold(f.directed)), 1)
+
+    raise ValueError("invalid op: {}".format(op))
+
+def counts(op, n, quick=False):
+    '''
+    Returns the number of calls per sample for `op` on a graph with `n` nodes,
+    fewer for larger graphs where each call takes longer.
+    '''
+    if op in ["adjacency_matrix", "floyd", "warshall"]:
+        return 1
+    if op in ["dijkstra", "prim"]:
+        return max(1, min(2 if quick else 5, 10**4 // n))
+    return max(10, min(20 if quick else 100, 10**5 // n))
+
+def run(kinds, sizes, ops, repeat, seed, limits=LIMITS, quick=False, keep=False):
+    '''
+    Benchmarks `ops` on graphs of each kind and size, taking `repeat` samples
+    per operation in rounds over the operations, so that drift of the machine
+    hits all of them alike.  If `keep` is True, all graphs are kept in memory
+    and each round goes over all of them.
+
+    Returns a list of results with keys graph, n, edges, op, count, samples
+    (seconds per call) and median.
+    '''
+    def fixtures():
+        for kind in kinds:
+            for n in sizes:
+                if kind == "dense" and n > limits.get("dense", DENSE_LIMIT):
+                    continue
+                t0 = time.perf_counter()
+                f = Fixture(kind, n, seed)
+                log.info("{} n={}: {} edges, generated in {:.2f}s".format(
+                    kind, n, len(f.edges), time.perf_counter() - t0))
+                todo = [ (op, counts(op, n, quick)) for op in ops if n <= limits.get(op, n) ]
+                yield kind, n, f, todo
+
+    results = {}
+    def sample(kind, n, f, todo):
+        for (op, count) in todo:
+            r = results.setdefault((kind, n, op), { "graph": kind, "n": n,
+                "edges": len(f.edges), "op": op, "count": count, "samples": [] })
+            r["samples"].append(measure(op, f, count))
+
+    if keep:
+        graphs = list(fixtures())
+        for _ in range(repeat):
+            for graph in graphs:
+                sample(*graph)
+    else:
+        for graph in fixtures():
+            for _ in range(repeat):
+                sample(*graph)
+
+    for r in results.values():
+        r["median"] = statistics.median(r["samples"])
+    return list(results.values())
+
+def run_quick(seed):
+    '''
+    Returns the results of the QUICK benchmarks for all operations.
+    '''
+    return run(QUICK["kinds"], QUICK["sizes"], OPS, QUICK["repeat"], seed,
+               QUICK["limits"], quick=True, keep=True)
+
+def report(results):
+    '''
+    Returns a summary table with the median time per call of every operation
+    by graph kind (columns) and size (rows).
+    '''
+    kinds = list(dict.fromkeys([ r["graph"] for r in results ]))
+    median = { (r["op"], r["n"], r["graph"]): r["median"] for r in results }
+    lines = [ "{: <16} {: >7} ".format("op", "n") +
+              " ".join([ "{: >11}".format(kind) for kind in kinds ]) ]
+    for op in dict.fromkeys([ r["op"] for r in results ]):
+        for n in sorted(set([ r["n"] for r in results if r["op"] == op ])):
+            cells = [ format_time(median[(op, n, kind)]) if (op, n, kind) in median
+                      else "-" for kind in kinds ]
+            lines.append("{: <16} {: >7} ".format(op, n) +
+                         " ".join([ "{: >11}".format(c) for c in cells ]))
+    return "\n".join(lines)
+
+def format_time(seconds):
+    '''
+    Returns `seconds` in a readable unit.
+    '''
+    for unit, scale in [ ("s", 1), ("ms", 1e-3), ("us", 1e-6) ]:
+        if seconds >= scale:
+            return "{:.3g}{}".format(seconds/scale, unit)
+    return "{:.3g}ns".format(seconds*1e9)
+
+def metadata(label, seed, repeat):
+    return {
+        "label": label,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+def save(path, meta, results):
+    with open(path, "w") as f:
+        json.dump({ "meta": meta, "results": results }, f, indent=1)
+
+def main(args):
+    logging.basicConfig(format="[%(levelname)s] %(message)s",
+                        level=logging.INFO if args.verbose else logging.WARNING)
+    for op in args.ops:
+        if op not in OPS:
+            log.critical("invalid op: {}".format(op))
+            return 1
+
+    if args.quick:
+        args.repeat = QUICK["repeat"]
+        results = run_quick(args.seed)
+    else:
+        limits = dict(LIMITS)
+        if args.full:
+            limits = { "dense": max(args.sizes) }
+        results = run(args.kinds, args.sizes, args.ops, args.repeat, args.seed, limits)
+    print(report(results))
+    if args.output is not None:
+        try:
+            save(args.output, metadata(args.label, args.seed, args.repeat), results)
+        except OSError as e:
+            log.critical("failed to write results: {}".format(e))
+            return 1
+    return 0
+
+def get_args():
+    parser = argparse.ArgumentParser("Graph operations on synthetic graphs")
+    parser.add_argument("--kinds", "-k", nargs="+", default=list(generators.KINDS),
+        choices=list(generators.KINDS),
+        help="Graph kinds to benchmark.  Default: all.",
+    )
+    parser.add_argument("--sizes", "-n", type=int, nargs="+",
+        default=[10, 100, 1000, 10000, 100000],
+        help="Numbers of nodes per benchmarked graph.",
+    )
+    parser.add_argument("--ops", nargs="+", default=OPS,
+        help="Operations to benchmark.  Default: all, i.e., " + ", ".join(OPS) + ".",
+    )
+    parser.add_argument("--repeat", "-r", type=int, default=5,
+        help="Samples per operation.",
+    )
+    parser.add_argument("--full", action="store_true",
+        help="Also run matrix algorithms and dense graphs on all sizes.",
+    )
+    parser.add_argument("--quick", "-q", action="store_true",
+        help="Only run the core micro-benchmarks (under a minute), ignoring "
+        "--kinds, --sizes, --ops and --repeat.",
+    )
+    parser.add_argument("--output", "-o", type=str, default=None, metavar="FILE",
+        help="Write all samples as JSON to FILE, see bench/compare.py.",
+    )
+    parser.add_argument("--label", type=str, default="",
+        help="Label to store with the results, e.g., a commit or engine name.",
+    )
+    parser.add_argument("--seed", "-s", type=int, default=1337,
+        help="Random seed.",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true",
+        help="Log progress.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
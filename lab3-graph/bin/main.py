@@ -11,7 +11,11 @@ sys.path.insert(0, src_path)
 
 log = logging.getLogger(__name__)
 
+SCRIPT_BUFFER = 2**20 # bytes of output buffered in script mode
+
 from ui import TerminalUI
+from cache import ResultCache
+import stats
 
 def main(args):
     try:
@@ -23,14 +27,48 @@ def main(args):
         log.critical("invalid log level: {}".format(args.log_level))
         return 1
 
+    stats.enable(args.profile)
+
+    results = None
+    if args.cache_dir is not None:
+        try:
+            results = ResultCache(args.cache_dir, int(args.cache_size*2**20))
+        except OSError as e:
+            log.critical("invalid cache directory: {}".format(e))
+            return 1
+
+    script, out = None, None
+    if args.script is not None:
+        try:
+            script = sys.stdin if args.script == "-" else open(args.script)
+        except OSError as e:
+            log.critical("invalid script: {}".format(e))
+            return 1
+        out = open(sys.stdout.fileno(), "w", buffering=SCRIPT_BUFFER,
+                   encoding=sys.stdout.encoding, closefd=False)
+
     try:
         mode = args.mode
-        return TerminalUI(mode if mode == "undirected" else "directed",
-                          args.echo).run()
+        ui = TerminalUI(mode if mode == "undirected" else "directed",
+                        args.echo, args.budget, results,
+                        args.sparse_threshold, script, out)
+        for path in args.load:
+            ui.load_file(path)
+        return ui.run()
     except KeyboardInterrupt:
         pass
     except EOFError:
         pass
+    finally:
+        if out is not None:
+            try:
+                out.flush()
+            except BrokenPipeError:
+                pass
+        if script is not None and script is not sys.stdin:
+            script.close()
+        if args.profile:
+            print(stats.report(), file=sys.stderr)
 
 def get_args():
     parser = argparse.ArgumentParser("Terminal-based UI - (un)directed graphs")
@@ -44,6 +82,30 @@ def get_args():
     parser.add_argument("--echo", "-e", action="store_true",
         help="Echo input. Useful if redirecting input from file"
     )
+    parser.add_argument("--script", type=str, default=None, metavar="FILE",
+        help="Run the commands in FILE, or stdin if -, without prompts and "
+        "with buffered output.",
+    )
+    parser.add_argument("--budget", "-b", type=float, default=None,
+        help="Time budget in seconds for Floyd and Warshall.  Default: none.",
+    )
+    parser.add_argument("--load", type=str, action="append", default=[],
+        metavar="FILE",
+        help="Load an edge-list, csv or tsv file on startup.  Repeatable.",
+    )
+    parser.add_argument("--cache-dir", type=str, default=None, metavar="DIR",
+        help="Persist Floyd and Warshall results in DIR.  Default: disabled.",
+    )
+    parser.add_argument("--cache-size", type=float, default=256, metavar="MB",
+        help="Maximum size of the result cache in MiB.  Default: 256.",
+    )
+    parser.add_argument("--profile", action="store_true",
+        help="Record time per operation and operation counts, see 'T' in the "
+        "menu.  The totals are written to stderr on exit.",
+    )
+    parser.add_argument("--sparse-threshold", type=int, default=32, metavar="N",
+        help="View graphs with more than N nodes as edge lists.  Default: 32.",
+    )
     return parser.parse_args()
 
 if __name__ == "__main__":
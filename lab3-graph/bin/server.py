@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import asyncio
+import logging
+import argparse
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+log = logging.getLogger(__name__)
+
+from concurrent.futures import ThreadPoolExecutor
+
+from server import GraphServer
+import graphio
+
+def main(args):
+    try:
+        logging.basicConfig(
+            format="[%(levelname)s] %(message)s",
+            level = logging.__dict__[args.log_level.upper()],
+        )
+    except KeyError:
+        log.critical("invalid log level: {}".format(args.log_level))
+        return 1
+
+    server = GraphServer(args.mode if args.mode == "undirected" else "directed",
+                         ThreadPoolExecutor(args.workers))
+    for path in args.load:
+        try:
+            server.set_adjlist(graphio.load(path, server.get_adjlist()))
+        except (OSError, ValueError) as e:
+            log.critical("failed to load {}: {}".format(path, e))
+            return 1
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        log.critical("failed to listen: {}".format(e))
+        return 1
+
+def get_args():
+    parser = argparse.ArgumentParser("Graph query server - line-delimited JSON")
+    parser.add_argument("--log-level", "-l", type=str, default="info",
+        help="Minimum verbosity for logging.  Available in ascending order: "
+        "debug, info, warning, error, crirical.",
+    )
+    parser.add_argument("--mode", "-m", type=str, default="directed",
+        help="Graph mode.  Available options: undirected, directed.",
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+        help="Address to listen on.  Default: 127.0.0.1.",
+    )
+    parser.add_argument("--port", "-p", type=int, default=7878,
+        help="TCP port to listen on.  Default: 7878.",
+    )
+    parser.add_argument("--unix", type=str, default=None, metavar="PATH",
+        help="Listen on a Unix socket at PATH instead of TCP.",
+    )
+    parser.add_argument("--workers", "-w", type=int, default=None, metavar="N",
+        help="Number of algorithms that run at once, each in a worker process.  "
+        "Default: per CPU.",
+    )
+    parser.add_argument("--load", type=str, action="append", default=[],
+        metavar="FILE",
+        help="Load an edge-list, csv or tsv file on startup.  Repeatable.",
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
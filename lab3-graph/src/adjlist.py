@@ -18,28 +18,55 @@ import logging
 log = logging.getLogger(__name__)
 
 from math import inf
+from array import array
+from contextlib import contextmanager
+
+import csrgraph
+import typedmatrix
+import journal
+import summary
+import stats
 
 class AdjacencyList:
     '''
     A linked-list implementation of an adjacency list that keeps its nodes and
     edges lexicographically ordered at all times.
+
+    Node names are interned in a SymbolTable that all cells of one adjacency
+    list share.  Cells and edges store the resulting integer ids, and names
+    are only looked up when they are passed in or returned.
+
+    The symbol table is part of a GraphState, which also tracks a version
+    number and the values that have been derived from the current version,
+    see memo() and batch().
     '''
-    def __init__(self, name=None, info=None):
+    __slots__ = ("_id", "_info", "_tail", "_edges", "_state", "_epoch")
+
+    def __init__(self, name=None, info=None, state=None):
         '''
         Initializes a new adjacency list.  It is considered empty if no head
         node is provided.  Optionally, a node can also have associated info.
+        A new graph state is created unless `state` is provided.
         '''
-        self._name = name # head node name
+        self._state = GraphState() if state is None else state
+        self._epoch = self._state.epoch # see _own()
+        self._id = None if name is None else self._state.symbols.intern(name) # head node id
         self._info = info # head node info
         if not self.get_head().is_empty():
-            self._tail = AdjacencyList() # empty tail
-            self._edges = Edge() # empty list of edges
+            self._tail = self.__class__(state=self._state) # empty tail
+            self._edges = Edge(state=self._state) # empty list of edges
 
     def is_empty(self):
         '''
         Returns true if this adjacency list is empty.
         '''
-        return self._name is None
+        return self._id is None
+
+    def is_directed(self):
+        '''
+        Returns true if edges have a direction, see UndirectedAdjacencyList.
+        '''
+        return True
 
     def get_head(self):
         '''
@@ -57,7 +84,43 @@ class AdjacencyList:
         '''
         Returns the node name.
         '''
-        return self._name
+        if self._id is None:
+            return None
+        return self._state.symbols.name(self._id)
+
+    def get_id(self):
+        '''
+        Returns the interned id of the node name.
+        '''
+        return self._id
+
+    def get_symbols(self):
+        '''
+        Returns the symbol table that maps node names to ids.
+        '''
+        return self._state.symbols
+
+    def get_version(self):
+        '''
+        Returns the version number, which is incremented by every mutation.
+        '''
+        return self._state.version
+
+    def get_journal(self, retain=4096):
+        '''
+        Returns the journal.Journal that records all mutations of this
+        adjacency list from now on, and starts one that retains up to
+        `retain` entries if needed.  For example, a consumer that computed
+        something at version v can catch up with:
+
+        changes = adjlist.get_journal().changes_since(v)
+        if changes is None:
+            ... # recompute from scratch
+        '''
+        state = self._state
+        if state.journal is None:
+            state.journal = journal.Journal(state.version, retain)
+        return state.journal
 
     def get_info(self):
         '''
@@ -91,7 +154,7 @@ class AdjacencyList:
 
         Returns an adjacency list head.
         '''
-        self._name = name
+        self._id = self._state.symbols.intern(name)
         return self.get_head()
 
     def set_info(self, info):
@@ -116,6 +179,7 @@ class AdjacencyList:
     ###
     # Node operations
     ###
+    @stats.timed
     def add_node(self, name, info=None):
         '''
         Adds a new node named `name` in lexicographical order. If node `name`
@@ -123,60 +187,107 @@ class AdjacencyList:
 
         Returns an adjacency list head.
         '''
+        if self._state.queue is not None:
+            return self._queue("add_node", name, info)
+        self._state.changed(("add_node", name, info))
+        return self._add_node(name, info)
+
+    def _add_node(self, name, info):
+        '''
+        Adds a new node named `name`, see add_node().
 
-        if(self.get_head().is_empty()):
-            self.__init__(name, info)
-        elif(self.get_name()<name):
-            self.cons(self.get_tail().add_node(name, info))
-        elif(self.get_name()>name):
-            return AdjacencyList(name, info).cons(self)
+        Returns an adjacency list head.
+        '''
+        head, last, cell = _path_copy(self,
+            lambda cell: cell.is_empty() or cell.get_name()>=name)
+        if(cell.is_empty()):
+            cell = cell._own()
+            cell.__init__(name, info, self._state)
+        elif(cell.get_name()>name):
+            cell = self.__class__(name, info, self._state).cons(cell)
         
-        return self.get_head()
+        return _splice(head, last, cell)
     
 
 
+    @stats.timed
     def delete_node(self, name):
         '''
         Deletes the node named `name` if it is a member.
 
         Returns an adjacency list head.
         '''
+        if self._state.queue is not None:
+            return self._queue("delete_node", name)
 
         if self.find_node(name):
-
-            if(self.get_head().get_name()==name):
-                return self.get_tail()
-            else:
-                return self.cons(self.get_tail().delete_node(name))
+            self._state.changed(("delete_node", name))
+            return self._delete_node(self._state.symbols.lookup(name))
         
         return self.get_head()
+
+    def _delete_node(self, node):
+        '''
+        Deletes the node with id `node`.
+
+        Returns an adjacency list head.
+
+        Pre: `node` is a member of this adjacency list.
+        '''
+        head, last, cell = _path_copy(self, lambda cell: cell.get_id()==node)
+        return _splice(head, last, cell.get_tail()._own()) # a head is never shared
         
 
+    @stats.timed
     def find_node(self, name):
         '''
         Returns True if the node named `name` is a member.
         '''
-        if self.is_empty():
-            return False
-        if name == self.get_head().get_name():
-            return True
-        return self.get_tail().find_node(name)
+        node = self._state.symbols.lookup(name)
+        if node == -1:
+            return False # never interned
+        return self._find_node(node)
+
+    def _find_node(self, node):
+        '''
+        Returns True if the node with id `node` is a member.
+        '''
+        return self._find_cell(node) is not None
 
+    def _find_cell(self, node):
+        '''
+        Returns the cell of the node with id `node`, or None.
+        '''
+        head = self.get_head()
+        if stats.enabled:
+            return _counted_walk(head, lambda cell: cell.get_id() == node)
+        while not head.is_empty():
+            if head.get_id() == node:
+                return head
+            head = head.get_tail()
+        return None
+
+    @stats.timed
     def node_cardinality(self):
         '''
         Returns the number of nodes.
         '''
-        if(self.get_head().is_empty()):
-            return 0
-        if(self.get_tail().is_empty()):
-            return 1
-        else:
-            return self.get_tail().node_cardinality()+1
+        return self.memo("node_cardinality", self._node_cardinality)
+
+    def _node_cardinality(self):
+        count, head = 0, self.get_head()
+        while not head.is_empty():
+            count += 1
+            head = head.get_tail()
+        if stats.enabled:
+            stats.count("list_steps", count)
+        return count
         
 
     ###
     # Edge operations
     ###
+    @stats.timed
     def add_edge(self, src, dst, weight=1):
         '''
         Adds or updates an edge from node `src` to node `dst` with a given
@@ -185,44 +296,61 @@ class AdjacencyList:
 
         Returns an adjacency list head.
         '''
-        if not self.find_node(dst):
+        if self._state.queue is not None:
+            return self._queue("add_edge", src, dst, weight)
+        if not self.find_node(src) or not self.find_node(dst):
             return self.get_head()
-        return self._add_edge(src, dst, weight)
+        self._state.changed(("add_edge", src, dst, weight))
+        return self._add_edge(self._state.symbols.lookup(src),
+                              self._state.symbols.lookup(dst), weight)
 
     def _add_edge(self, src, dst, weight):
         '''
-        Adds a new (or updates an existing) edge from node `src` to node `dst`,
-        setting the weight to `weight`.
+        Adds a new (or updates an existing) edge from node id `src` to node id
+        `dst`, setting the weight to `weight`.
 
         Returns an adjacency list head.
 
-        Pre: `dst` is a member of this adjacency list.
+        Pre: `src` and `dst` are members of this adjacency list.
         '''
-             
-        if(self.get_name()== src):
-            self.set_edges(self.get_edges().add(dst, weight))
-        elif(not self.get_tail().is_empty()):
-            self.cons(self.get_tail()._add_edge(src, dst, weight))
-
-        return self.get_head()
+        head, last, cell = _path_copy(self, lambda cell: cell.get_id()==src)
+        cell = cell._own()
+        cell.set_edges(cell.get_edges()._add(dst, weight))
+        return _splice(head, last, cell)
         
 
+    @stats.timed
     def delete_edge(self, src, dst):
         '''
         Deletes an edge from node `src` to node `dst` if it exists.
 
         Returns an adjacency list head.
         '''
+        if self._state.queue is not None:
+            return self._queue("delete_edge", src, dst)
         
         if(self.find_edge(src, dst)):
-            if(self.get_name()== src):
-                return self.set_edges(self.get_edges().delete(dst))
-            else:
-                self.get_tail().delete_edge(src, dst)        
+            self._state.changed(("delete_edge", src, dst))
+            return self._delete_edge(self._state.symbols.lookup(src),
+                                     self._state.symbols.lookup(dst))
                
         #log.info("TODO: delete_edge()")
         return self.get_head()
 
+    def _delete_edge(self, src, dst):
+        '''
+        Deletes the edge from node id `src` to node id `dst`.
+
+        Returns an adjacency list head.
+
+        Pre: the edge is a member of this adjacency list.
+        '''
+        head, last, cell = _path_copy(self, lambda cell: cell.get_id()==src)
+        cell = cell._own()
+        cell.set_edges(cell.get_edges()._delete(dst))
+        return _splice(head, last, cell)
+
+    @stats.timed
     def delete_edges(self, name):
         '''
         Deletes all edges towards the node named `name`.
@@ -233,44 +361,86 @@ class AdjacencyList:
         #Behöver man checka if self.is_empty() också? Fick det inte riktigt att fungera med den.
         #Henrik la till self.is_empty() och self.set_edges(), kollade self.is_empty i delete också 
 
-        if self.is_empty():
+        if self._state.queue is not None:
+            return self._queue("delete_edges", name)
+
+        node = self._state.symbols.lookup(name)
+        if node == -1:
             return self.get_head()
-        
-        if not self.get_head().get_edges().is_empty():
-            self.set_edges(self.get_edges().delete(name))
-            return self.cons(self.get_tail().delete_edges(name))
-        
-        return self.get_head()
+        self._state.changed(("delete_edges", name))
+        return self._delete_edges(node)
   
         #log.info("TODO: delete_edges()")
 
+    def _delete_edges(self, node):
+        '''
+        Deletes all edges towards the node with id `node`.
+
+        Returns an adjacency list head, which is this cell if nothing changed.
+        '''
+        cells, head = [], self.get_head()
+        while not head.is_empty():
+            cells.append(head)
+            head = head.get_tail()
+
+        if stats.enabled:
+            stats.count("list_steps", len(cells))
+        tail = head # rebuilt back to front, sharing the unchanged suffix
+        for cell in reversed(cells):
+            edges = cell.get_edges()._delete(node)
+            if edges is cell.get_edges() and tail is cell.get_tail():
+                tail = cell
+            else:
+                tail = cell._own().set_edges(edges).cons(tail)
+        return tail
+
+    @stats.timed
     def find_edge(self, src, dst):
         '''
         Returns True if there's an edge from node `src` to node `dst`.
         '''
-        if(self.is_empty()):
+        src, dst = self._state.symbols.lookup(src), self._state.symbols.lookup(dst)
+        if src == -1 or dst == -1:
             return False
-        if(self.get_name()==src):
-            return self.get_edges().find(dst)
-        elif(not self.get_tail().is_empty()):
-            return self.get_tail().find_edge(src, dst)    
+        return self._find_edge(src, dst)
 
-        return False
+    def _find_edge(self, src, dst):
+        '''
+        Returns True if there's an edge from node id `src` to node id `dst`.
+        '''
+        cell = self._find_cell(src)
+        if cell is None:
+            return False
+        return cell.get_edges()._find(dst)
 
+    @stats.timed
     def edge_cardinality(self):
         '''
         Returns the number of edges.
         '''
+        return self.memo("edge_cardinality", self._edge_cardinality)
+
+    def _edge_cardinality(self):
+        count, steps, head = 0, 0, self.get_head()
+        while not head.is_empty():
+            count += head.get_edges().cardinality()
+            steps += 1
+            head = head.get_tail()
+        if stats.enabled:
+            stats.count("list_steps", steps + count)
+        return count
 
-        if not self.is_empty():
-            current_node_cardinality = self.get_edges().cardinality()
-            rest_of_list_cardinality = self.get_tail().edge_cardinality()
-            total_cardinality = current_node_cardinality + rest_of_list_cardinality
-            return total_cardinality
-        
-        return 0
 
+    @stats.timed
+    def summary(self):
+        '''
+        Returns a summary.Summary with counts, self-loops, the degree
+        histogram and the density of this adjacency list.  The result is
+        cached until the next mutation.
+        '''
+        return self.memo("summary", lambda: summary.Summary(self))
 
+    @stats.timed
     def self_loops(self):
         '''
         Returns the number of loops in this adjacency list.  Note that a loop is
@@ -279,15 +449,17 @@ class AdjacencyList:
 
         loops = 0
 
-        for edge in self.list_edges():
-            src, dst, weight = edge
-            if src == dst:
+        head = self.get_head()
+        while not head.is_empty():
+            if head.get_edges()._find(head.get_id()):
                 loops += 1
+            head = head.get_tail()
 
         #log.info("TODO: self_loops()")
         return loops
 
-    def adjacency_matrix(self):
+    @stats.timed
+    def adjacency_matrix(self, backend=None):
         '''
         Returns this adjacency list as an adjacency matrix.  For example,
         consider the following adjacency list where all edges have weight=1.
@@ -317,23 +489,343 @@ class AdjacencyList:
 
         Hint: depending on your solution, you may need to add a helper method
         that maps a node's name to it's numeric position in the adjacency list.
+
+        If `backend` is "array", a typedmatrix.TypedMatrix is returned instead.
+        It stores int32 weights with typedmatrix.INT32_NONE for "no edge" if
+        all weights are small integers, and float64 weights with inf otherwise.
+        The "numpy" backend gives the corresponding NumPy array.
         '''
+        if backend is not None:
+            return self._typed_adjacency_matrix(backend)
         if self.is_empty():
             return [[]]
 
-        # In case you'd like to create an inf-initialized n x n matrix
-        n = self.node_cardinality()
+        nodes, offsets, targets, weights = self.adjacency_csr()
+        n = len(nodes)
         matrix = [ [inf]*n for i in range(n) ]
+        for i in range(n):
+            row = matrix[i]
+            for k in range(offsets[i], offsets[i+1]):
+                row[targets[k]] = weights[k]
 
-        for i in range(len(self.list_nodes())):
-            for j in range(len(self.list_nodes())):
-                for edge in self.list_edges():
-                    src, dst, weight = edge
-                    if self.list_nodes()[i] == src and self.list_nodes()[j] == dst:
-                        matrix[i][j] = weight
-
+        if stats.enabled:
+            stats.count("matrix_cells", n*n + len(targets))
         return matrix
 
+    def _typed_adjacency_matrix(self, backend):
+        '''
+        Returns the adjacency matrix in typed storage, see adjacency_matrix().
+        '''
+        nodes, offsets, targets, weights = self.adjacency_csr()
+        n = len(nodes)
+        if isinstance(weights, array) and weights.typecode == "q" and\
+                all([ -2**31 <= w < typedmatrix.INT32_NONE for w in weights ]):
+            matrix = typedmatrix.empty(n, "i", typedmatrix.INT32_NONE,
+                typedmatrix.INT32_NONE, backend)
+        else:
+            matrix = typedmatrix.empty(n, "d", inf, backend=backend)
+
+        rows = matrix.rows()
+        for i in range(n):
+            row = rows[i]
+            for k in range(offsets[i], offsets[i+1]):
+                row[targets[k]] = weights[k]
+        return typedmatrix.result(matrix, backend)
+
+    @stats.timed
+    def adjacency_coo(self):
+        '''
+        Returns this adjacency list as a sparse matrix in coordinate form, i.e.,
+        as three arrays (rows, cols, weights) with one entry per edge.  For the
+        example in adjacency_matrix():
+
+        rows:    [ 0, 0, 0, 1, 1, 2 ]
+        cols:    [ 0, 1, 2, 0, 1, 2 ]
+        weights: [ 1, 1, 1, 1, 1, 1 ]
+
+        Entries are ordered by row and then by column.
+        '''
+        nodes, offsets, targets, weights = self.adjacency_csr()
+        rows = array("i")
+        for i in range(len(nodes)):
+            rows.extend([i] * (offsets[i+1] - offsets[i]))
+        return rows, targets, weights
+
+    @stats.timed
+    def adjacency_dict(self):
+        '''
+        Returns this adjacency list as a dict-of-dicts that maps a node name to
+        a dict of its destination names and weights.  For the example in
+        adjacency_matrix():
+
+        { 'a': {'a': 1, 'b': 1, 'c': 1}, 'b': {'a': 1, 'b': 1}, 'c': {'c': 1} }
+        '''
+        result = {}
+        head = self.get_head()
+        while not head.is_empty():
+            result[head.get_name()] = out = {}
+            edge = head.get_edges()
+            while not edge.is_empty():
+                out[edge.get_dst()] = edge.get_weight()
+                edge = edge.get_tail()
+            head = head.get_tail()
+
+        for out in result.values():
+            for dst in [ dst for dst in out if dst not in result ]:
+                del out[dst] # an edge towards a deleted node
+        return result
+
+    @stats.timed
+    def adjacency_csr(self):
+        '''
+        Returns this adjacency list in compressed sparse row form as a tuple
+        (nodes, offsets, targets, weights).  The edges of the i:th node are at
+        positions offsets[i] to offsets[i+1] in the `targets` and `weights`
+        arrays.  For the example in adjacency_matrix():
+
+        nodes:   [ 'a', 'b', 'c' ]
+        offsets: [ 0, 3, 5, 6 ]
+        targets: [ 0, 1, 2, 0, 1, 2 ]
+        weights: [ 1, 1, 1, 1, 1, 1 ]
+
+        Weights are stored as int64 if all of them are integers that fit, as
+        float64 if all of them are floats, and otherwise as a list of the
+        stored weights, see _weight_array().  The result is cached until the
+        next mutation, so it must not be modified.
+        '''
+        return self.memo("adjacency_csr", self._adjacency_csr)
+
+    def _adjacency_csr(self):
+        nodes, position = [], array("i", [-1]) * len(self._state.symbols)
+        head = self.get_head()
+        while not head.is_empty():
+            position[head.get_id()] = len(nodes)
+            nodes.append(head.get_name())
+            head = head.get_tail()
+
+        offsets, targets, weights = array("i", [0]), array("i"), []
+        head = self.get_head()
+        while not head.is_empty():
+            edge = head.get_edges()
+            while not edge.is_empty():
+                j = position[edge.get_dst_id()]
+                if j >= 0: # not an edge towards a deleted node
+                    targets.append(j)
+                    weights.append(edge.get_weight())
+                edge = edge.get_tail()
+            offsets.append(len(targets))
+            head = head.get_tail()
+
+        if stats.enabled:
+            stats.count("list_steps", 2*len(nodes) + len(targets))
+        return nodes, offsets, targets, _weight_array(weights)
+
+    ###
+    # Bulk operations
+    ###
+    @stats.timed
+    def extend(self, nodes=(), edges=()):
+        '''
+        Adds all nodes named in `nodes` and all (src, dst, weight) edges in
+        `edges`, as if by add_node() and add_edge() in the given order.  Edges
+        with a non-member endpoint are ignored.
+
+        Unlike repeated calls to add_node() and add_edge(), the lists are only
+        walked once: they are rebuilt back to front from sorted input, which
+        makes this the preferred way to construct large graphs.
+
+        Returns an adjacency list head.
+        '''
+        ops = [ ("add_node", name, None) for name in nodes ] +\
+            [ ("add_edge", src, dst, weight) for (src, dst, weight) in edges ]
+        if self._state.queue is not None:
+            self._state.queue.extend(ops)
+            return self.get_head()
+        return self._merge(ops)
+
+    @contextmanager
+    def batch(self):
+        '''
+        Returns a context manager that queues the add_node(), delete_node(),
+        add_edge(), delete_edge(), delete_edges() and extend() calls made on
+        this adjacency list.  When the block exits, the queued mutations are
+        applied in order with a single rebuild, as in extend(), and derived
+        values are invalidated once.  For example:
+
+        with adjlist.batch():
+            for (src, dst, weight) in edges:
+                adjlist.add_edge(src, dst, weight)
+
+        Queued mutations are not visible to queries until the block exits, and
+        they are discarded if it raises.  Nested batches join the outer one.
+
+        Pre: this is the head of the adjacency list.  It stays the head, since
+        the rebuilt list is moved into this cell.
+        '''
+        state = self._state
+        if state.queue is not None:
+            yield self
+            return
+
+        state.queue = []
+        try:
+            yield self
+        except BaseException:
+            state.queue = None
+            raise
+        queue, state.queue = state.queue, None
+        if queue:
+            self._move(self._merge(queue))
+
+    def _queue(self, *op):
+        '''
+        Queues the mutation `op` until the current batch exits.
+
+        Returns an adjacency list head.
+        '''
+        self._state.queue.append(op)
+        return self.get_head()
+
+    def _merge(self, ops):
+        '''
+        Applies the queued mutations `ops` to a dict-of-dicts copy of this
+        adjacency list, and rebuilds it back to front from sorted names.
+
+        Returns an adjacency list head.
+        '''
+        infos, edges_of = {}, {}
+        head = self.get_head()
+        while not head.is_empty():
+            infos[head.get_name()] = head.get_info()
+            edges_of[head.get_name()] = out = {}
+            edge = head.get_edges()
+            while not edge.is_empty():
+                out[edge.get_dst()] = edge.get_weight()
+                edge = edge.get_tail()
+            head = head.get_tail()
+
+        for (op, *args) in ops:
+            if op == "add_node":
+                name, info = args
+                if name not in infos:
+                    infos[name] = info
+                    edges_of[name] = {}
+            elif op == "delete_node":
+                name, = args
+                if name in infos:
+                    del infos[name], edges_of[name]
+            elif op == "add_edge":
+                src, dst, weight = args
+                if src in infos and dst in infos:
+                    edges_of[src][dst] = weight
+            elif op == "delete_edge":
+                src, dst = args
+                if src in infos and dst in infos:
+                    edges_of[src].pop(dst, None)
+            elif op == "delete_edges":
+                name, = args
+                for out in edges_of.values():
+                    out.pop(name, None)
+                if not self.is_directed() and name in edges_of:
+                    edges_of[name].clear()
+
+        self._state.changed(*ops)
+        state = self._state
+        head = self.__class__(state=state)
+        for name in sorted(infos, reverse=True):
+            out, edge = edges_of[name], Edge(state=state)
+            for dst in sorted(out, reverse=True):
+                edge = Edge(dst, out[dst], state).cons(edge)
+            head = self.__class__(name, infos[name], state).set_edges(edge).cons(head)
+        return head
+
+    def _move(self, head):
+        '''
+        Makes this cell take the place of `head`, the head of another list
+        with the same graph state.
+        '''
+        self._id, self._info = head._id, head._info
+        if head.is_empty():
+            for attr in ["_tail", "_edges"]:
+                if hasattr(self, attr):
+                    delattr(self, attr)
+        else:
+            self._tail, self._edges = head._tail, head._edges
+
+    def memo(self, key, compute):
+        '''
+        Returns compute() for this adjacency list, cached under `key` until
+        the next mutation.  This is how derived values such as cardinalities,
+        matrices or closures avoid recomputation while the graph is unchanged.
+
+        Note that the low-level setters, e.g., cons() and set_edges(), do not
+        count as mutations.
+        '''
+        derived = self._state.derived
+        value = derived.get((self, key), derived)
+        if value is derived:
+            value = derived[(self, key)] = compute()
+        return value
+
+    def memoized(self, key):
+        '''
+        Returns the value that memo() cached under `key`, or None if there is
+        none for this version.
+        '''
+        return self._state.derived.get((self, key))
+
+    ###
+    # Snapshots
+    ###
+    def snapshot(self):
+        '''
+        Returns an immutable Snapshot of this adjacency list in O(1) time.
+
+        The snapshot shares all cells and edges with this adjacency list.  To
+        keep it intact, later mutations path-copy: a cell or edge that existed
+        when the snapshot was taken is copied instead of modified, together
+        with the cells that lead to it, while the rest is still shared.  The
+        memory overhead is therefore proportional to the changes.  Note that
+        the low-level setters, e.g., cons() and set_edges(), modify in place.
+
+        Pre: this is the head of the adjacency list.  As always, mutations
+        return the new head, which must be used from then on.
+        '''
+        state = self._state
+        head = self._copy() # the snapshot's own head cell
+        state.epoch += 1 # everything else that exists now is shared
+        self._epoch = state.epoch # except for this head
+        return Snapshot(head, state.version)
+
+    def _own(self):
+        '''
+        Returns this cell if it may be mutated, and a copy of it otherwise.
+        Cells that are older than the latest snapshot() may be shared with it.
+        '''
+        if self._epoch == self._state.epoch:
+            return self
+        return self._copy()
+
+    def _copy(self):
+        '''
+        Returns a mutable copy of this cell that shares its tail and edges.
+        '''
+        state = self._state
+        cell = self.__class__.__new__(self.__class__)
+        cell._state, cell._epoch = state, state.epoch
+        cell._id, cell._info = self._id, self._info
+        if not self.is_empty():
+            cell._tail, cell._edges = self._tail, self._edges
+        return cell
+
+    def save_binary(self, path):
+        '''
+        Writes this adjacency list to `path` in a compact binary CSR layout,
+        which csrgraph.load() maps into memory without parsing.
+        '''
+        csrgraph.write(self, path)
+
+    @stats.timed
     def list_nodes(self):
         '''
         Returns a list of node names in lexicographical order.
@@ -344,29 +836,363 @@ class AdjacencyList:
             head = head.get_tail()
         return node_names
 
+    @stats.timed
     def list_edges(self):
         '''
         Returns a list of edges in lexicographical order.
         '''
-        if self.get_head().is_empty():
-            return []
-        return self.get_head().get_edges().list(self.get_head().get_name()) +\
-            self.get_tail().list_edges()
+        return list(self.iter_edges())
+
+    def iter_edges(self):
+        '''
+        Returns an iterator over all edges in lexicographical order.  Unlike
+        list_edges(), no list is built, i.e., the edges are produced as the
+        adjacency list is walked.
+        '''
+        head = self.get_head()
+        while not head.is_empty():
+            edge = head.get_edges()
+            while not edge.is_empty():
+                yield (head.get_name(), edge.get_dst(), edge.get_weight())
+                edge = edge.get_tail()
+            head = head.get_tail()
+
+    def iter_neighbours(self):
+        '''
+        Returns an iterator over (name, neighbours) for all nodes in
+        lexicographical order, where neighbours is a list of (dst, weight) for
+        the edges of the node.  The adjacency list is walked as the iterator
+        advances, so a caller that stops early does not pay for the rest of
+        the graph.  If adjacency_csr() is cached, its rows are used instead.
+        '''
+        csr = self.memoized("adjacency_csr")
+        if csr is not None:
+            yield from _csr_rows(*csr)
+            return
+
+        head, steps = self.get_head(), 0
+        try:
+            while not head.is_empty():
+                out, edge = [], head.get_edges()
+                while not edge.is_empty():
+                    out.append((edge.get_dst(), edge.get_weight()))
+                    edge = edge.get_tail()
+                steps += 1 + len(out)
+                yield head.get_name(), out
+                head = head.get_tail()
+        finally:
+            if stats.enabled:
+                stats.count("list_steps", steps)
+
+class UndirectedAdjacencyList(AdjacencyList):
+    '''
+    An adjacency list where each edge {a,b} is stored once, at the node whose
+    name is smaller.  Edge operations accept the endpoints in either order,
+    list_edges() yields every edge once as (a, b, weight) with a <= b, and
+    edge_cardinality() and self_loops() need no correction for double counts.
+
+    Views that are used by the algorithms, i.e., neighbours(), adjacency_csr()
+    and everything built from it, are symmetric.
+    '''
+    __slots__ = ()
+
+    def is_directed(self):
+        '''
+        Returns False, see AdjacencyList.
+        '''
+        return False
+
+    def add_edge(self, src, dst, weight=1):
+        '''
+        Adds a new (or updates an existing) edge between `src` and `dst`.
+
+        Returns an adjacency list head.
+        '''
+        return super().add_edge(*_ordered(src, dst), weight)
+
+    def delete_edge(self, src, dst):
+        '''
+        Deletes the edge between `src` and `dst` if it exists.
+
+        Returns an adjacency list head.
+        '''
+        return super().delete_edge(*_ordered(src, dst))
+
+    def delete_edges(self, name):
+        '''
+        Deletes all edges that have `name` as an endpoint.
+
+        Returns an adjacency list head.
+        '''
+        head = super().delete_edges(name)
+        if self._state.queue is not None:
+            return head
+        node = self._state.symbols.lookup(name)
+        if node == -1 or not head._find_node(node):
+            return head
+        return head._clear_edges(node)
+
+    def _clear_edges(self, node):
+        '''
+        Deletes the edges that are stored at the node with id `node`.
+
+        Returns an adjacency list head.
+
+        Pre: `node` is a member of this adjacency list.
+        '''
+        head, last, cell = _path_copy(self, lambda cell: cell.get_id()==node)
+        cell = cell._own().set_edges(Edge(state=self._state))
+        return _splice(head, last, cell)
+
+    def find_edge(self, src, dst):
+        '''
+        Returns True if there's an edge between `src` and `dst`.
+        '''
+        return super().find_edge(*_ordered(src, dst))
+
+    def neighbours(self, name):
+        '''
+        Returns an iterator over (dst, weight) for all edges that have `name`
+        as an endpoint, in lexicographical order of `dst`.  This walks the
+        whole list, so use adjacency_csr() to visit all nodes' neighbours.
+        '''
+        node = self._state.symbols.lookup(name)
+        head = self.get_head()
+        while not head.is_empty() and head.get_id() != node:
+            edge = head.get_edges()._find_edge(node)
+            if edge is not None:
+                yield head.get_name(), edge.get_weight()
+            head = head.get_tail()
+        if not head.is_empty():
+            yield from [ (dst, weight) for (src, dst, weight)
+                in head.get_edges().list(name) ]
+
+    def iter_neighbours(self):
+        '''
+        Returns an iterator over the symmetric rows (name, neighbours), see
+        AdjacencyList.  An edge {a,b} is stored at a, which comes before b, so
+        the mirrored edges of b are collected when a is passed.  As in
+        adjacency_csr(), they precede the own edges of b in its row.
+        '''
+        csr = self.memoized("adjacency_csr")
+        if csr is not None:
+            yield from _csr_rows(*csr)
+            return
+
+        head, mirrored, steps = self.get_head(), {}, 0
+        try:
+            while not head.is_empty():
+                node, name = head.get_id(), head.get_name()
+                out, edge = mirrored.pop(node, []), head.get_edges()
+                while not edge.is_empty():
+                    dst, weight = edge.get_dst_id(), edge.get_weight()
+                    out.append((edge.get_dst(), weight))
+                    if dst != node:
+                        mirrored.setdefault(dst, []).append((name, weight))
+                    edge, steps = edge.get_tail(), steps + 1
+                steps += 1
+                yield name, out
+                head = head.get_tail()
+        finally:
+            if stats.enabled:
+                stats.count("list_steps", steps)
+
+    @stats.timed
+    def adjacency_dict(self):
+        '''
+        Returns the symmetric dict-of-dicts, see AdjacencyList.
+        '''
+        nodes, offsets, targets, weights = self.adjacency_csr()
+        return { name: { nodes[targets[k]]: weights[k]
+                         for k in range(offsets[i], offsets[i+1]) }
+                 for i, name in enumerate(nodes) }
+
+    @stats.timed
+    def adjacency_csr(self):
+        '''
+        Returns the symmetric compressed sparse row form, see AdjacencyList,
+        i.e., an edge {a,b} appears both in the row of a and in the row of b.
+        '''
+        return self.memo("adjacency_csr", self._adjacency_csr)
+
+    def _adjacency_csr(self):
+        nodes, position = [], array("i", [-1]) * len(self._state.symbols)
+        head = self.get_head()
+        while not head.is_empty():
+            position[head.get_id()] = len(nodes)
+            nodes.append(head.get_name())
+            head = head.get_tail()
+
+        # Row i receives the mirrored edges of nodes before i first, and then
+        # its own edges, so every row is ordered without sorting.
+        rows, i = [ [] for name in nodes ], 0
+        head = self.get_head()
+        while not head.is_empty():
+            edge = head.get_edges()
+            while not edge.is_empty():
+                j, weight = position[edge.get_dst_id()], edge.get_weight()
+                if j >= 0: # not an edge towards a deleted node
+                    rows[i].append((j, weight))
+                    if j != i:
+                        rows[j].append((i, weight))
+                edge = edge.get_tail()
+            head, i = head.get_tail(), i + 1
+
+        offsets, targets, weights = array("i", [0]), array("i"), []
+        for row in rows:
+            for (j, weight) in row:
+                targets.append(j)
+                weights.append(weight)
+            offsets.append(len(targets))
+
+        if stats.enabled:
+            stats.count("list_steps", 2*len(nodes) + len(targets))
+        return nodes, offsets, targets, _weight_array(weights)
+
+    def extend(self, nodes=(), edges=()):
+        '''
+        Adds nodes and undirected edges in bulk, see AdjacencyList.
+        '''
+        edges = [ (*_ordered(src, dst), weight) for (src, dst, weight) in edges ]
+        return super().extend(nodes, edges)
+
+class Snapshot:
+    '''
+    An immutable view of an adjacency list as it was at version
+    get_version(), see AdjacencyList.snapshot().  A snapshot offers the query
+    methods of AdjacencyList, so the algorithms accept it, but no mutators.
+    Since writers never modify its cells, a reader may use it while the
+    adjacency list keeps changing.
+    '''
+    QUERIES = frozenset([
+        "is_empty", "is_directed", "get_symbols", "find_node", "find_edge",
+        "node_cardinality", "edge_cardinality", "self_loops", "neighbours",
+        "adjacency_matrix", "adjacency_coo", "adjacency_dict", "adjacency_csr",
+        "list_nodes", "list_edges", "iter_edges", "iter_neighbours",
+        "save_binary", "memo", "memoized",
+    ])
+    __slots__ = ("_head", "_version")
+
+    def __init__(self, head, version):
+        self._head = head
+        self._version = version
+
+    def get_version(self):
+        '''
+        Returns the version of the adjacency list that this snapshot shows.
+        '''
+        return self._version
+
+    def __getattr__(self, name):
+        if name in Snapshot.QUERIES:
+            return getattr(self._head, name)
+        raise AttributeError("snapshots are read-only, {} is not available".format(name))
+
+def _ordered(src, dst):
+    '''
+    Returns the endpoints of an undirected edge as stored, i.e., smallest first.
+    '''
+    return (src, dst) if src <= dst else (dst, src)
+
+def _weight_array(weights):
+    '''
+    Returns the list `weights` as array('q') if all of them are integers that
+    fit in 64 bits, and as array('d') if all of them are floats.  Otherwise,
+    e.g., for mixed or huge weights, the list itself is returned, so that the
+    adjacency matrix holds the stored weights rather than converted ones.
+    '''
+    if all([ type(w) is int for w in weights ]):
+        try:
+            return array("q", weights)
+        except OverflowError:
+            return weights
+    if all([ type(w) is float for w in weights ]):
+        return array("d", weights)
+    return weights
+
+def _csr_rows(nodes, offsets, targets, weights):
+    '''
+    Returns an iterator over (name, neighbours) for the rows of a compressed
+    sparse row form, see AdjacencyList.iter_neighbours().
+    '''
+    for i, name in enumerate(nodes):
+        yield name, [ (nodes[targets[k]], weights[k])
+                      for k in range(offsets[i], offsets[i+1]) ]
+
+def _path_copy(cell, stop):
+    '''
+    Walks the linked list of cells or edges from `cell` until stop() returns
+    True for the current one.  The cells that are passed on the way are made
+    mutable with _own() and linked to each other, so that the stopping cell
+    can be replaced with _splice().  This is path copying without recursion,
+    which would exceed the recursion limit on long lists.
+
+    Returns (head, last, cell): the first and last passed cell, which are
+    None if stop(cell) was True right away, and the cell where the walk
+    stopped.
+
+    Pre: stop() returns True before the end of the list is passed.
+    '''
+    head = last = None
+    steps = 0
+    while not stop(cell):
+        cell = cell._own()
+        if last is None:
+            head = cell
+        else:
+            last.cons(cell)
+        last, cell = cell, cell.get_tail()
+        steps += 1
+    if stats.enabled:
+        stats.count("list_steps", steps)
+    return head, last, cell
+
+def _counted_walk(cell, match):
+    '''
+    Returns the first cell or edge from `cell` on for which match() returns
+    True, or None, and counts the steps taken.  This is the instrumented
+    version of the lookup loops, which count nothing while stats are off.
+    '''
+    steps = 0
+    while not cell.is_empty():
+        if match(cell):
+            stats.count("list_steps", steps)
+            return cell
+        steps += 1
+        cell = cell.get_tail()
+    stats.count("list_steps", steps)
+    return None
+
+def _splice(head, last, cell):
+    '''
+    Returns the head of the list that _path_copy() walked, where the cell at
+    which the walk stopped has been replaced by `cell`.
+    '''
+    if last is None:
+        return cell
+    last.cons(cell)
+    return head
 
 class Edge:
     '''
     A linked-list implementation of edges that originate from an implicit source
-    node.  Each edge has a weight and goes towards a given destination node.
+    node.  Each edge has a weight and goes towards a given destination node,
+    which is stored as an id in the SymbolTable of the GraphState `state`.
     '''
-    def __init__(self, dst=None, weight=1):
+    __slots__ = ("_dst", "_weight", "_tail", "_state", "_epoch")
+
+    def __init__(self, dst=None, weight=1, state=None):
         '''
         Initializes a new edge sequence.  It is considered empty if no head edge
-        is provided, i.e., dst is set to None.
+        is provided, i.e., dst is set to None.  A new graph state is created
+        unless `state` is provided.
         '''
-        self._dst = dst # where is this edge's destination
+        self._state = GraphState() if state is None else state
+        self._epoch = self._state.epoch
+        self._dst = None if dst is None else self._state.symbols.intern(dst) # where is this edge's destination
         self._weight = weight # what is the weight of this edge
         if not self.get_head().is_empty():
-            self._tail= Edge() # empty edge tail
+            self._tail= Edge(state=self._state) # empty edge tail
 
     def is_empty(self):
         '''
@@ -390,6 +1216,14 @@ class Edge:
         '''
         Returns the node name that this edge goes towards.
         '''
+        if self._dst is None:
+            return None
+        return self._state.symbols.name(self._dst)
+
+    def get_dst_id(self):
+        '''
+        Returns the node id that this edge goes towards.
+        '''
         return self._dst
 
     def get_weight(self):
@@ -412,13 +1246,13 @@ class Edge:
         self._tail = tail
         return self.get_head()
 
-    def _dst(self, dst):
+    def set_dst(self, dst):
         '''
         Sets the destination of this edge to `dst`.
 
         Returns an edge head.
         '''
-        self._dst = dst
+        self._dst = self._state.symbols.intern(dst)
         return self.get_head()
 
     def set_weight(self, weight):
@@ -440,17 +1274,30 @@ class Edge:
 
         Returns an edge head.
         '''
+        return self._add(self._state.symbols.intern(dst), weight)
 
-        if(self.get_head().is_empty()):
-            self.__init__(dst, weight)
-        elif(self.get_head().get_dst()<dst):
-            self.cons(self.get_tail().add(dst, weight))
-        elif(self.get_head().get_dst()>dst):
-            return Edge(dst, weight).cons(self)
-        elif(self.get_dst()==dst):
-            self.set_weight(weight)
+    def _add(self, dst, weight):
+        '''
+        Adds a new edge towards node id `dst`, see add().  Names are only
+        compared to find the insertion point.
+
+        Returns an edge head.
+        '''
+        name = self._state.symbols.name(dst)
+        head, last, edge = _path_copy(self, lambda edge: edge.is_empty() or
+            edge.get_dst_id()==dst or edge.get_dst()>name)
+        if(edge.is_empty()):
+            edge = edge._own()
+            edge._dst, edge._weight = dst, weight
+            edge._tail = Edge(state=self._state)
+        elif(edge.get_dst_id()==dst):
+            edge = edge._own().set_weight(weight)
+        else:
+            new = Edge(state=self._state)
+            new._dst, new._weight = dst, weight
+            edge = new.cons(edge)
         
-        return self.get_head()
+        return _splice(head, last, edge)
 
     def delete(self, dst):
         '''
@@ -458,38 +1305,69 @@ class Edge:
 
         Returns an edge head.
         '''
-        if self.is_empty():
-            return self.get_head()
-        if(self.get_dst()==dst):
-            return self.get_tail()
-        else:
-            return self.cons(self.get_tail().delete(dst))
+        return self._delete(self._state.symbols.lookup(dst))
 
-        #log.info("TODO: delete()")
-        return self.get_head()
+    def _delete(self, dst):
+        '''
+        Deletes the edge that goes towards node id `dst` if it exists.
+
+        Returns an edge head, which is this edge if nothing changed.
+        '''
+        target = self._find_edge(dst)
+        if target is None:
+            return self.get_head()
+        head, last, edge = _path_copy(self, lambda edge: edge is target)
+        return _splice(head, last, edge.get_tail())
 
     def find(self, dst):
         '''
         Returns True if there is an edge towards `dst` in this sequence.
         '''
-        if(self.is_empty()):
-            return False
-        if(self.get_dst()==dst):
-            return True
-        else:
-            return self.get_tail().find(dst)
-        
+        return self._find(self._state.symbols.lookup(dst))
+
+    def _find_edge(self, dst):
+        '''
+        Returns the edge towards node id `dst`, or None.
+        '''
+        edge = self.get_head()
+        if stats.enabled:
+            return _counted_walk(edge, lambda edge: edge.get_dst_id() == dst)
+        while not edge.is_empty():
+            if edge.get_dst_id() == dst:
+                return edge
+            edge = edge.get_tail()
+        return None
+
+    def _find(self, dst):
+        '''
+        Returns True if there is an edge towards node id `dst`.
+        '''
+        return self._find_edge(dst) is not None
+
+    def _own(self):
+        '''
+        Returns this edge if it may be mutated, and a copy of it otherwise,
+        see AdjacencyList._own().
+        '''
+        state = self._state
+        if self._epoch == state.epoch:
+            return self
+        edge = Edge.__new__(Edge)
+        edge._state, edge._epoch = state, state.epoch
+        edge._dst, edge._weight = self._dst, self._weight
+        if not self.is_empty():
+            edge._tail = self._tail
+        return edge
 
     def cardinality(self):
         '''
         Returns the number of edges in this sequence.
         '''
-        if(self.get_head().is_empty()):
-            return 0
-        if(self.get_tail().is_empty()):
-            return 1
-        else:
-            return self.get_tail().cardinality()+1
+        count, edge = 0, self.get_head()
+        while not edge.is_empty():
+            count += 1
+            edge = edge.get_tail()
+        return count
 
     def list(self, src):
         '''
@@ -497,9 +1375,82 @@ class Edge:
         goes to nodes A and B, the returned list would be:
             [ (src, A), (src, B) ]
         '''
-        if self.get_head().is_empty():
-            return []
-        return [(src, self.get_head().get_dst(), self.get_weight())] + self.get_tail().list(src)
+        edges, edge = [], self.get_head()
+        while not edge.is_empty():
+            edges.append((src, edge.get_dst(), edge.get_weight()))
+            edge = edge.get_tail()
+        return edges
+
+class GraphState:
+    '''
+    The state that all cells of one adjacency list share: its SymbolTable,
+    a version number that every mutation increments, the snapshot epoch (see
+    AdjacencyList.snapshot), the values derived from the current version (see
+    AdjacencyList.memo), the mutations that are queued by an open batch or
+    None, and the mutation journal or None.
+    '''
+    __slots__ = ("symbols", "version", "epoch", "derived", "queue", "journal")
+
+    def __init__(self):
+        self.symbols = SymbolTable()
+        self.version = 0
+        self.epoch = 0 # cells from older epochs are shared with snapshots
+        self.derived = {}
+        self.queue = None
+        self.journal = None
+
+    def changed(self, *ops):
+        '''
+        Records a mutation that applied the (op, *args) tuples `ops` as one
+        new version, invalidating all derived values.
+        '''
+        self.version += 1
+        if self.derived:
+            self.derived.clear()
+        if self.journal is not None:
+            for (op, *args) in ops:
+                self.journal.append(self.version, op, tuple(args))
+
+class SymbolTable:
+    '''
+    Maps node names to dense integer ids in order of first insertion, and
+    back.  Ids are never reused, so an id stays valid for as long as the table
+    exists, even if its node is deleted.  Ids can therefore be used as indices
+    into arrays of size len(symbols).
+    '''
+    __slots__ = ("_ids", "_names")
+
+    def __init__(self):
+        '''
+        Initializes an empty symbol table.
+        '''
+        self._ids = {}
+        self._names = []
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, name):
+        '''
+        Returns the id of `name`, allocating a new one if needed.
+        '''
+        node = self._ids.get(name)
+        if node is None:
+            node = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return node
+
+    def lookup(self, name):
+        '''
+        Returns the id of `name`, or -1 if it has never been interned.
+        '''
+        return self._ids.get(name, -1)
+
+    def name(self, node):
+        '''
+        Returns the name that has id `node`.
+        '''
+        return self._names[node]
 
 if __name__ == "__main__":
     log.critical("module contains no main method")
@@ -8,8 +8,15 @@ import logging
 log = logging.getLogger(__name__)
 
 from math import inf
+from array import array
+from heapq import heappush, heappop
 
-def warshall(adjlist):
+import typedmatrix
+import matfile
+import stats
+
+@stats.timed
+def warshall(adjlist, progress=None, backend=None, out=None):
     '''
     Returns an NxN matrix that contains the result of running Warshall's
     algorithm.
@@ -17,69 +24,169 @@ def warshall(adjlist):
     Warshall's algorithm is similar to Floyd's, but gives the transitive closure
     instead of the minimum distances.
 
+    If `progress` is provided, it is called as progress(k, n) before each of
+    the n iterations of the outer loop.
+
+    If `backend` is "array", the matrix is a typedmatrix.TypedMatrix of bools
+    (one byte per cell), and "numpy" gives a NumPy bool array.
+
+    If `out` is a path, the matrix is instead computed in a memory-mapped file
+    at that path and returned as a matfile.MatrixFile, which yields one row
+    at a time when iterated.
+
     Pre: adjlist is not empty.
     '''
     
-    num_nodes = adjlist.node_cardinality()
-
-    paths = [[False for _ in range(num_nodes)] for _ in range(num_nodes)]
-    a_matrix = adjlist.adjacency_matrix()
+    nodes, offsets, targets, weights = adjlist.adjacency_csr()
+    num_nodes = len(nodes)
+
+    if out is not None:
+        paths = matfile.create(out, num_nodes, "b", False)
+        rows = paths.rows()
+    elif backend is None:
+        paths = [[False for _ in range(num_nodes)] for _ in range(num_nodes)]
+        rows = paths
+    else:
+        paths = typedmatrix.empty(num_nodes, "b", False, backend=backend)
+        rows = paths.rows()
     
     for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i == j or a_matrix[i][j]!=inf:
-                paths[i][j] = True
+        rows[i][i] = True
+        for k in range(offsets[i], offsets[i+1]):
+            rows[i][targets[k]] = True
             
 
+    updated = 0 # rows that were updated, num_nodes cells each
     for k in range(num_nodes):
+        if progress is not None:
+            progress(k, num_nodes)
         for i in range(num_nodes):
+            if not rows[i][k]:
+                continue
+            updated += 1
             for j in range(num_nodes):
-                paths[i][j] = paths[i][j] or (paths[i][k] and paths[k][j])
+                rows[i][j] = rows[i][j] or rows[k][j]
 
+    if stats.enabled:
+        stats.count("matrix_cells",
+                    (num_nodes + updated) * num_nodes + len(targets))
 
+    if out is not None:
+        paths.flush()
+    elif backend is not None:
+        return typedmatrix.result(paths, backend)
     return paths
 
 
 
 
 
-def floyd(adjlist):
+@stats.timed
+def floyd(adjlist, next_hop=False, progress=None, backend=None, out=None):
     '''
     Returns an NxN matrix that contains the result of running Floyd's algorithm.
 
     Floyd's algorithm is similar to Warshall's, but gives the minimum distances
     instead of transitive closure.
 
+    If `next_hop` is True, a tuple (paths, nxt) is returned instead.  Here,
+    nxt[i][j] is the index of the node that follows node i on a shortest path
+    towards node j, or -1 if there is no such path.  Each row is stored as an
+    array of int32 node indices, see floyd_path() for route reconstruction.
+
+    If `progress` is provided, it is called as progress(k, n) before each of
+    the n iterations of the outer loop.
+
+    If `backend` is "array", the matrix is a typedmatrix.TypedMatrix of
+    float64 distances, and "numpy" gives a NumPy float64 array.
+
+    If `out` is a path, the matrix is instead computed in a memory-mapped file
+    at that path and returned as a matfile.MatrixFile of float64 distances,
+    which yields one row at a time when iterated.
+
     Pre: adjlist is not empty.
     '''
 
-    num_nodes = adjlist.node_cardinality()
-    a_matrix = adjlist.adjacency_matrix()
+    nodes, offsets, targets, weights = adjlist.adjacency_csr()
+    num_nodes = len(nodes)
 
-    paths = [[inf for _ in range(num_nodes)] for _ in range(num_nodes)]
+    if out is not None:
+        paths = matfile.create(out, num_nodes, "d", inf)
+        rows = paths.rows()
+    elif backend is None:
+        paths = [[inf for _ in range(num_nodes)] for _ in range(num_nodes)]
+        rows = paths
+    else:
+        paths = typedmatrix.empty(num_nodes, "d", inf, backend=backend)
+        rows = paths.rows()
+    nxt = None
+    if next_hop:
+        nxt = [array("i", [-1]) * num_nodes for _ in range(num_nodes)]
 
     for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i == j:
-                paths[i][j] = 0
-            else:
-                paths[i][j] = a_matrix[i][j]
+        for k in range(offsets[i], offsets[i+1]):
+            if targets[k] != i:
+                rows[i][targets[k]] = weights[k]
+        rows[i][i] = 0
+        if nxt is not None:
+            for j in range(num_nodes):
+                if rows[i][j] != inf:
+                    nxt[i][j] = j
                 
 
+    updated = 0 # rows that were updated, num_nodes cells each
     for k in range(num_nodes):
+        if progress is not None:
+            progress(k, num_nodes)
         for i in range(num_nodes):
+            if rows[i][k] == inf:
+                continue
+            updated += 1
             for j in range(num_nodes):
-                through_k = paths[i][k] + paths[k][j]
-                paths[i][j] = min(paths[i][j], through_k)
-
+                through_k = rows[i][k] + rows[k][j]
+                if through_k < rows[i][j]:
+                    rows[i][j] = through_k
+                    if nxt is not None:
+                        nxt[i][j] = nxt[i][k]
+
+    if stats.enabled:
+        stats.count("matrix_cells",
+                    (num_nodes + updated) * num_nodes + len(targets))
+    if out is not None:
+        paths.flush()
+    elif backend is not None:
+        paths = typedmatrix.result(paths, backend)
+    if next_hop:
+        return paths, nxt
     return paths
 
+def floyd_path(nxt, i, j):
+    '''
+    Returns the shortest path from the i:th node to the j:th node as a list of
+    node indices, using a next-hop matrix `nxt` as returned by floyd().  An
+    empty list is returned if there is no path.
+
+    The route is reconstructed in O(path length) without recomputation.
+
+    === Example ===
+    For nodes a, b and c with edges a->b and b->c, floyd_path(nxt, 0, 2)
+    gives [0, 1, 2], i.e., a->b->c.
+    '''
+    if nxt[i][j] == -1:
+        return []
+    path = [i]
+    while i != j:
+        i = nxt[i][j]
+        path.append(i)
+    return path
+
 def min(a, b):
     if a<b:
         return a
     else:
         return b
 
+@stats.timed
 def dijkstra(adjlist, start_node):
     '''
     Returns the result of running Dijkstra's algorithm as two N-length lists:
@@ -107,53 +214,210 @@ def dijkstra(adjlist, start_node):
     e: [ None, 'a', 'b' ]
     '''
 
-    num_nodes = adjlist.node_cardinality()
-    dist = [inf] * num_nodes
-    N = adjlist.list_nodes()
-    Q = adjlist.list_edges()
-    d=[inf]*num_nodes
-    e=[None]*num_nodes
- 
-    
+    nodes = adjlist.adjacency_csr()[0] # all rows are read, so cache them
+    position = { name: i for i, name in enumerate(nodes) }
+    d = [inf] * len(nodes)
+    e = [None] * len(nodes)
+    for (node, dist, prev) in dijkstra_iter(adjlist, start_node):
+        if node != start_node:
+            d[position[node]] = dist
+            e[position[node]] = prev
+    d[position[start_node]] = None
+    return d, e
 
-    for i, element in enumerate(N):
-        if N[i] == start_node:
-            dist[i] = 0
-            d[i] = None
+def dijkstra_iter(adjlist, start_node):
+    '''
+    Runs Dijkstra's algorithm lazily, yielding (node, distance, predecessor)
+    for every reachable node in the order that nodes are settled, i.e., by
+    non-decreasing distance.  The first tuple is (start_node, 0, None).
 
-    
-    sptSet = [False] * num_nodes
+    The neighbours of a node are looked up when it is settled, by reading
+    adjlist.iter_neighbours() up to that node.  A caller that stops iterating
+    early therefore only pays for the part of the node list up to the last
+    settled node, not for the rest of the graph.
 
-    for cout in range(num_nodes):
+    Pre: start_node is a member of adjlist.
+    '''
+    neighbours = _neighbours(adjlist)
+    dist, settled = { start_node: 0 }, set()
+    heap = [(0, start_node, None)]
+    pops = relaxations = 0
+    try:
+        while heap:
+            du, u, prev = heappop(heap)
+            pops += 1
+            if u in settled:
+                continue
+            out = neighbours(u)
+            if out is None: # reached through an edge towards a deleted node
+                continue
+            settled.add(u)
+            yield u, du, prev
+
+            for (v, weight) in out:
+                relaxations += 1
+                dv = du + weight
+                if v not in settled and dv < dist.get(v, inf):
+                    dist[v] = dv
+                    heappush(heap, (dv, v, u))
+    finally:
+        if stats.enabled:
+            stats.count("heap_pops", pops)
+            stats.count("heap_pushes", pops + len(heap))
+            stats.count("edge_relaxations", relaxations)
+
+@stats.timed
+def nearest_k(adjlist, start_node, k):
+    '''
+    Returns a list of (node, distance, predecessor) for the `k` nodes that are
+    closest to `start_node`, excluding the start node itself.  Fewer than `k`
+    entries are returned if fewer nodes are reachable.
 
-            u = minDistance(dist, sptSet, num_nodes)
+    Pre: start_node is a member of adjlist.
+    '''
+    result = []
+    if k <= 0:
+        return result
+    for settled in dijkstra_iter(adjlist, start_node):
+        if settled[0] == start_node:
+            continue
+        result.append(settled)
+        if len(result) == k:
+            break
+    return result
+
+@stats.timed
+def within(adjlist, start_node, radius):
+    '''
+    Returns a list of (node, distance, predecessor) for all nodes that can be
+    reached from `start_node` at a cost of at most `radius`, excluding the
+    start node itself.  The list is ordered by distance.
 
-            sptSet[u] = True
+    Pre: start_node is a member of adjlist.
+    '''
+    result = []
+    for settled in dijkstra_iter(adjlist, start_node):
+        if settled[1] > radius:
+            break
+        if settled[0] != start_node:
+            result.append(settled)
+    return result
+
+@stats.timed
+def dijkstra_many(adjlist, sources, multi_source=False):
+    '''
+    Runs Dijkstra's algorithm from each node named in `sources`, building the
+    graph representation only once.  Node i refers to the i:th node in the
+    adjacency list, and all results are compact arrays:
+    1) distance d: array('d') where unreachable nodes are inf and the start
+    node is 0.
+    2) edges e: array('i') with the index of the node that the shortest path
+    originated from, or -1 for the start node and unreachable nodes.
 
-            for v in range(num_nodes):
-                if (adjlist.adjacency_matrix()[u][v] > 0 and
-                   sptSet[v] == False and
-                   dist[v] > dist[u] + adjlist.adjacency_matrix()[u][v]):
-                    dist[v] = dist[u] + adjlist.adjacency_matrix()[u][v]
-                    d[v]=dist[v]
-                    e[v]=Q[0][0]
-                                            
- 
+    Returns two lists (d, e) with one array per source, in the same order as
+    `sources`.
 
-    
+    If `multi_source` is True, all sources are instead connected to a virtual
+    super-source, which gives the distance to the nearest source per node.  A
+    pair of arrays (d, origin) is then returned, where origin[i] is the index
+    of the source node that is closest to node i (-1 if unreachable).
+
+    Pre: all `sources` are members of adjlist.
+
+    === Example ===
+    For the adjacency list in dijkstra(), i.e., a->b (1) and b->c (2):
+
+    dijkstra_many(adjlist, ["a", "b"]) gives
+    d: [ array('d', [0, 1, 3]), array('d', [inf, 0, 2]) ]
+    e: [ array('i', [-1, 0, 1]), array('i', [-1, -1, 1]) ]
+
+    dijkstra_many(adjlist, ["a", "b"], multi_source=True) gives
+    d: array('d', [0, 0, 2])
+    origin: array('i', [0, 1, 1])
+    '''
+    nodes, offsets, targets, weights = adjlist.adjacency_csr()
+    position = { name: i for i, name in enumerate(nodes) }
+    starts = [ position[name] for name in sources ]
+
+    if multi_source:
+        origin = array("i", [-1]) * len(nodes)
+        for s in starts:
+            origin[s] = s
+        dist, prev = _shortest_paths(offsets, targets, weights, starts, origin)
+        return dist, origin
+
+    d, e = [], []
+    for s in starts:
+        dist, prev = _shortest_paths(offsets, targets, weights, [s])
+        d.append(dist)
+        e.append(prev)
     return d, e
 
-def minDistance(dist, sptSet,num_nodes):
- 
-        min = inf
- 
-        for v in range(num_nodes):
-            if dist[v] < min and sptSet[v] == False:
-                min = dist[v]
-                min_index = v
- 
-        return min_index
+def _shortest_paths(offsets, targets, weights, starts, origin=None):
+    '''
+    Returns (dist, prev) arrays for a heap-based Dijkstra that starts from all
+    nodes in `starts` at distance zero.  If an `origin` array is provided, the
+    origin of each relaxed node is inherited from its predecessor.
+    '''
+    n = len(offsets) - 1
+    dist = array("d", [inf]) * n
+    prev = array("i", [-1]) * n
+    done = bytearray(n)
+    heap = []
+    for s in starts:
+        dist[s] = 0
+        heappush(heap, (0, s))
+
+    pops = 0
+    while heap:
+        du, u = heappop(heap)
+        pops += 1
+        if done[u]:
+            continue
+        done[u] = 1
+        for k in range(offsets[u], offsets[u+1]):
+            v = targets[k]
+            dv = du + weights[k]
+            if dv < dist[v]:
+                dist[v] = dv
+                prev[v] = u
+                if origin is not None:
+                    origin[v] = origin[u]
+                heappush(heap, (dv, v))
+
+    if stats.enabled: # the heap is drained, so every push was popped
+        stats.count("heap_pops", pops)
+        stats.count("heap_pushes", pops)
+        stats.count("edge_relaxations", _degree_sum(offsets, done))
+    return dist, prev
+
+def _degree_sum(offsets, done):
+    '''
+    Returns the number of edges that leave the nodes i where done[i] is set.
+    '''
+    return sum([ offsets[i+1] - offsets[i] for i in range(len(done)) if done[i] ])
 
+def _neighbours(adjlist):
+    '''
+    Returns a function that maps a node name to a list of the (dst, weight)
+    pairs of its outgoing edges, or of all its edges if `adjlist` is
+    undirected, and to None if the node is not a member.  The rows of
+    adjlist.iter_neighbours() are ordered by name, so they are only read as
+    far as the nodes that have been asked for.
+    '''
+    rows, index, last = adjlist.iter_neighbours(), {}, None
+
+    def neighbours(name):
+        nonlocal last
+        if name not in index and (last is None or last < name):
+            for (src, out) in rows:
+                index[src], last = out, src
+                if src >= name:
+                    break
+        return index.get(name)
+    return neighbours
+
+@stats.timed
 def prim(adjlist, start_node):
     '''
     Returns the result of running Prim's algorithm as two N-length lists:
@@ -163,6 +427,7 @@ def prim(adjlist, start_node):
     cheapest edge orignated from. 
 
     If the index i refers to the start node, set the associated values to None.
+    Nodes that cannot be connected keep inf and None.
 
     Pre: adjlist is setup as an undirected graph and start_node is a member.
 
@@ -180,51 +445,40 @@ def prim(adjlist, start_node):
     l: [ None, 1, 1]
     c: [ None, 'a', 'b' ]
     '''
-     
-    num_nodes = adjlist.node_cardinality()
-
+    nodes, offsets, targets, weights = adjlist.adjacency_csr()
+    num_nodes = len(nodes)
 
     l = [inf] * num_nodes
     c = [None] * num_nodes
     visited = [False] * num_nodes
-    N = adjlist.list_nodes()
-    Q = adjlist.list_edges()
-    l[0] = None
-    c[0] = None
-
-    for i, element in enumerate(N):
-        if N[i] == start_node:
-            visited[i]=True
-    
+    start = nodes.index(start_node)
+    l[start] = c[start] = None
+
+    # Lazy Prim: candidates are (weight, node, closest) and are only pushed
+    # if they improve on the best known edge towards node.
+    best = [inf] * num_nodes
+    Q = [(0, start, -1)]
+    pops = 0
     while Q:
-        # Extrahera den minimala kanten från Q startnod
-        
-        min_weight = extract_min_prim(Q, visited, N)
-        
-            
-
-
+        weight, i, closest = heappop(Q)
+        pops += 1
+        if visited[i]:
+            continue
+        visited[i] = True
+        if closest != -1:
+            l[i], c[i] = weight, nodes[closest]
+        for k in range(offsets[i], offsets[i+1]):
+            j = targets[k]
+            if not visited[j] and weights[k] < best[j]:
+                best[j] = weights[k]
+                heappush(Q, (weights[k], j, i))
+
+    if stats.enabled: # the heap is drained, so every push was popped
+        stats.count("heap_pops", pops)
+        stats.count("heap_pushes", pops)
+        stats.count("edge_relaxations", _degree_sum(offsets, visited))
     return l, c
 
-def extract_min_prim(Q, visited, N):
-    minimum = inf
-    key = 0
-
-    for i, element in enumerate(Q):
-        for j, element in enumerate(N):
-            if (N[j] == Q[i][0] or N[j] == Q[i][1]) and visited[j]==True:
-                index =  Q[i][1]
-                if  minimum > Q[i][2]:
-                    minimum = Q[i][2]
-                    key = i
-                           
-                    
-    Q.pop(key)
-
-    return minimum
-
-
-
 if __name__ == "__main__":
     logging.critical("module contains no main")
     sys.exit(1)
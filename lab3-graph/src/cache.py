@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import hashlib
+import logging
+
+log = logging.getLogger(__name__)
+
+import matfile
+
+def graph_key(adjlist):
+    '''
+    Returns a hex digest of the nodes and edges in `adjlist`.  Equal graphs
+    give equal keys, regardless of how they were constructed.
+    '''
+    h = hashlib.sha256()
+    if not adjlist.is_directed():
+        h.update(b"U\0") # same edge list, different graph
+    for name in adjlist.list_nodes():
+        h.update("N\0{}\0".format(name).encode("utf-8"))
+    for (src, dst, weight) in adjlist.iter_edges():
+        h.update("E\0{}\0{}\0{!r}\0".format(src, dst, weight).encode("utf-8"))
+    return h.hexdigest()
+
+class ResultCache:
+    '''
+    A directory of algorithm results that survives process restarts.
+
+    Each result is an NxN matrix stored in the memory-mappable matfile layout,
+    named after the algorithm and the graph_key() of its input.  The total
+    size is capped at `max_bytes`, and the least recently used results are
+    evicted first (file modification times are used as access times).
+    '''
+    def __init__(self, directory, max_bytes=256*2**20):
+        '''
+        Uses `directory` for cached results, creating it if needed.
+        '''
+        self._directory = directory
+        self._max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, algorithm, key):
+        '''
+        Returns the cached result of running `algorithm` on the graph with key
+        `key` as a matfile.MatrixFile, or None on a cache miss.
+        '''
+        path = self._path(algorithm, key)
+        try:
+            matrix = matfile.load(path)
+            os.utime(path) # mark as recently used
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                log.warning("dropping unreadable cache entry {}: {}".format(path, e))
+                self._remove(path)
+            return None
+        log.debug("cache hit: {}".format(path))
+        return matrix
+
+    def put(self, algorithm, key, matrix):
+        '''
+        Stores the `matrix` that `algorithm` computed for the graph with key
+        `key`, and evicts old results if the cache grew too large.
+        '''
+        path = self._path(algorithm, key)
+        matfile.write(path, matrix)
+        log.debug("cache store: {}".format(path))
+        self.evict()
+
+    def evict(self):
+        '''
+        Removes the least recently used results until the cache fits in
+        `max_bytes`.
+        '''
+        entries, total = [], 0
+        for name in os.listdir(self._directory):
+            if not name.endswith(".mat"):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path, st.st_size))
+            total += st.st_size
+
+        for (mtime, path, size) in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            log.debug("cache evict: {}".format(path))
+            self._remove(path)
+            total -= size
+
+    def _path(self, algorithm, key):
+        return os.path.join(self._directory, "{}-{}.mat".format(key, algorithm))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
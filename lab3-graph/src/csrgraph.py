@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+import sys
+import mmap
+import struct
+import logging
+
+log = logging.getLogger(__name__)
+
+from math import inf
+from array import array
+from bisect import bisect_left
+
+#
+# Binary graph layout (native little-endian, sections aligned to 8 bytes):
+#
+#   header        magic "GRPH", version, weight type ('q' or 'd'), n, m, and
+#                 the size of the name blob in bytes
+#   name_offsets  (n+1) x int64, byte offsets of each name in the name blob
+#   names         utf-8 node names in lexicographical order, concatenated
+#   offsets       (n+1) x int64, edges of node i are at [offsets[i],offsets[i+1])
+#   weights       m x int64 or float64
+#   targets       m x int32, destination node indices
+#
+MAGIC = b"GRPH"
+VERSION = 1
+HEADER = struct.Struct("<4sHcxQQQ")
+
+def write(adjlist, path):
+    '''
+    Writes `adjlist` to `path` in the binary graph layout above.
+    '''
+    nodes, offsets, targets, weights = adjlist.adjacency_csr()
+    names, name_offsets = [], array("q", [0])
+    for name in nodes:
+        names.append(name.encode("utf-8"))
+        name_offsets.append(name_offsets[-1] + len(names[-1]))
+
+    if not isinstance(weights, array): # mixed or huge weights
+        weights = array("d", weights)
+    wtype = weights.typecode
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, wtype.encode("ascii"),
+                            len(names), len(targets), name_offsets[-1]))
+        _write_array(f, name_offsets)
+        f.write(b"".join(names))
+        f.write(b"\0" * _padding(name_offsets[-1]))
+        _write_array(f, array("q", offsets))
+        _write_array(f, weights)
+        _write_array(f, targets)
+
+def load(path):
+    '''
+    Returns a read-only CSRGraph that is backed by a memory map of `path`.
+    '''
+    return CSRGraph(path)
+
+class CSRGraph:
+    '''
+    A read-only graph in compressed sparse row (CSR) form, backed by a memory
+    mapped file in the layout written by write().  Nothing is parsed or copied
+    when the file is opened: node names are decoded on demand, and the offset,
+    target and weight arrays are memoryviews into the mapped file.
+
+    The query methods mirror those of AdjacencyList, so the algorithms accept
+    a CSRGraph wherever they only read the graph.
+    '''
+    def __init__(self, path):
+        '''
+        Maps the binary graph file `path` into memory.
+        '''
+        if sys.byteorder != "little":
+            raise ValueError("binary graphs require a little-endian host")
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError("{} is truncated".format(path))
+        magic, version, wtype, n, m, names_len = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION or wtype not in [b"q", b"d"]:
+            self._mmap.close()
+            raise ValueError("{} is not a version {} binary graph".format(path, VERSION))
+        if len(self._mmap) < _size(n, m, names_len):
+            self._mmap.close()
+            raise ValueError("{} is truncated".format(path))
+
+        self._view, pos = memoryview(self._mmap), HEADER.size
+        view = self._view
+        self._name_offsets, pos = _view(view, pos, "q", n+1)
+        self._names, pos = view[pos:pos+names_len], pos + names_len + _padding(names_len)
+        self._offsets, pos = _view(view, pos, "q", n+1)
+        self._weights, pos = _view(view, pos, wtype.decode("ascii"), m)
+        self._targets, pos = _view(view, pos, "i", m)
+
+    def close(self):
+        '''
+        Releases the memory map.  The graph must not be used afterwards.
+        '''
+        for v in [self._name_offsets, self._names, self._offsets,
+                  self._weights, self._targets]:
+            v.release()
+        self._view.release()
+        self._mmap.close()
+
+    def is_empty(self):
+        '''
+        Returns true if this graph has no nodes.
+        '''
+        return self.node_cardinality() == 0
+
+    def node_cardinality(self):
+        '''
+        Returns the number of nodes.
+        '''
+        return len(self._offsets) - 1
+
+    def edge_cardinality(self):
+        '''
+        Returns the number of edges.
+        '''
+        return len(self._targets)
+
+    def get_name(self, i):
+        '''
+        Returns the name of the i:th node.
+        '''
+        start, end = self._name_offsets[i], self._name_offsets[i+1]
+        return str(self._names[start:end], "utf-8")
+
+    def index(self, name):
+        '''
+        Returns the position of the node named `name`, or -1 if it is not a
+        member.  Names are sorted, so this is a binary search.
+        '''
+        lo, hi = 0, self.node_cardinality()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.get_name(mid) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.node_cardinality() and self.get_name(lo) == name:
+            return lo
+        return -1
+
+    def find_node(self, name):
+        '''
+        Returns True if the node named `name` is a member.
+        '''
+        return self.index(name) != -1
+
+    def find_edge(self, src, dst):
+        '''
+        Returns True if there's an edge from node `src` to node `dst`.
+        '''
+        i, j = self.index(src), self.index(dst)
+        if i == -1 or j == -1:
+            return False
+        lo, hi = self._offsets[i], self._offsets[i+1]
+        k = bisect_left(self._targets, j, lo, hi)
+        return k < hi and self._targets[k] == j
+
+    def neighbours(self, name):
+        '''
+        Returns an iterator over (dst, weight) for all edges from node `name`.
+        '''
+        i = self.index(name)
+        for k in range(self._offsets[i], self._offsets[i+1]):
+            yield self.get_name(self._targets[k]), self._weights[k]
+
+    def iter_neighbours(self):
+        '''
+        Returns an iterator over (name, neighbours) for all nodes in
+        lexicographical order, see AdjacencyList.  Names are decoded as the
+        iterator advances.
+        '''
+        for i in range(self.node_cardinality()):
+            yield self.get_name(i), [ (self.get_name(self._targets[k]), self._weights[k])
+                for k in range(self._offsets[i], self._offsets[i+1]) ]
+
+    def self_loops(self):
+        '''
+        Returns the number of nodes that have an edge towards themselves.
+        '''
+        loops = 0
+        for i in range(self.node_cardinality()):
+            lo, hi = self._offsets[i], self._offsets[i+1]
+            k = bisect_left(self._targets, i, lo, hi)
+            if k < hi and self._targets[k] == i:
+                loops += 1
+        return loops
+
+    def list_nodes(self):
+        '''
+        Returns a list of node names in lexicographical order.
+        '''
+        return [ self.get_name(i) for i in range(self.node_cardinality()) ]
+
+    def iter_edges(self):
+        '''
+        Returns an iterator over all edges in lexicographical order.
+        '''
+        names = self.list_nodes()
+        for i, src in enumerate(names):
+            for k in range(self._offsets[i], self._offsets[i+1]):
+                yield src, names[self._targets[k]], self._weights[k]
+
+    def list_edges(self):
+        '''
+        Returns a list of edges in lexicographical order.
+        '''
+        return list(self.iter_edges())
+
+    def adjacency_matrix(self):
+        '''
+        Returns this graph as an adjacency matrix, see AdjacencyList.
+        '''
+        n = self.node_cardinality()
+        if n == 0:
+            return [[]]
+        matrix = [ [inf]*n for i in range(n) ]
+        for i in range(n):
+            row = matrix[i]
+            for k in range(self._offsets[i], self._offsets[i+1]):
+                row[self._targets[k]] = self._weights[k]
+        return matrix
+
+    def adjacency_csr(self):
+        '''
+        Returns (nodes, offsets, targets, weights) as in AdjacencyList, where
+        the last three are zero-copy views into the mapped file.
+        '''
+        return self.list_nodes(), self._offsets, self._targets, self._weights
+
+def _size(n, m, names_len):
+    '''
+    Returns the size in bytes of a binary graph with `n` nodes, `m` edges and
+    a name blob of `names_len` bytes, excluding the padding at the end.
+    '''
+    size = HEADER.size
+    for section in [8*(n+1), names_len, 8*(n+1), 8*m]:
+        size += section + _padding(section)
+    return size + 4*m
+
+def _view(view, pos, typecode, count):
+    '''
+    Returns a typed memoryview of `count` items at byte offset `pos`, and the
+    aligned offset of the next section.
+    '''
+    size = array(typecode).itemsize * count
+    return view[pos:pos+size].cast(typecode), pos + size + _padding(size)
+
+def _write_array(f, a):
+    '''
+    Writes the array `a` followed by zero padding up to an 8-byte boundary.
+    '''
+    a.tofile(f)
+    f.write(b"\0" * _padding(a.itemsize * len(a)))
+
+def _padding(size):
+    '''
+    Returns the number of bytes that aligns `size` to 8 bytes.
+    '''
+    return -size % 8
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import csv
+import logging
+
+log = logging.getLogger(__name__)
+
+from adjlist import AdjacencyList
+import csrgraph
+
+CHUNK_SIZE = 1 << 16
+
+def file_format(path):
+    '''
+    Returns the file format that is implied by the extension of `path`: csv,
+    tsv, binary (see csrgraph), or edgelist (whitespace-separated) for all
+    other extensions.
+    '''
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".bin":
+        return "binary"
+    if ext == ".csv":
+        return "csv"
+    if ext == ".tsv":
+        return "tsv"
+    return "edgelist"
+
+def read_edges(f, fmt="edgelist", chunk_size=CHUNK_SIZE):
+    '''
+    Returns an iterator over (src, dst, weight) tuples read from the text file
+    `f` in chunks of `chunk_size` characters.
+
+    Each line contains a source node, an optional destination node and an
+    optional weight, e.g., "a b 3" in the edgelist format or "a,b,3" in csv.
+    The weight defaults to 1, and a line with a single node name yields
+    (src, None, None) to declare a node without edges.  Blank lines and lines
+    starting with '#' are skipped.
+    '''
+    lines = _read_lines(f, chunk_size)
+    if fmt == "csv":
+        rows = csv.reader(lines)
+    elif fmt == "tsv":
+        rows = csv.reader(lines, delimiter="\t")
+    else:
+        rows = (line.split() for line in lines)
+
+    for lineno, row in enumerate(rows, 1):
+        if len(row) == 0 or row[0].startswith("#"):
+            continue
+        if len(row) == 1:
+            yield row[0], None, None
+        elif len(row) == 2:
+            yield row[0], row[1], 1
+        elif len(row) == 3:
+            yield row[0], row[1], _parse_weight(row[2], lineno)
+        else:
+            raise ValueError("line {}: expected 1-3 fields, got {}".format(
+                lineno, len(row)))
+
+def write_edges(adjlist, f, fmt="edgelist"):
+    '''
+    Writes all edges of `adjlist` to the text file `f`, one per line, in a
+    format that read_edges() understands.  Nodes without outgoing edges are
+    written as a single node name.
+
+    Lines are produced while the adjacency list is walked, i.e., the edges are
+    never collected into a list.
+    '''
+    if fmt in ["csv", "tsv"]:
+        out = csv.writer(f, delimiter="," if fmt == "csv" else "\t",
+                         lineterminator="\n")
+        write = out.writerow
+    else:
+        write = lambda row: f.write(" ".join([ str(v) for v in row ]) + "\n")
+
+    head = adjlist.get_head()
+    while not head.is_empty():
+        edge = head.get_edges()
+        if edge.is_empty():
+            write([head.get_name()])
+        while not edge.is_empty():
+            write([head.get_name(), edge.get_dst(), edge.get_weight()])
+            edge = edge.get_tail()
+        head = head.get_tail()
+
+def load(path, adjlist=None, undirected=False):
+    '''
+    Reads the graph in `path` and adds its nodes and edges to `adjlist`, or to
+    a new adjacency list if it is None.  Nodes that are only mentioned as edge
+    endpoints are added as well.  If `undirected` is True, each edge is also
+    added in the reverse direction.
+
+    Returns an adjacency list head.
+    '''
+    if adjlist is None:
+        adjlist = AdjacencyList()
+    if file_format(path) == "binary":
+        g = csrgraph.load(path)
+        try:
+            edges = g.list_edges()
+            if undirected:
+                edges += [ (dst, src, weight) for (src, dst, weight) in edges ]
+            return adjlist.extend(g.list_nodes(), edges)
+        finally:
+            g.close()
+
+    nodes, edges = [], []
+    with open(path, newline="") as f:
+        for (src, dst, weight) in read_edges(f, file_format(path)):
+            nodes.append(src)
+            if dst is None:
+                continue
+            nodes.append(dst)
+            edges.append((src, dst, weight))
+            if undirected:
+                edges.append((dst, src, weight))
+    log.debug("read {} nodes and {} edges from {}".format(
+        len(set(nodes)), len(edges), path))
+    return adjlist.extend(nodes, edges)
+
+def save(adjlist, path):
+    '''
+    Writes `adjlist` to `path`, using the format implied by its extension.
+    '''
+    if file_format(path) == "binary":
+        adjlist.save_binary(path)
+        return
+    with open(path, "w", newline="", buffering=CHUNK_SIZE) as f:
+        write_edges(adjlist, f, file_format(path))
+
+def _read_lines(f, chunk_size):
+    '''
+    Returns an iterator over the lines in `f`, reading `chunk_size` characters
+    at a time.
+    '''
+    rest = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        lines = (rest + chunk).splitlines(True)
+        rest = lines.pop() if not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    if rest:
+        yield rest
+
+def _parse_weight(buf, lineno):
+    '''
+    Returns `buf` as an int, or as a float if it is not an integer.
+    '''
+    try:
+        return int(buf)
+    except ValueError:
+        pass
+    try:
+        return float(buf)
+    except ValueError:
+        raise ValueError("line {}: invalid weight '{}'".format(lineno, buf))
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
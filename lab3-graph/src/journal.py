@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+#
+# A journal entry is a tuple (version, op, args), where `op` is the name of
+# the AdjacencyList method that was called and `args` are its arguments:
+#
+#   add_node     (name, info)
+#   delete_node  (name,)
+#   add_edge     (src, dst, weight)
+#   delete_edge  (src, dst)
+#   delete_edges (name,)
+#
+# All mutations that were applied together, e.g., by a batch, share a version.
+#
+
+class Journal:
+    '''
+    An append-only log of the mutations of an adjacency list, which lets a
+    consumer that derived something from version v catch up by applying the
+    changes since v instead of recomputing from scratch.
+
+    At most `retain` entries are kept.  When the journal grows beyond that,
+    it is first compacted, i.e., edge updates that are overridden by a later
+    update of the same edge are dropped.  If that is not enough, the oldest
+    entries are dropped, and changes_since() returns None for versions that
+    they were needed for.
+    '''
+    def __init__(self, version=0, retain=4096):
+        '''
+        Initializes an empty journal for an adjacency list at `version`.
+        '''
+        self._entries = []
+        self._floor = version # changes after this version are all retained
+        self._retain = max(retain, 1)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def oldest(self):
+        '''
+        Returns the oldest version that changes_since() can catch up from.
+        '''
+        return self._floor
+
+    def append(self, version, op, args):
+        '''
+        Records that `op` was applied with `args`, producing `version`.
+        '''
+        self._entries.append((version, op, args))
+        if len(self._entries) > self._retain:
+            self.compact()
+            excess = len(self._entries) - self._retain // 2
+            if excess > 0:
+                self._floor = self._entries[excess-1][0]
+                # entries that share the floor version are incomplete now
+                while excess < len(self._entries) and \
+                        self._entries[excess][0] == self._floor:
+                    excess += 1
+                log.debug("journal dropped {} entries up to version {}".format(
+                    excess, self._floor))
+                del self._entries[:excess]
+
+    def changes_since(self, version):
+        '''
+        Returns a list of the entries that were recorded after `version`, in
+        order, or None if some of them are no longer retained.
+        '''
+        if version < self._floor:
+            return None
+        lo, hi = 0, len(self._entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entries[mid][0] <= version:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._entries[lo:]
+
+    def compact(self):
+        '''
+        Drops every add_edge/delete_edge entry that a later add_edge or
+        delete_edge of the same (src, dst) overrides.  Node operations on src
+        or dst in between act as barriers, since they may change the outcome.
+        '''
+        later, kept = set(), []
+        for entry in reversed(self._entries):
+            version, op, args = entry
+            if op in ["add_edge", "delete_edge"]:
+                key = (args[0], args[1])
+                if key in later:
+                    continue
+                later.add(key)
+            else:
+                name = args[0]
+                later = { key for key in later if name not in key }
+            kept.append(entry)
+        kept.reverse()
+        if len(kept) < len(self._entries):
+            log.debug("journal compacted {} entries into {}".format(
+                len(self._entries), len(kept)))
+        self._entries = kept
+
+def replay(adjlist, changes):
+    '''
+    Applies the journal entries `changes` to `adjlist`, e.g., to keep a copy
+    of another adjacency list in sync.
+
+    Returns an adjacency list head.
+    '''
+    for (version, op, args) in changes:
+        adjlist = getattr(adjlist, op)(*args)
+    return adjlist
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import mmap
+import struct
+import logging
+
+log = logging.getLogger(__name__)
+
+from math import inf
+from array import array
+
+#
+# Binary matrix layout (native little-endian):
+#
+#   header  magic "GMAT", version, item type, and n
+#   items   n x n items in row-major order, where the item type is one of
+#           'b' (bool), 'q' (int64, INT_INF for inf) or 'd' (float64)
+#
+MAGIC = b"GMAT"
+VERSION = 1
+HEADER = struct.Struct("<4sHcxQ")
+INT_INF = 2**63 - 1
+
+def typecode(matrix):
+    '''
+    Returns the most compact item type that represents `matrix` exactly.
+    '''
+    code = "b"
+    for row in matrix:
+        for v in row:
+            if type(v) is bool:
+                continue
+            if type(v) is not int and v != inf:
+                return "d"
+            code = "q"
+    return code
+
+def write(path, matrix):
+    '''
+    Writes the NxN list-of-lists `matrix` to `path`.  The file is written
+    under a temporary name first, so a reader never sees a partial matrix.
+    '''
+    code, n = typecode(matrix), len(matrix)
+    if n == 1 and len(matrix[0]) == 0:
+        n = 0 # the [[]] of an empty adjacency list
+
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, code.encode("ascii"), n))
+        for row in matrix[:n]:
+            if code == "q":
+                row = [ INT_INF if v == inf else v for v in row ]
+            array(code, row).tofile(f)
+    os.replace(tmp, path)
+
+def create(path, n, code, fill=0):
+    '''
+    Creates an n x n matrix file at `path` with all items set to `fill`, and
+    returns it as a writable MatrixFile.  The file is filled one row at a
+    time, so no n x n structure is ever held in memory.
+    '''
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, code.encode("ascii"), n))
+        row = array(code, [fill]) * n
+        for _ in range(n):
+            row.tofile(f)
+    return MatrixFile(path, writable=True)
+
+def load(path):
+    '''
+    Returns a read-only MatrixFile that is backed by a memory map of `path`.
+    '''
+    return MatrixFile(path)
+
+class MatrixFile:
+    '''
+    An NxN matrix backed by a memory-mapped file in the layout written by
+    write().  Rows are decoded on access, so the matrix behaves like the
+    list-of-lists that it was created from: inf is restored for missing paths
+    and bool matrices yield True/False.  Iterating yields one row at a time.
+    '''
+    def __init__(self, path, writable=False):
+        '''
+        Maps the matrix file `path` into memory, read-only unless `writable`.
+        '''
+        if sys.byteorder != "little":
+            raise ValueError("binary matrices require a little-endian host")
+        with open(path, "r+b" if writable else "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0,
+                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+        magic, version, code, n = HEADER.unpack_from(self._mmap)
+        code = code.decode("ascii")
+        if magic != MAGIC or version != VERSION or code not in "bqd":
+            self._mmap.close()
+            raise ValueError("{} is not a version {} matrix".format(path, VERSION))
+
+        self._n, self._code = n, code
+        self._view = memoryview(self._mmap)
+        self._items = self._view[HEADER.size:].cast(code)
+        self._rows = None
+        if len(self._items) != n*n:
+            self.close()
+            raise ValueError("{} is truncated".format(path))
+
+    def close(self):
+        '''
+        Releases the memory map.  The matrix must not be used afterwards.
+        '''
+        for row in self._rows or []:
+            row.release()
+        self._items.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return self._n
+
+    def typecode(self):
+        '''
+        Returns the item type, i.e., 'b', 'q' or 'd'.
+        '''
+        return self._code
+
+    def rows(self):
+        '''
+        Returns a list of memoryviews, one per row, into the mapped file.  They
+        are writable if the file was opened as writable, and items are raw,
+        i.e., INT_INF is not decoded.
+        '''
+        if self._rows is None:
+            n = self._n
+            self._rows = [ self._items[i*n:(i+1)*n] for i in range(n) ]
+        return self._rows
+
+    def flush(self):
+        '''
+        Writes modified rows back to the file.
+        '''
+        self._mmap.flush()
+
+    def __getitem__(self, i):
+        '''
+        Returns the i:th row as a list.
+        '''
+        if i < 0:
+            i += self._n
+        if i < 0 or i >= self._n:
+            raise IndexError("row index out of range")
+        row = self._items[i*self._n:(i+1)*self._n]
+        if self._code == "b":
+            return [ v != 0 for v in row ]
+        if self._code == "q":
+            return [ inf if v == INT_INF else v for v in row ]
+        return row.tolist()
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def tolist(self):
+        '''
+        Returns the matrix as a list-of-lists, i.e., like floyd() or warshall().
+        '''
+        if self._n == 0:
+            return [[]]
+        return list(self)
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+from array import array
+from bisect import bisect_right
+
+class ReachabilityIndex:
+    '''
+    A compressed reachability index that answers the same questions as the
+    matrix returned by warshall(), i.e., is there a path from `src` to `dst`,
+    without storing n x n booleans.
+
+    The graph is first condensed into its strongly connected components (SCCs),
+    which gives a DAG.  Each component is then labeled with a sorted set of
+    post-order intervals based on a spanning forest of that DAG (tree cover).
+    A component reaches another component iff the latter's post-order number
+    falls into one of the former's intervals.
+
+    Sparse and tree-like graphs need about one interval per component, and a
+    query is two dict lookups plus a binary search.
+    '''
+    def __init__(self, adjlist):
+        '''
+        Builds the index for `adjlist`.  The index is a snapshot, i.e., later
+        modifications of `adjlist` are not reflected.
+        '''
+        self._nodes = adjlist.list_nodes()
+        self._index = { name: i for i, name in enumerate(self._nodes) }
+
+        succ = [ [] for _ in self._nodes ]
+        for (src, dst, weight) in adjlist.list_edges():
+            if dst in self._index: # not an edge towards a deleted node
+                succ[self._index[src]].append(self._index[dst])
+
+        self._comp, num_comps = self._components(succ)
+        self._label(succ, num_comps)
+
+    def reaches(self, src, dst):
+        '''
+        Returns True if there is a path from node `src` to node `dst`.  Like
+        warshall(), every node reaches itself.  Nodes that are not members of
+        the indexed adjacency list reach nothing and are never reached.
+        '''
+        if src not in self._index or dst not in self._index:
+            return False
+        cs = self._comp[self._index[src]]
+        cd = self._comp[self._index[dst]]
+        if cs == cd:
+            return True
+
+        post = self._post[cd]
+        lo, hi = self._offsets[cs], self._offsets[cs+1]
+        k = bisect_right(self._starts, post, lo, hi) - 1
+        return k >= lo and post <= self._ends[k]
+
+    def node_cardinality(self):
+        '''
+        Returns the number of indexed nodes.
+        '''
+        return len(self._nodes)
+
+    def component_cardinality(self):
+        '''
+        Returns the number of strongly connected components.
+        '''
+        return len(self._post)
+
+    def size(self):
+        '''
+        Returns the number of stored intervals, i.e., the size of the index
+        labels.  Compare with n*n for the matrix returned by warshall().
+        '''
+        return len(self._starts)
+
+    def nbytes(self):
+        '''
+        Returns the number of bytes used by the index arrays, excluding the
+        node name table.
+        '''
+        return sum([ a.itemsize * len(a) for a in [
+            self._comp, self._post, self._offsets, self._starts, self._ends,
+        ]])
+
+    def _components(self, succ):
+        '''
+        Returns (comp, count) where comp[i] is the SCC id of the i:th node.
+
+        This is an iterative version of Tarjan's algorithm.  Components are
+        numbered in reverse topological order, i.e., sinks come first.
+        '''
+        n = len(succ)
+        comp = array("i", [-1]) * n
+        order = array("i", [-1]) * n
+        low = array("i", [0]) * n
+        on_stack = [False] * n
+        stack, count, counter = [], 0, 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, pos = work.pop()
+                if pos == 0:
+                    order[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                elif low[succ[v][pos-1]] < low[v] and on_stack[succ[v][pos-1]]:
+                    low[v] = low[succ[v][pos-1]]
+
+                while pos < len(succ[v]):
+                    w = succ[v][pos]
+                    pos += 1
+                    if order[w] == -1:
+                        work.append((v, pos))
+                        work.append((w, 0))
+                        break
+                    if on_stack[w] and order[w] < low[v]:
+                        low[v] = order[w]
+                else:
+                    if low[v] == order[v]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            comp[w] = count
+                            if w == v:
+                                break
+                        count += 1
+        return comp, count
+
+    def _label(self, succ, num_comps):
+        '''
+        Computes post-order numbers and interval labels for all components.
+        '''
+        dag = [ set() for _ in range(num_comps) ]
+        has_pred = [False] * num_comps
+        for v, targets in enumerate(succ):
+            for w in targets:
+                if self._comp[v] != self._comp[w]:
+                    dag[self._comp[v]].add(self._comp[w])
+                    has_pred[self._comp[w]] = True
+        dag = [ sorted(targets) for targets in dag ]
+
+        # Spanning forest in post-order, each tree node covers [first, post]
+        post = array("i", [-1]) * num_comps
+        first = array("i", [0]) * num_comps
+        counter = 0
+        for root in reversed(range(num_comps)):
+            if has_pred[root] or post[root] != -1:
+                continue
+            post[root] = -2 # visiting
+            work = [(root, 0, counter)]
+            while work:
+                c, pos, start = work.pop()
+                while pos < len(dag[c]):
+                    d = dag[c][pos]
+                    pos += 1
+                    if post[d] == -1:
+                        post[d] = -2
+                        work.append((c, pos, start))
+                        work.append((d, 0, counter))
+                        break
+                else:
+                    first[c], post[c] = start, counter
+                    counter += 1
+
+        # Components are numbered sinks first, so successors are labeled first
+        labels = []
+        for c in range(num_comps):
+            intervals = [(first[c], post[c])]
+            for d in dag[c]:
+                intervals += labels[d]
+            labels.append(self._merge(intervals))
+
+        self._post = post
+        self._offsets = array("i", [0])
+        self._starts, self._ends = array("i"), array("i")
+        for intervals in labels:
+            for (start, end) in intervals:
+                self._starts.append(start)
+                self._ends.append(end)
+            self._offsets.append(len(self._starts))
+
+    def _merge(self, intervals):
+        '''
+        Returns a sorted list of disjoint intervals that covers `intervals`.
+        Adjacent intervals are joined since post-order numbers are dense.
+        '''
+        intervals.sort()
+        merged = [intervals[0]]
+        for (start, end) in intervals[1:]:
+            last_start, last_end = merged[-1]
+            if start <= last_end + 1:
+                if end > last_end:
+                    merged[-1] = (last_start, end)
+            else:
+                merged.append((start, end))
+        return merged
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+from math import inf
+from concurrent.futures import ThreadPoolExecutor
+
+import worker
+from adjlist import AdjacencyList, UndirectedAdjacencyList
+from algorithm import dijkstra, prim, warshall, floyd
+
+#
+# Line-delimited JSON protocol: each request is one line with an object
+#
+#   {"id": 1, "op": "add_edge", "args": {"src": "a", "dst": "b", "weight": 3}}
+#
+# and each response is one line with the same id and either a result or an
+# error, e.g., {"id": 1, "result": null} or {"id": 1, "error": "..."}.  Since
+# inf is not valid JSON, it is sent as null.
+#
+# Requests on a connection are applied in order, and clients may pipeline
+# them, i.e., send more requests before the responses have arrived.  The
+# algorithms run in worker processes on a snapshot of the graph at the time
+# their request was read, so their responses may overtake those of later
+# requests.  The processes are forked, see worker.run(), from the threads of an
+# executor, which bounds how many algorithms run at once.
+#
+MAX_LINE = 2**20 # longest accepted request in bytes
+DRAIN_SIZE = 2**16 # wait for slow clients when this much output is buffered
+
+class GraphServer:
+    '''
+    Serves one graph to any number of clients, see the protocol above.
+    '''
+    def __init__(self, mode="directed", executor=None):
+        '''
+        Initializes an empty graph in mode "directed" or "undirected".  The
+        worker processes of the algorithms are waited for in `executor`, or in
+        a new thread pool if it is None.
+        '''
+        self._mode = mode if mode == "directed" else "undirected"
+        if self._mode == "directed":
+            self._adjlist = AdjacencyList()
+        else:
+            self._adjlist = UndirectedAdjacencyList()
+        self._executor = ThreadPoolExecutor() if executor is None else executor
+        self._snapshot = None # snapshot of the current version, if taken
+        self._ops = {
+            "add_node": self.add_node,
+            "delete_node": self.delete_node,
+            "add_edge": self.add_edge,
+            "delete_edge": self.delete_edge,
+            "find_node": self.find_node,
+            "find_edge": self.find_edge,
+            "list_nodes": self.list_nodes,
+            "list_edges": self.list_edges,
+            "cardinality": self.cardinality,
+        }
+        self._algorithms = {
+            "dijkstra": self.dijkstra,
+            "prim": self.prim,
+            "warshall": self.warshall,
+            "floyd": self.floyd,
+        }
+
+    def get_adjlist(self):
+        return self._adjlist
+
+    def set_adjlist(self, adjlist):
+        self._adjlist = adjlist
+
+    async def serve(self, host=None, port=None, path=None):
+        '''
+        Accepts clients on the Unix socket `path`, or on TCP `host`:`port`,
+        until cancelled.
+        '''
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        for sock in server.sockets:
+            log.info("listening on {}".format(sock.getsockname()))
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        '''
+        Serves the requests of one client until it disconnects.
+        '''
+        peer = writer.get_extra_info("peername")
+        log.debug("client connected: {}".format(peer))
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    self.send(writer, None, None, "request too long")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                request, err = self.parse(line)
+                if err is not None:
+                    self.send(writer, request.get("id"), None, err)
+                elif request["op"] in self._algorithms:
+                    work, err = self.prepare(request)
+                    if err is not None:
+                        self.send(writer, request.get("id"), None, err)
+                        continue
+                    task = asyncio.ensure_future(self.offload(writer, request, work))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                else:
+                    self.send(writer, request.get("id"), *self.execute(request))
+
+                if writer.transport.get_write_buffer_size() > DRAIN_SIZE:
+                    await writer.drain()
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except ConnectionError as e:
+            log.debug("client {} went away: {}".format(peer, e))
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+            log.debug("client disconnected: {}".format(peer))
+
+    def parse(self, line):
+        '''
+        Returns (request, None) for a valid request line, and (request, err)
+        otherwise, where request is {} if the line is not a JSON object.
+        '''
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {}, "invalid request (not JSON)"
+        if not isinstance(request, dict):
+            return {}, "invalid request (not an object)"
+        op, args = request.get("op"), request.get("args", {})
+        if op not in self._ops and op not in self._algorithms:
+            return request, "invalid op: {}".format(op)
+        if not isinstance(args, dict):
+            return request, "invalid args (not an object)"
+        return request, None
+
+    def execute(self, request):
+        '''
+        Applies the node or edge operation in `request`.
+
+        Returns (result, None) on success, and (None, err) otherwise.
+        '''
+        try:
+            return self._ops[request["op"]](**request.get("args", {}))
+        except TypeError as e:
+            return None, "invalid args for {}: {}".format(request["op"], e)
+
+    def prepare(self, request):
+        '''
+        Validates the algorithm in `request` and snapshots the graph for it.
+        This must happen before later requests are applied.
+
+        Returns (work, None) on success, where work(progress=None) computes
+        the result in any thread or process, and (None, err) otherwise.
+        '''
+        try:
+            return self._algorithms[request["op"]](**request.get("args", {}))
+        except TypeError as e:
+            return None, "invalid args for {}: {}".format(request["op"], e)
+
+    async def offload(self, writer, request, work):
+        '''
+        Runs work() from prepare() in a worker process, waiting for it in the
+        executor, and sends the result.
+        '''
+        loop = asyncio.get_running_loop()
+        result, err = await loop.run_in_executor(self._executor, worker.run, work, ())
+        if err is not None:
+            log.error("{} failed: {}".format(request["op"], err))
+            self.send(writer, request.get("id"), None, "{} failed: {}".format(request["op"], err))
+            return
+        self.send(writer, request.get("id"), result, None)
+
+    def send(self, writer, rid, result, err):
+        '''
+        Writes a response to the client, replacing inf with null.
+        '''
+        if err is not None:
+            response = { "id": rid, "error": err }
+        else:
+            response = { "id": rid, "result": _finite(result) }
+        if not writer.is_closing():
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+
+    ###
+    # Node and edge operations, which return (result, err)
+    ###
+    def add_node(self, name):
+        if not isinstance(name, str) or name == "":
+            return None, "invalid node name"
+        self._adjlist = self._adjlist.add_node(name)
+        return None, None
+
+    def delete_node(self, name):
+        if not self._adjlist.find_node(name):
+            return None, "node '{}' is a non-member".format(name)
+        self._adjlist = self._adjlist.delete_edges(name)
+        self._adjlist = self._adjlist.delete_node(name)
+        return None, None
+
+    def add_edge(self, src, dst, weight=1):
+        for name in [src, dst]:
+            if not self._adjlist.find_node(name):
+                return None, "node '{}' is a non-member".format(name)
+        if type(weight) not in [int, float]:
+            return None, "invalid weight"
+        self._adjlist = self._adjlist.add_edge(src, dst, weight)
+        return None, None
+
+    def delete_edge(self, src, dst):
+        if not self._adjlist.find_edge(src, dst):
+            return None, "edge ({},{}) is non-member".format(src, dst)
+        self._adjlist = self._adjlist.delete_edge(src, dst)
+        return None, None
+
+    def find_node(self, name):
+        return self._adjlist.find_node(name), None
+
+    def find_edge(self, src, dst):
+        return self._adjlist.find_edge(src, dst), None
+
+    def list_nodes(self):
+        return self._adjlist.list_nodes(), None
+
+    def list_edges(self):
+        return list(self._adjlist.iter_edges()), None
+
+    def cardinality(self):
+        return {
+            "nodes": self._adjlist.node_cardinality(),
+            "edges": self._adjlist.edge_cardinality(),
+        }, None
+
+    ###
+    # Algorithms, which return (work, err) where work() runs in a worker
+    ###
+    def dijkstra(self, start):
+        if not self._adjlist.find_node(start):
+            return None, "node '{}' is a non-member".format(start)
+        snapshot = self.snapshot()
+        def work(progress=None):
+            dist, prev = dijkstra(snapshot, start)
+            return { "nodes": snapshot.list_nodes(), "distance": dist, "previous": prev }
+        return work, None
+
+    def prim(self, start):
+        if self._mode == "directed":
+            return None, "invalid graph mode"
+        if not self._adjlist.find_node(start):
+            return None, "node '{}' is a non-member".format(start)
+        snapshot = self.snapshot()
+        def work(progress=None):
+            lowcost, closest = prim(snapshot, start)
+            return { "nodes": snapshot.list_nodes(), "lowcost": lowcost, "closest": closest }
+        return work, None
+
+    def warshall(self):
+        snapshot = self.snapshot()
+        def work(progress=None):
+            return { "nodes": snapshot.list_nodes(), "paths": warshall(snapshot, progress) }
+        return work, None
+
+    def floyd(self):
+        snapshot = self.snapshot()
+        def work(progress=None):
+            return { "nodes": snapshot.list_nodes(), "paths": floyd(snapshot, progress=progress) }
+        return work, None
+
+    def snapshot(self):
+        '''
+        Returns a snapshot of the current version, reusing the last one if the
+        graph has not changed since.
+        '''
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.get_version() != self._adjlist.get_version():
+            snapshot = self._snapshot = self._adjlist.snapshot()
+        return snapshot
+
+def _finite(value):
+    '''
+    Returns `value` with inf replaced by None in (nested) lists and dicts.
+    '''
+    if isinstance(value, float) and value == inf:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [ _finite(v) for v in value ]
+    if isinstance(value, dict):
+        return { k: _finite(v) for k, v in value.items() }
+    return value
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
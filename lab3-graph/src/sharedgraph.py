@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+from contextlib import contextmanager
+
+from adjlist import AdjacencyList
+
+class RWLock:
+    '''
+    A reader/writer lock: any number of readers may hold it at the same
+    time, but a writer holds it alone.  Waiting writers block new readers,
+    so that a steady stream of reads cannot starve the writer.
+
+    The lock is not reentrant, i.e., a thread must not acquire it again
+    while holding it.
+    '''
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0 # number of threads that hold a read lock
+        self._writer = False # True if a thread holds the write lock
+        self._waiting = 0 # number of threads that wait for the write lock
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def reading(self):
+        '''
+        Returns a context manager that holds a read lock.
+        '''
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        '''
+        Returns a context manager that holds the write lock.
+        '''
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class SharedGraph:
+    '''
+    An adjacency list that writer threads may update while other threads
+    read it.  There are two ways to read:
+
+    1) The query methods, e.g., find_edge(), and read() hold a read lock, so
+    reads run concurrently with each other but never during a write.
+    2) snapshot() returns an immutable adjlist.Snapshot that can be used
+    without any locking, e.g., for a long floyd() run.  Taking it holds the
+    write lock briefly, and it is reused until the next write.
+
+    Writes hold the write lock, and so does a batch() for its whole block.
+    '''
+    def __init__(self, adjlist=None):
+        '''
+        Shares `adjlist`, or a new adjacency list if it is None.  The caller
+        must not use `adjlist` directly afterwards.
+        '''
+        self._adjlist = AdjacencyList() if adjlist is None else adjlist
+        self._lock = RWLock()
+        self._snapshot = None # snapshot of the current version, if taken
+
+    ###
+    # Writes
+    ###
+    def add_node(self, name, info=None):
+        self._write("add_node", name, info)
+
+    def delete_node(self, name):
+        self._write("delete_node", name)
+
+    def add_edge(self, src, dst, weight=1):
+        self._write("add_edge", src, dst, weight)
+
+    def delete_edge(self, src, dst):
+        self._write("delete_edge", src, dst)
+
+    def delete_edges(self, name):
+        self._write("delete_edges", name)
+
+    def extend(self, nodes=(), edges=()):
+        self._write("extend", nodes, edges)
+
+    @contextmanager
+    def batch(self):
+        '''
+        Returns a context manager that holds the write lock and yields the
+        adjacency list for mutations that are applied as one batch, see
+        AdjacencyList.batch().  Readers never see a partial batch.
+        '''
+        with self._lock.writing():
+            with self._adjlist.batch():
+                yield self._adjlist
+            self._snapshot = None
+
+    def _write(self, op, *args):
+        with self._lock.writing():
+            self._adjlist = getattr(self._adjlist, op)(*args)
+            self._snapshot = None
+
+    ###
+    # Reads
+    ###
+    def read(self, func, *args):
+        '''
+        Returns func(adjlist, *args) evaluated under a read lock, e.g.,
+        shared.read(dijkstra, "a").
+        '''
+        with self._lock.reading():
+            return func(self._adjlist, *args)
+
+    def get_version(self):
+        return self._query("get_version")
+
+    def find_node(self, name):
+        return self._query("find_node", name)
+
+    def find_edge(self, src, dst):
+        return self._query("find_edge", src, dst)
+
+    def node_cardinality(self):
+        return self._query("node_cardinality")
+
+    def edge_cardinality(self):
+        return self._query("edge_cardinality")
+
+    def list_nodes(self):
+        return self._query("list_nodes")
+
+    def list_edges(self):
+        return self._query("list_edges")
+
+    def adjacency_matrix(self):
+        return self._query("adjacency_matrix")
+
+    def snapshot(self):
+        '''
+        Returns an adjlist.Snapshot of the current version.
+        '''
+        with self._lock.reading():
+            snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock.writing():
+            if self._snapshot is None:
+                self._snapshot = self._adjlist.snapshot()
+            return self._snapshot
+
+    def _query(self, op, *args):
+        with self._lock.reading():
+            return getattr(self._adjlist, op)(*args)
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
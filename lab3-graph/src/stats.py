@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import logging
+import functools
+
+log = logging.getLogger(__name__)
+
+#
+# Opt-in instrumentation of adjacency lists and algorithms.  While disabled,
+# timed methods are not wrapped at all, and timed functions check a flag per
+# call.  Hot loops count in local variables, or not at all, and only add to
+# the counters below if `enabled` is set.
+#
+# Counters:
+#
+#   list_steps        cells and edges passed while walking linked lists
+#   edge_relaxations  edges that were examined by Dijkstra or Prim
+#   heap_pushes       entries pushed to a priority queue
+#   heap_pops         entries popped from a priority queue
+#   matrix_cells      cells that a matrix algorithm initialized or updated
+#
+enabled = False
+_counts = {}
+_timings = {} # name -> [calls, seconds]
+_methods = [] # (class, name, method) for all timed methods
+
+def enable(on=True):
+    '''
+    Turns instrumentation on, or off if `on` is False.  Collected values are
+    kept either way, see reset().
+    '''
+    global enabled
+    enabled = on
+    for owner, name, method in _methods:
+        setattr(owner, name, _timer(method) if on else method)
+
+def reset():
+    '''
+    Discards all collected values.
+    '''
+    _counts.clear()
+    _timings.clear()
+
+def count(name, n=1):
+    '''
+    Adds `n` to the counter `name`.  Callers check `enabled` first.
+    '''
+    _counts[name] = _counts.get(name, 0) + n
+
+def timed(func):
+    '''
+    Decorates a method or module-level function so that its calls and wall
+    time are recorded under its qualified name while instrumentation is
+    enabled.  Nested timed calls are recorded too, i.e., times are inclusive.
+
+    A method stays unwrapped until enable() installs a timer in its class.
+    A function is wrapped right away, since it may be imported by name.
+    '''
+    if "." in func.__qualname__:
+        return _Method(func)
+    timer = _timer(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        return timer(*args, **kwargs)
+    return wrapper
+
+class _Method:
+    '''
+    A placeholder that registers a timed method when its class is created,
+    and puts the plain method in its place, see timed().
+    '''
+    def __init__(self, func):
+        self._func = func
+
+    def __set_name__(self, owner, name):
+        setattr(owner, name, _timer(self._func) if enabled else self._func)
+        _methods.append((owner, name, self._func))
+
+def _timer(func):
+    '''
+    Returns `func` wrapped so that its calls and wall time are recorded.
+    '''
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def timer(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timing = _timings.get(name)
+            if timing is None:
+                timing = _timings[name] = [0, 0.0]
+            timing[0] += 1
+            timing[1] += time.perf_counter() - t0
+    return timer
+
+def stats():
+    '''
+    Returns a snapshot of the collected values as a dict:
+
+    {
+        "counts": { name: count },
+        "timings": { name: { "calls": calls, "seconds": seconds } },
+    }
+    '''
+    return {
+        "counts": dict(_counts),
+        "timings": { name: { "calls": calls, "seconds": seconds }
+                     for name, (calls, seconds) in _timings.items() },
+    }
+
+def merge(snapshot):
+    '''
+    Adds the values of a stats() snapshot, e.g., from a worker process.
+    '''
+    for name, n in snapshot["counts"].items():
+        count(name, n)
+    for name, timing in snapshot["timings"].items():
+        total = _timings.setdefault(name, [0, 0.0])
+        total[0] += timing["calls"]
+        total[1] += timing["seconds"]
+
+def report(snapshot=None):
+    '''
+    Returns a printable table of a stats() snapshot, or of the current values,
+    with operations ordered by total time.
+    '''
+    snapshot = stats() if snapshot is None else snapshot
+    timings = sorted(snapshot["timings"].items(), key=lambda t: -t[1]["seconds"])
+    width = max([9] + [ len(name) for name, _ in timings ] +
+                [ len(name) for name in snapshot["counts"] ])
+    lines = [ "{: <{w}} {: >9} {: >12} {: >12}".format(
+        "operation", "calls", "total ms", "mean us", w=width) ]
+    for name, t in timings:
+        lines.append("{: <{w}} {: >9} {: >12.3f} {: >12.3f}".format(name,
+            t["calls"], t["seconds"]*1e3, t["seconds"]/t["calls"]*1e6, w=width))
+    lines.append("")
+    lines.append("{: <{w}} {: >9}".format("counter", "count", w=width))
+    for name, n in sorted(snapshot["counts"].items()):
+        lines.append("{: <{w}} {: >9}".format(name, n, w=width))
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
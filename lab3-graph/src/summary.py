@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+class Summary:
+    '''
+    Summary statistics of one version of an adjacency list, computed in one
+    pass over its compressed sparse row form.  Use AdjacencyList.summary(),
+    which caches the summary until the next mutation.
+    '''
+    __slots__ = ("_nodes", "_edges", "_loops", "_degrees", "_directed")
+
+    def __init__(self, adjlist):
+        '''
+        Summarizes the adjacency list `adjlist`.
+        '''
+        nodes, offsets, targets, weights = adjlist.adjacency_csr()
+        loops, degrees = 0, {}
+        for i in range(len(nodes)):
+            lo, hi = offsets[i], offsets[i+1]
+            degrees[hi-lo] = degrees.get(hi-lo, 0) + 1
+            for k in range(lo, hi):
+                if targets[k] == i:
+                    loops += 1
+
+        self._nodes = nodes
+        self._directed = adjlist.is_directed()
+        if self._directed:
+            self._edges = len(targets)
+        else:
+            self._edges = (len(targets) + loops) // 2 # only loops are listed once
+        self._loops = loops
+        self._degrees = dict(sorted(degrees.items()))
+
+    def get_nodes(self):
+        '''
+        Returns the node names in lexicographical order.  The list must not be
+        modified.
+        '''
+        return self._nodes
+
+    def get_node_cardinality(self):
+        '''
+        Returns the number of nodes.
+        '''
+        return len(self._nodes)
+
+    def get_edge_cardinality(self):
+        '''
+        Returns the number of edges, where an undirected edge counts once.
+        '''
+        return self._edges
+
+    def get_self_loops(self):
+        '''
+        Returns the number of nodes that have an edge towards themselves.
+        '''
+        return self._loops
+
+    def get_degrees(self):
+        '''
+        Returns the degree histogram, i.e., a dict that maps a degree to the
+        number of nodes with that degree, in ascending order of degrees.  The
+        degree is the out-degree in directed graphs, and the number of edges
+        at a node in undirected graphs, where a loop counts once.
+        '''
+        return self._degrees
+
+    def get_density(self):
+        '''
+        Returns the number of edges divided by the number of possible edges,
+        including loops, i.e., n*n if directed and n*(n+1)/2 otherwise.  The
+        density of an empty graph is 0.
+        '''
+        n = len(self._nodes)
+        if n == 0:
+            return 0.0
+        return self._edges / (n*n if self._directed else n*(n+1)/2)
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+from math import inf
+from array import array
+
+INT32_NONE = 2**31 - 1 # sentinel for "no edge" in int32 matrices
+
+NUMPY_DTYPES = { "b": "bool", "i": "int32", "d": "float64" }
+
+class TypedMatrix:
+    '''
+    An NxN matrix stored as one contiguous array of typecode 'b' (bool), 'i'
+    (int32) or 'd' (float64).  Compared to a list-of-lists of boxed Python
+    objects, this uses 1, 4 or 8 bytes per cell.
+
+    Integer matrices store `sentinel` where a list-of-lists would have inf.
+    Indexing decodes one row at a time, so a TypedMatrix can be handed to code
+    that expects the list-of-lists returned by adjacency_matrix(), floyd() or
+    warshall() without materializing the whole matrix.  Vectorized consumers
+    may use rows() or to_numpy() instead, which do not copy.
+    '''
+    def __init__(self, n, typecode, fill=0, sentinel=None):
+        '''
+        Allocates an n x n matrix with all cells set to `fill`.
+        '''
+        if typecode not in NUMPY_DTYPES:
+            raise ValueError("unsupported typecode: {}".format(typecode))
+        self._n = n
+        self._typecode = typecode
+        self._sentinel = sentinel
+        self._data = array(typecode, [fill]) * (n*n)
+        view = memoryview(self._data)
+        self._rows = [ view[i*n:(i+1)*n] for i in range(n) ]
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        '''
+        Returns a decoded copy of the i:th row, i.e., sentinels become inf and
+        bool cells become True/False.
+        '''
+        row = self._rows[i]
+        if self._typecode == "b":
+            return [ v != 0 for v in row ]
+        if self._sentinel is not None:
+            return [ inf if v == self._sentinel else v for v in row ]
+        return row.tolist()
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, TypedMatrix):
+            other = other.tolist()
+        return self.tolist() == other
+
+    def typecode(self):
+        '''
+        Returns the array typecode of the cells.
+        '''
+        return self._typecode
+
+    def sentinel(self):
+        '''
+        Returns the value that represents inf in an integer matrix, or None.
+        '''
+        return self._sentinel
+
+    def nbytes(self):
+        '''
+        Returns the number of bytes used by the cells.
+        '''
+        return self._data.itemsize * len(self._data)
+
+    def rows(self):
+        '''
+        Returns a list of writable memoryviews, one per row, that share memory
+        with this matrix.  Cells are raw, i.e., sentinels are not decoded.
+        '''
+        return self._rows
+
+    def tolist(self):
+        '''
+        Returns the matrix as a list-of-lists, e.g., [[]] for n=0 just like
+        adjacency_matrix() on an empty adjacency list.
+        '''
+        if self._n == 0:
+            return [[]]
+        return list(self)
+
+    def to_numpy(self):
+        '''
+        Returns an n x n NumPy array that shares memory with this matrix.
+
+        Raises ImportError if NumPy is not installed.
+        '''
+        import numpy
+        return numpy.frombuffer(self._data, dtype=NUMPY_DTYPES[self._typecode])\
+            .reshape(self._n, self._n)
+
+def empty(n, typecode, fill=0, sentinel=None, backend="array"):
+    '''
+    Returns a new TypedMatrix, checking up front that `backend` ("array" or
+    "numpy") is usable.
+    '''
+    if backend not in ["array", "numpy"]:
+        raise ValueError("unknown backend: {}".format(backend))
+    if backend == "numpy":
+        import numpy # fail before doing any work
+    return TypedMatrix(n, typecode, fill, sentinel)
+
+def result(matrix, backend):
+    '''
+    Returns `matrix` as requested by `backend`, i.e., as is for "array" and
+    as a shared-memory NumPy array for "numpy".
+    '''
+    return matrix.to_numpy() if backend == "numpy" else matrix
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
@@ -6,24 +6,50 @@ import logging
 log = logging.getLogger(__name__)
 
 from math import inf
-from adjlist import AdjacencyList
+from adjlist import AdjacencyList, UndirectedAdjacencyList
 from algorithm import dijkstra,prim,warshall,floyd
+import worker
+import graphio
+import cache
+import matfile
+import stats
 
 class TerminalUI:
-    def __init__(self, mode="directed", echo=False):
+    def __init__(self, mode="directed", echo=False, budget=None, results=None,
+                 sparse_threshold=32, script=None, out=None):
         '''
-        Selects (un)directed graph mode.
+        Selects (un)directed graph mode.  Long-running algorithms are aborted
+        after `budget` seconds, unless it is None.  Their results are reused
+        from and stored in the cache.ResultCache `results`, if provided.
+        Graphs with more than `sparse_threshold` nodes are viewed as edge
+        lists rather than as adjacency matrices.
+
+        Commands are read from the text stream `script` without prompts if it
+        is not None, and from stdin otherwise.  Output is written to the text
+        stream `out`, which defaults to stdout.
         '''
         self._mode = mode if mode=="directed" else "undirected"
         self._echo = echo
-        self._adjlist = AdjacencyList()
+        self._script = script
+        self._out = sys.stdout if out is None else out
+        self._budget = budget
+        self._results = results
+        self._sparse_threshold = sparse_threshold
+        self._hotkeys = frozenset(self.menu_hotkeys())
+        self._window = (None, sparse_threshold)
+        if self._mode == "directed":
+            self._adjlist = AdjacencyList()
+        else:
+            self._adjlist = UndirectedAdjacencyList()
         log.info("running in mode: {}".format(self._mode))
 
     def run(self):
         '''
-        Provides a terminal-based UI to perform graph operations.
+        Provides a terminal-based UI to perform graph operations.  The menu is
+        not shown on startup in script mode.
         '''
-        self.display_menu()
+        if self._script is None:
+            self.display_menu()
         while True:
             opt, err = self.get_choice()
             if err is not None:
@@ -34,6 +60,8 @@ class TerminalUI:
                 self.display_menu()
             elif opt == "v":
                 self.display_graph()
+            elif opt == "w":
+                self.set_window()
             elif opt == "a":
                 self.add_node()
             elif opt == "b":
@@ -54,6 +82,12 @@ class TerminalUI:
                 self.warshall()
             elif opt == "P":
                 self.prim()
+            elif opt == "l":
+                self.load_file()
+            elif opt == "s":
+                self.save_file()
+            elif opt == "T":
+                self.display_timings()
             elif opt == "q":
                 break
             else:
@@ -68,6 +102,7 @@ class TerminalUI:
         return [
             "m: menu",
             "v: view",
+            "w: window",
             "q: quit",
             "",
             "a: add node",
@@ -83,16 +118,21 @@ class TerminalUI:
             "F: Floyd",
             "D: Dijkstra",
             "P: Prim",
+            "",
+            "l: load file",
+            "s: save file",
+            "",
+            "T: timings",
         ]
 
     def display_menu(self):
         '''
         Shows a menu which is encapsulated between a top rule and a bottom rule.
         '''
-        print(self.menu_rule("top", self.menu_width()))
+        print(self.menu_rule("top", self.menu_width()), file=self._out)
         for opt in self.menu_options():
-            print("\t{}".format(opt))
-        print(self.menu_rule("bot", self.menu_width()))
+            print("\t{}".format(opt), file=self._out)
+        print(self.menu_rule("bot", self.menu_width()), file=self._out)
 
     def menu_rule(self, pos, width):
         '''
@@ -120,7 +160,7 @@ class TerminalUI:
         c, err = self.get_char("menu")
         if err is not None:
             return None, err
-        if c not in self.menu_hotkeys():
+        if c not in self._hotkeys:
             return None, "invalid choice"
         return c, None
 
@@ -129,7 +169,7 @@ class TerminalUI:
         Attempts to read a valid node name from the user.  If `want` is False
         (True), an error is returned if the entered node is a (non-)member.
         '''
-        name, err = self.get_char(msg)
+        name, err = self.get_name(msg)
         if err is not None:
             return None, err
         if want != self._adjlist.find_node(name):
@@ -137,24 +177,58 @@ class TerminalUI:
                 name, "non-" if want else ""))
         return name, None
 
+    def read_line(self, message):
+        '''
+        Returns the next line of input without its line break.  The message is
+        written as a prompt, unless in script mode.  Raises EOFError at the
+        end of input.
+        '''
+        if self._script is None:
+            buf = input("{}> ".format(message))
+        else:
+            buf = self._script.readline()
+            if not buf:
+                raise EOFError
+            buf = buf.rstrip("\r\n")
+        if self._echo:
+            print(buf, file=self._out)
+        return buf
+
     def get_char(self, message):
         '''
         Writes a message to stdout and waits for one-character from stdin.
         '''
-        buf = input("{}> ".format(message))
-        if self._echo:
-            print(buf)
+        buf = self.read_line(message)
         if len(buf) != 1:
             return None, "invalid input (not a single character)"
         return buf, None
 
+    def get_name(self, message):
+        '''
+        Writes a message to stdout and waits for a node name from stdin, i.e.,
+        a non-empty line without whitespace.
+        '''
+        buf = self.read_line(message).strip()
+        if len(buf) == 0:
+            return None, "invalid input (empty line)"
+        if len(buf.split()) != 1:
+            return None, "invalid input (node names cannot contain whitespace)"
+        return buf, None
+
+    def get_line(self, message):
+        '''
+        Writes a message to stdout and waits for a non-empty line from stdin.
+        '''
+        buf = self.read_line(message)
+        if len(buf.strip()) == 0:
+            return None, "invalid input (empty line)"
+        return buf.strip(), None
+
     def get_int(self, message):
         '''
         Writes a message to stdout and waits for an integer from stdin.
         '''
-        buf = input("{}> ".format(message))
-        if self._echo:
-            print(buf)
+        buf = self.read_line(message)
         try:
             return int(buf), None
         except ValueError:
@@ -178,12 +252,54 @@ class TerminalUI:
         if self._adjlist.is_empty():
             self.display_empty()
 
-        nodes = self._adjlist.list_nodes()
-        log.debug("all nodes: {}".format(nodes))
-        log.debug("all edges: {}".format(self._adjlist.list_edges()))
-        self.display_matrix_head(nodes)
-        self.display_matrix_data(nodes, self._adjlist.adjacency_matrix())
-        self.display_cardinality()
+        summary = self._adjlist.summary()
+        nodes = summary.get_nodes()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("all nodes: {}".format(nodes))
+            log.debug("all edges: {}".format(self._adjlist.list_edges()))
+        if len(nodes) > self._sparse_threshold:
+            self.display_sparse_data(self._adjlist.memo("adjacency_dict",
+                self._adjlist.adjacency_dict))
+        else:
+            self.display_matrix(nodes, self._adjlist.memo("adjacency_matrix",
+                self._adjlist.adjacency_matrix))
+        self.display_summary(summary)
+
+    def set_window(self):
+        '''
+        Let the user select which nodes matrices and sequences show: a window
+        of a given size centred on a node, or all nodes if the size is 0.
+        '''
+        size, err = self.get_int("Enter window size (0 for all nodes)")
+        if err is not None:
+            self.display_error(err)
+            return
+        if size < 0:
+            self.display_error("invalid input (window size must be non-negative)")
+            return
+        if size == 0:
+            self._window = (None, 0)
+            return
+
+        centre, err = self.get_node("Enter centre node", True)
+        if err is not None:
+            self.display_error(err)
+            return
+
+        self._window = (centre, size)
+
+    def view_window(self, nodes):
+        '''
+        Returns the range [lo,hi) of indices in `nodes` that are displayed.
+        By default, that is the first `sparse_threshold` nodes.
+        '''
+        centre, size = self._window
+        if size == 0 or size >= len(nodes):
+            return 0, len(nodes)
+        lo = 0
+        if centre is not None and centre in nodes:
+            lo = min(max(0, nodes.index(centre) - size//2), len(nodes) - size)
+        return lo, lo + size
 
     def add_node(self):
         '''
@@ -228,8 +344,6 @@ class TerminalUI:
             return
 
         self._adjlist = self._adjlist.add_edge(from_node, to_node, weight)
-        if self._mode == "undirected":
-            self._adjlist = self._adjlist.add_edge(to_node, from_node, weight)
 
     def delete_edge(self):
         '''
@@ -250,14 +364,42 @@ class TerminalUI:
             return
 
         self._adjlist = self._adjlist.delete_edge(from_node, to_node)
-        if self._mode == "undirected":
-            self._adjlist = self._adjlist.delete_edge(to_node, from_node)
+
+    def load_file(self, path=None):
+        '''
+        Let the user add the nodes and edges of an edge-list, csv or tsv file
+        to the graph.
+        '''
+        if path is None:
+            path, err = self.get_line("Enter file name")
+            if err is not None:
+                self.display_error(err)
+                return
+
+        try:
+            self._adjlist = graphio.load(path, self._adjlist)
+        except (OSError, ValueError) as e:
+            self.display_error("failed to load {}: {}".format(path, e))
+
+    def save_file(self):
+        '''
+        Let the user write the graph to an edge-list, csv or tsv file.
+        '''
+        path, err = self.get_line("Enter file name")
+        if err is not None:
+            self.display_error(err)
+            return
+
+        try:
+            graphio.save(self._adjlist, path)
+        except OSError as e:
+            self.display_error("failed to save {}: {}".format(path, e))
 
     def find_node(self):
         '''
         Let the user search for a node in the graph.
         '''
-        name, err = self.get_char("Enter node name")
+        name, err = self.get_name("Enter node name")
         if err is not None:
             self.display_error(err)
             return
@@ -271,12 +413,12 @@ class TerminalUI:
         '''
         Let the user search for an edge in the graph.
         '''
-        from_node, err = self.get_char("Enter from node")
+        from_node, err = self.get_name("Enter from node")
         if err is not None:
             self.display_error(err)
             return
 
-        to_node, err = self.get_char("Enter to node")
+        to_node, err = self.get_name("Enter to node")
         if err is not None:
             self.display_error(err)
             return
@@ -294,9 +436,15 @@ class TerminalUI:
             self.display_error("graph is empty")
             return
         
+        paths, err = self.run_algorithm(warshall)
+        if err is not None:
+            self.display_error(err)
+            return
+
         nodes = self._adjlist.list_nodes()
-        self.display_matrix_head(nodes)
-        self.display_matrix_data(nodes, warshall(self._adjlist))
+        self.display_matrix(nodes, paths)
+        if isinstance(paths, matfile.MatrixFile):
+            paths.close() # a cached result
 
     def floyd(self):
         '''
@@ -306,9 +454,43 @@ class TerminalUI:
             self.display_error("graph is empty")
             return
         
+        paths, err = self.run_algorithm(floyd)
+        if err is not None:
+            self.display_error(err)
+            return
+
         nodes = self._adjlist.list_nodes()
-        self.display_matrix_head(nodes)
-        self.display_matrix_data(nodes, floyd(self._adjlist))
+        self.display_matrix(nodes, paths)
+        if isinstance(paths, matfile.MatrixFile):
+            paths.close() # a cached result
+
+    def run_algorithm(self, algorithm):
+        '''
+        Runs an all-pairs algorithm in a worker process, showing its progress
+        if stdout is a terminal.  Ctrl-C and an exceeded time budget return to
+        the menu with the graph intact.  Cached results are used if available.
+        '''
+        key = None
+        if self._results is not None:
+            key = self._adjlist.memo("graph_key",
+                lambda: cache.graph_key(self._adjlist))
+            result = self._results.get(algorithm.__name__, key)
+            if result is not None:
+                return result, None
+
+        progress = None
+        if self._script is None and self._out.isatty():
+            progress = self.display_progress
+        result, err = worker.run(algorithm, (self._adjlist,), self._budget,
+                                 progress)
+        if progress is not None:
+            print("", file=self._out)
+        if err is None and key is not None:
+            try:
+                self._results.put(algorithm.__name__, key, result)
+            except OSError as e:
+                self.display_warning("failed to cache result: {}".format(e))
+        return result, err
 
     def dijkstra(self):
         '''
@@ -323,8 +505,8 @@ class TerminalUI:
             return
 
         dist, prev = dijkstra(self._adjlist, start_node)
-        self.display_sequence_head(self._adjlist.list_nodes())
-        self.display_sequence_data([
+        nodes = self._adjlist.list_nodes()
+        self.display_sequence(nodes, [
             ("distance", dist, None),
             ("previous", prev, None),
         ])
@@ -345,78 +527,138 @@ class TerminalUI:
             return
 
         lowcost, closest = prim(self._adjlist, start_node)
-        self.display_sequence_head(self._adjlist.list_nodes())
-        self.display_sequence_data([
+        nodes = self._adjlist.list_nodes()
+        self.display_sequence(nodes, [
             ("lowcost", lowcost, None),
             ("closest", closest, None),
         ])
         self.display_mst_sum(lowcost)
 
+    def display_progress(self, k, n):
+        print("\r\tprogress: k={}/{}".format(k+1, n), end="", flush=True,
+              file=self._out)
+
     def display_mst_sum(self, lowcost):
         mst_sum = sum([ v for v in lowcost if v is not None and v!=inf ])
-        print("\tMST sum: {}\n".format(mst_sum))
+        print("\tMST sum: {}\n".format(mst_sum), file=self._out)
 
     def display_empty(self):
-        print("\n\tGraph is empty\n")
+        print("\n\tGraph is empty\n", file=self._out)
 
     def display_member_node(self, name):
-        print("\tNode {} is a member".format(name))
+        print("\tNode {} is a member".format(name), file=self._out)
 
     def display_nonmember_node(self, name):
-        print("\tNode {} is a non-member".format(name))
+        print("\tNode {} is a non-member".format(name), file=self._out)
 
     def display_member_edge(self, from_node, to_node):
-        print("\tEdge ({},{}) is a member".format(from_node, to_node))
+        print("\tEdge ({},{}) is a member".format(from_node, to_node),
+              file=self._out)
 
     def display_nonmember_edge(self, from_node, to_node):
-        print("\tEdge ({},{}) is a non-member".format(from_node, to_node))
-
-    def display_sequence_head(self, nodes):
-        print("\n {: ^8}#".format(""), end="")
-        for node in nodes:
-            print(" {: ^3} ".format(node), end="")
-        print("\n ========#" + "="*5*len(nodes))
-
-    def display_sequence_data(self, data):
-        for (name,sequence,star_val) in data:
-            print(" {: >8}#".format(name), end="")
-            for v in sequence:
-                print(" {: ^3} ".format("*" if v==star_val else v), end="")
-            print("")
-        print("")
-
-    def display_matrix_head(self, nodes):
+        print("\tEdge ({},{}) is a non-member".format(from_node, to_node),
+              file=self._out)
+
+    def display_sequence(self, nodes, data):
+        '''
+        Shows named sequences, e.g., distances, in columns per node.  Values
+        that equal the star value of their sequence are shown as "*".
+        '''
+        lo, hi = self.view_window(nodes)
+        names = nodes[lo:hi]
+        rows = [ (label, [ "*" if v==star_val else format(v, "^")
+                           for v in sequence[lo:hi] ])
+                 for (label,sequence,star_val) in data ]
+        label_width = max([8] + [ len(label) for (label,_) in rows ])
+        width = column_width(names, *[ cells for (_,cells) in rows ])
+
+        row = " {: >" + str(label_width) + "}#" + cell_format(width, len(names))
+        lines = [ row.format("", *names),
+                  " " + "="*label_width + "#" + "="*(width+2)*len(names) ]
+        lines += [ row.format(label, *cells) for (label,cells) in rows ]
+        lines.append(self.window_note(nodes, lo, hi))
+        self._out.write("\n" + "\n".join(lines) + "\n")
+
+    def display_matrix(self, nodes, matrix):
+        '''
+        Shows a matrix with a row and a column per node.  Entries that are inf
+        are shown as "*".
+        '''
         if len(nodes) == 0:
             return
-        print("\n {: ^3}|".format(""), end="")
-        for node in nodes:
-            print(" {: ^3} ".format(node), end="")
-        print("\n----+" + "-"*5*len(nodes))
-
-    def display_matrix_data(self, nodes, matrix):
-        for name,row in zip(nodes, matrix):
-            print(" {: >3}|".format(name), end="")
-            for col in row:
-                print(" {: ^3} ".format("*" if col==inf else col), end="")
-            print("")
-        print("")
-
-    def display_cardinality(self):
-        node_cardinality = self._adjlist.node_cardinality()
-        edge_cardinality = self._adjlist.edge_cardinality()
-        if self._mode == "undirected":
-            self_loops = self._adjlist.self_loops()
-            edge_cardinality = int((edge_cardinality-self_loops)/2 + self_loops)
-        print("node cardinality: {}".format(node_cardinality))
-        print("edge cardinality: {}".format(edge_cardinality))
-        print("")
+        lo, hi = self.view_window(nodes)
+        names = nodes[lo:hi]
+        rows = [ [ "*" if col==inf else format(col, "^") # bools as 0/1
+                   for col in matrix[i][lo:hi] ]
+                 for i in range(lo, hi) ] # row by row, e.g., from a MatrixFile
+        label_width = max([3] + [ len(name) for name in names ])
+        width = column_width(names, *rows)
+
+        row = " {: >" + str(label_width) + "}|" + cell_format(width, len(names))
+        lines = [ row.format("", *names),
+                  "-"*(label_width+1) + "+" + "-"*(width+2)*len(names) ]
+        lines += [ row.format(name, *cells) for name,cells in zip(names, rows) ]
+        lines.append(self.window_note(nodes, lo, hi))
+        self._out.write("\n" + "\n".join(lines) + "\n")
+
+    def window_note(self, nodes, lo, hi):
+        '''
+        Returns a line that tells which nodes are shown, or an empty line if
+        the window includes all nodes.
+        '''
+        if hi-lo == len(nodes):
+            return ""
+        return "\tshowing nodes {}..{} of {}, select w to move the window\n" \
+            .format(nodes[lo], nodes[hi-1], len(nodes))
+
+    def display_sparse_data(self, adjacency):
+        label = " {: >" + str(max([3] + [ len(name) for name in adjacency ])) + "}|"
+        lines = [ label.format(name) + "".join([ " {}:{}".format(dst, weight)
+                                                 for dst, weight in edges.items() ])
+                  for name, edges in adjacency.items() ]
+        lines.append("")
+        self._out.write("\n".join(lines) + "\n")
+
+    def display_summary(self, summary):
+        degrees = " ".join([ "{}:{}".format(degree, count)
+                             for degree, count in summary.get_degrees().items() ])
+        self._out.write("\n".join([
+            "node cardinality: {}".format(summary.get_node_cardinality()),
+            "edge cardinality: {}".format(summary.get_edge_cardinality()),
+            "self-loops: {}".format(summary.get_self_loops()),
+            "density: {:.3f}".format(summary.get_density()),
+            "{}degrees: {}".format("out-" if self._mode == "directed" else "",
+                                   degrees),
+            "",
+        ]) + "\n")
+
+    def display_timings(self):
+        '''
+        Shows the time spent per operation and the operation counts that were
+        collected since startup, see stats.
+        '''
+        if not stats.enabled:
+            self.display_error("profiling is disabled (run with --profile)")
+            return
+        self._out.write("\n" + stats.report() + "\n\n")
 
     def display_error(self, err):
-        print("error> {}".format(err))
+        print("error> {}".format(err), file=self._out)
 
     def display_warning(self, msg):
-        print("warning> {}".format(msg))
-
+        print("warning> {}".format(msg), file=self._out)
+
+def column_width(*rows):
+    '''
+    Returns the width of the widest string in `rows`, but at least 3.
+    '''
+    return max([3] + [ len(cell) for cells in rows for cell in cells ])
+
+def cell_format(width, count):
+    '''
+    Returns a format string for `count` centred cells of width `width`.
+    '''
+    return (" {: ^" + str(width) + "} ") * count
 
 if __name__ == "__main__":
     logging.critical("ui contains no main module")
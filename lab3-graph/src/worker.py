@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import queue
+import signal
+import logging
+import multiprocessing
+
+import stats
+
+log = logging.getLogger(__name__)
+
+def run(func, args, budget=None, progress=None):
+    '''
+    Runs func(*args, progress=...) in a worker process and waits for it to
+    finish.  The worker reports its progress as (k, n) pairs, which are passed
+    on to `progress` if it is provided.
+
+    The worker is terminated if it runs for more than `budget` seconds, or if
+    the user presses Ctrl-C.  The calling process and its data are unaffected
+    either way.
+
+    Returns (result, None) on success, and (None, err) otherwise.
+
+    If instrumentation is enabled, the worker's stats are merged into those of
+    the calling process, see stats.merge().
+
+    Note: the worker is forked so that `args` can be shared without pickling.
+    On platforms without fork, `func` runs in the calling process instead and
+    only Ctrl-C is supported.
+    '''
+    if "fork" not in multiprocessing.get_all_start_methods():
+        log.debug("fork is unavailable, running {} inline".format(func.__name__))
+        try:
+            return func(*args, progress=progress), None
+        except KeyboardInterrupt:
+            return None, "cancelled"
+
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    worker = ctx.Process(target=_work, args=(results, func, args), daemon=True)
+    worker.start()
+    deadline = None if budget is None else time.monotonic() + budget
+    try:
+        while True:
+            timeout = 0.1
+            if deadline is not None:
+                timeout = max(0, min(timeout, deadline - time.monotonic()))
+            try:
+                msg = results.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None, "time budget of {}s exceeded".format(budget)
+                if not worker.is_alive() and results.empty():
+                    return None, "worker exited with code {}".format(worker.exitcode)
+                continue
+
+            kind, value = msg
+            if kind == "progress":
+                if progress is not None:
+                    progress(*value)
+            elif kind == "stats":
+                stats.merge(value)
+            elif kind == "done":
+                return value, None
+            else:
+                return None, value
+    except KeyboardInterrupt:
+        return None, "cancelled"
+    finally:
+        if worker.is_alive():
+            worker.terminate()
+        worker.join()
+        results.close()
+
+def _work(results, func, args):
+    '''
+    Worker entry point: runs func and posts progress and the result.
+    '''
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # the parent cancels us
+    stats.reset() # only report what this worker collects
+    try:
+        result = func(*args, progress=lambda k, n: results.put(("progress", (k, n))))
+    except Exception as e:
+        results.put(("error", "{}: {}".format(type(e).__name__, e)))
+    else:
+        if stats.enabled:
+            results.put(("stats", stats.stats()))
+        results.put(("done", result))
+    results.close()
+    results.join_thread()
+
+if __name__ == "__main__":
+    log.critical("module contains no main method")
+    sys.exit(1)
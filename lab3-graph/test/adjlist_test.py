@@ -11,7 +11,7 @@ current_path = os.path.dirname(__file__)
 src_path = os.path.abspath(os.path.join(current_path, "../src"))
 sys.path.insert(0, src_path)
 
-from adjlist import AdjacencyList
+from adjlist import AdjacencyList, UndirectedAdjacencyList
 from math import inf
 
 class TestAdjacencyList(unittest.TestCase):
@@ -348,6 +348,298 @@ class TestAdjacencyList(unittest.TestCase):
                 l = l.add_edge(src, dst, weight)
             self.assertEqual(l.adjacency_matrix(), want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
 
+    def test_adjacency_matrix_weights(self):
+        for table in [
+            # edges, matrix as printed, i.e., stored weights are not converted
+            ([("a","b",3),("b","a",2)], "[[inf, 3], [2, inf]]"),
+            ([("a","b",3.0),("b","a",2.5)], "[[inf, 3.0], [2.5, inf]]"),
+            ([("a","b",3),("b","a",2.5)], "[[inf, 3], [2.5, inf]]"),
+            ([("a","b",2**63),("b","a",-2**63-1)], "[[inf, 9223372036854775808], [-9223372036854775809, inf]]"),
+            ([("a","b",2**63),("b","a",0.5)], "[[inf, 9223372036854775808], [0.5, inf]]"),
+        ]:
+            in_edges, want = table
+            msg = "Added edges {}".format(in_edges)
+            l = AdjacencyList().extend(["a","b"], in_edges)
+            self.assertEqual(str(l.adjacency_matrix()), want, msg)
+            u = UndirectedAdjacencyList().extend(["a","b"], in_edges[:1] + [("a","a",0.5)])
+            self.assertEqual(str(u.adjacency_matrix()),
+                "[[0.5, {0}], [{0}, inf]]".format(in_edges[0][2]), msg)
+
+    def test_adjacency_sparse(self):
+        for table in [
+            ([], [], {}, [0], ([], [], [])),
+            (["a"], [], {"a": {}}, [0,0], ([], [], [])),
+            (["a","b","c"], [("a","a",1),("a","b",1),("a","c",1),("b","a",1),("b","b",1),("c","c",1)],
+                {"a": {"a": 1, "b": 1, "c": 1}, "b": {"a": 1, "b": 1}, "c": {"c": 1}},
+                [0,3,5,6], ([0,0,0,1,1,2], [0,1,2,0,1,2], [1,1,1,1,1,1])),
+            (["a","b","c","d"], [("d","a",3),("b","d",2.5),("d","b",1)],
+                {"a": {}, "b": {"d": 2.5}, "c": {}, "d": {"a": 3, "b": 1}},
+                [0,0,1,1,3], ([1,3,3], [3,0,1], [2.5,3,1])),
+        ]:
+            in_nodes, in_edges, want_dict, want_offsets, want_coo = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            msg = "Added nodes {}, added edges {}".format(in_nodes, in_edges)
+            self.assertEqual(l.adjacency_dict(), want_dict, msg)
+            nodes, offsets, targets, weights = l.adjacency_csr()
+            self.assertEqual((nodes, list(offsets), list(targets), list(weights)),
+                             (sorted(in_nodes), want_offsets, want_coo[1], want_coo[2]), msg)
+            self.assertEqual(tuple([ list(a) for a in l.adjacency_coo() ]), want_coo, msg)
+            dense = l.adjacency_matrix()
+            for (i, j, w) in zip(*l.adjacency_coo()):
+                self.assertEqual(dense[i][j], w, msg)
+            self.assertEqual(sum([ v != inf for row in dense for v in row ]), len(in_edges), msg)
+
+    def test_adjacency_deleted_node(self):
+        # deleting c without its edges leaves a->c (or {a,c}) behind
+        for table in [
+            # cls, matrix, dict, coo
+            (AdjacencyList, [[inf,2],[inf,inf]], {"a": {"b": 2}, "b": {}}, ([0], [1], [2])),
+            (UndirectedAdjacencyList, [[inf,2],[2,inf]], {"a": {"b": 2}, "b": {"a": 2}},
+                ([0,1], [1,0], [2,2])),
+        ]:
+            cls, want_matrix, want_dict, want_coo = table
+            l = cls().extend(["a","b","c"], [("a","c",5),("a","b",2)]).delete_node("c")
+            msg = cls.__name__
+            self.assertEqual(l.adjacency_matrix(), want_matrix, msg)
+            self.assertEqual(l.adjacency_dict(), want_dict, msg)
+            self.assertEqual(tuple([ list(a) for a in l.adjacency_coo() ]), want_coo, msg)
+            self.assertEqual(l.adjacency_csr()[0], ["a","b"], msg)
+
+    def test_adjacency_matrix_typed(self):
+        for table in [
+            ([], [], "i"),
+            (["a"], [("a","a",1)], "i"),
+            (["a","b","c"], [("a","b",1),("b","c",-2),("c","a",99)], "i"),
+            (["a","b","c"], [("a","b",1),("b","c",2**40)], "d"),
+            (["a","b","c"], [("a","b",1.5),("c","c",2)], "d"),
+        ]:
+            in_nodes, in_edges, want_typecode = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            msg = "Added nodes {}, added edges {}".format(in_nodes, in_edges)
+            got = l.adjacency_matrix(backend="array")
+            self.assertEqual(got.typecode(), want_typecode, msg)
+            self.assertEqual(got.tolist(), l.adjacency_matrix(), msg)
+            self.assertEqual([ got[i] for i in range(len(got)) ], l.adjacency_matrix()[:len(in_nodes)], msg)
+
+    def test_extend(self):
+        for table in [
+            ([], [], [], [], [], []),
+            ([], [], ["b","a"], [("a","b",1)], ["a","b"], [("a","b",1)]),
+            (["a"], [("a","a",1)], ["c","b"], [("c","a",2),("a","c",3),("a","a",4)], ["a","b","c"], [("a","a",4),("a","c",3),("c","a",2)]),
+            (["a","c"], [("a","c",1)], [], [("a","b",2),("c","a",3),("c","a",5)], ["a","c"], [("a","c",1),("c","a",5)]),
+        ]:
+            in_nodes, in_edges, add_nodes, add_edges, want_nodes, want_edges = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            l = l.extend(add_nodes, add_edges)
+            self.assertEqual(l.list_nodes(), want_nodes, "Extended {} with {}".format(in_nodes, add_nodes))
+            self.assertEqual(l.list_edges(), want_edges, "Extended {} with {}".format(in_edges, add_edges))
+            self.assertEqual(list(l.iter_edges()), want_edges, "Extended {} with {}".format(in_edges, add_edges))
+
+    def test_symbols(self):
+        for table in [
+            # in_nodes, in_edges, delete_node, want_ids, want_edges
+            ([], [], None, {}, []),
+            (["b","a"], [("a","b",1)], None, {"b":0,"a":1}, [("a","b",1)]),
+            (["c","b","a"], [("a","b",1),("c","b",2),("b","b",3)], "b", {"c":0,"a":2}, []),
+            (["a","b"], [("b","a",1)], "b", {"a":0}, []),
+        ]:
+            in_nodes, in_edges, delete_node, want_ids, want_edges = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            if delete_node is not None:
+                l = l.delete_edges(delete_node).delete_node(delete_node)
+            msg = "Added nodes {}, added edges {}, deleted {}".format(in_nodes, in_edges, delete_node)
+            got = {}
+            head = l
+            while not head.is_empty():
+                got[head.get_name()] = head.get_id()
+                self.assertIs(head.get_symbols(), l.get_symbols(), msg)
+                head = head.get_tail()
+            self.assertEqual(got, want_ids, msg)
+            self.assertEqual(l.list_edges(), want_edges, msg)
+            self.assertEqual(len(l.get_symbols()), len(in_nodes), msg) # ids are never reused
+            if delete_node is not None:
+                self.assertFalse(l.find_node(delete_node), msg)
+            self.assertFalse(l.find_node("never-added"), msg)
+
+    def test_undirected(self):
+        for table in [
+            # in_nodes, in_edges, delete, want_edges, want_matrix
+            ([], [], [], [], [[]]),
+            (["a","b"], [("b","a",1)], [], [("a","b",1)], [[inf,1],[1,inf]]),
+            (["a","b"], [("a","b",1),("b","a",2)], [], [("a","b",2)], [[inf,2],[2,inf]]),
+            (["a","b","c"], [("c","a",1),("b","b",2),("c","b",3)], [("a","c")], [("b","b",2),("b","c",3)], [[inf,inf,inf],[inf,2,3],[inf,3,inf]]),
+            (["a","b","c"], [("a","b",1),("b","c",2),("a","c",3)], [("c","b"),("b","c")], [("a","b",1),("a","c",3)], [[inf,1,3],[1,inf,inf],[3,inf,inf]]),
+        ]:
+            in_nodes, in_edges, delete, want_edges, want_matrix = table
+            l = UndirectedAdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            for (src, dst) in delete:
+                l = l.delete_edge(src, dst)
+            msg = "Added nodes {}, added edges {}, deleted {}".format(in_nodes, in_edges, delete)
+            self.assertEqual(l.list_edges(), want_edges, msg)
+            self.assertEqual(l.edge_cardinality(), len(want_edges), msg)
+            self.assertEqual(l.adjacency_matrix(), want_matrix, msg)
+            self.assertEqual(l.extend(in_nodes, in_edges).list_edges(), UndirectedAdjacencyList().extend(in_nodes, in_edges).list_edges(), msg)
+            for (src, dst, weight) in want_edges:
+                self.assertTrue(l.find_edge(src, dst), msg)
+                self.assertTrue(l.find_edge(dst, src), msg)
+                self.assertIn((dst, weight), list(l.neighbours(src)), msg)
+                self.assertIn((src, weight), list(l.neighbours(dst)), msg)
+            for name in in_nodes:
+                l = l.delete_edges(name)
+                self.assertEqual(list(l.neighbours(name)), [], msg)
+            self.assertEqual(l.list_edges(), [], msg)
+
+    def test_batch(self):
+        for table in [
+            # in_nodes, in_edges, ops, want_nodes, want_edges
+            ([], [], [], [], []),
+            ([], [], [("add_node","b"),("add_node","a"),("add_edge","a","b",1),("add_edge","a","c",2)], ["a","b"], [("a","b",1)]),
+            (["b"], [("b","b",1)], [("add_node","a"),("add_edge","a","b",2),("add_edge","b","b",3),("delete_edge","a","b")], ["a","b"], [("b","b",3)]),
+            (["a","b","c"], [("a","b",1),("c","b",2),("b","a",3)], [("delete_edges","b"),("delete_node","b")], ["a","c"], []),
+            (["a","b"], [("a","b",1)], [("delete_node","a"),("delete_node","b")], [], []),
+            (["a"], [], [("delete_node","a"),("add_node","c"),("add_node","b"),("add_edge","c","b",4)], ["b","c"], [("c","b",4)]),
+        ]:
+            in_nodes, in_edges, ops, want_nodes, want_edges = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            msg = "Added nodes {}, added edges {}, batched {}".format(in_nodes, in_edges, ops)
+
+            want = l
+            for (op, *args) in ops:
+                want = getattr(want, op)(*args)
+            self.assertEqual(want.list_nodes(), want_nodes, msg)
+            self.assertEqual(want.list_edges(), want_edges, msg)
+
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            head, cardinality, version = l, l.edge_cardinality(), l.get_version()
+            with l.batch():
+                for (op, *args) in ops:
+                    self.assertIs(getattr(l, op)(*args), l, msg)
+                self.assertEqual(l.edge_cardinality(), cardinality, msg) # not applied yet
+            self.assertIs(l, head, msg)
+            self.assertEqual(l.list_nodes(), want_nodes, msg)
+            self.assertEqual(l.list_edges(), want_edges, msg)
+            self.assertEqual(l.node_cardinality(), len(want_nodes), msg)
+            self.assertEqual(l.edge_cardinality(), len(want_edges), msg)
+            self.assertEqual(l.get_version() > version, len(ops) > 0, msg)
+
+    def test_batch_undirected(self):
+        l = UndirectedAdjacencyList().extend(["a","b","c"], [("a","b",1),("c","b",2)])
+        with l.batch():
+            l.add_edge("c", "a", 3)
+            l.delete_edges("b")
+        self.assertEqual(l.list_edges(), [("a","c",3)])
+        self.assertEqual(l.adjacency_matrix(), [[inf,inf,3],[inf,inf,inf],[3,inf,inf]])
+
+    def test_batch_raises(self):
+        l = AdjacencyList().add_node("a")
+        with self.assertRaises(KeyError):
+            with l.batch():
+                l.add_node("b")
+                raise KeyError("b")
+        self.assertEqual(l.list_nodes(), ["a"])
+        l.add_node("c")
+        self.assertEqual(l.list_nodes(), ["a","c"])
+
+    def test_snapshot(self):
+        names = ["a","b","c","d","e","f"]
+        for cls in [AdjacencyList, UndirectedAdjacencyList]:
+            rng = random.Random(cls.__name__)
+            l, snapshots = cls(), []
+            for step in range(400):
+                op = rng.choice(["add_node","add_node","delete_node","add_edge","add_edge","delete_edge","delete_edges","batch","snapshot"])
+                a, b = rng.choice(names), rng.choice(names)
+                if op == "add_node":
+                    l = l.add_node(a)
+                elif op == "delete_node":
+                    l = l.delete_edges(a).delete_node(a)
+                elif op == "add_edge":
+                    l = l.add_edge(a, b, rng.randint(1, 9))
+                elif op == "delete_edge":
+                    l = l.delete_edge(a, b)
+                elif op == "delete_edges":
+                    l = l.delete_edges(a)
+                elif op == "batch":
+                    with l.batch():
+                        l.add_node(a)
+                        l.add_edge(a, b, rng.randint(1, 9))
+                        l.delete_edge(b, a)
+                else:
+                    snap = l.snapshot()
+                    self.assertEqual(snap.get_version(), l.get_version())
+                    snapshots.append((snap, l.list_nodes(), l.list_edges(), l.adjacency_matrix()))
+            self.assertGreater(len(snapshots), 10)
+            for (snap, want_nodes, want_edges, want_matrix) in snapshots:
+                msg = "{} snapshot at version {}".format(cls.__name__, snap.get_version())
+                self.assertEqual(snap.list_nodes(), want_nodes, msg)
+                self.assertEqual(snap.list_edges(), want_edges, msg)
+                self.assertEqual(snap.adjacency_matrix(), want_matrix, msg)
+                self.assertEqual(snap.edge_cardinality(), len(want_edges), msg)
+
+    def test_snapshot_sharing(self):
+        l = AdjacencyList().extend(["a","b","c"], [("a","b",1),("b","c",2),("c","a",3)])
+        snap = l.snapshot()
+        with self.assertRaises(AttributeError):
+            snap.add_node("d")
+        l = l.add_edge("a", "c", 4)
+        self.assertIs(l.get_tail(), snap._head.get_tail()) # b and c are shared
+        self.assertIsNot(l.get_edges(), snap._head.get_edges())
+        l = l.add_edge("b", "a", 5)
+        self.assertIsNot(l.get_tail(), snap._head.get_tail())
+        self.assertIs(l.get_tail().get_tail(), snap._head.get_tail().get_tail()) # c is shared
+        self.assertEqual(snap.list_edges(), [("a","b",1),("b","c",2),("c","a",3)])
+        self.assertEqual(l.list_edges(), [("a","b",1),("a","c",4),("b","a",5),("b","c",2),("c","a",3)])
+
+    def test_long_list(self):
+        n = sys.getrecursionlimit() + 500 # more than recursion allows
+        names = [ "n{:06d}".format(i) for i in range(n) ]
+        for l in [ AdjacencyList(), UndirectedAdjacencyList() ]:
+            for name in reversed(names):
+                l = l.add_node(name)
+            snap = l.snapshot()
+            for name in names[1:]:
+                l = l.add_edge(names[0], name, 1)
+            l = l.add_edge(names[-1], names[-2], 2)
+            l = l.delete_edge(names[0], names[1])
+            l = l.delete_edges(names[2])
+            l = l.delete_edges(names[-3]).delete_node(names[-3])
+            self.assertEqual(l.node_cardinality(), n-1)
+            self.assertEqual(l.edge_cardinality(), n-3)
+            self.assertTrue(l.find_edge(names[0], names[-1]))
+            self.assertTrue(l.find_edge(names[-1], names[-2]))
+            self.assertFalse(l.find_edge(names[0], names[1]))
+            self.assertFalse(l.find_node(names[-3]))
+            self.assertEqual(len(l.list_edges()), l.edge_cardinality())
+            self.assertEqual(snap.node_cardinality(), n)
+            self.assertEqual(snap.edge_cardinality(), 0)
+
 if __name__ == "__main__":
     try:
         sys.exit(unittest.main())
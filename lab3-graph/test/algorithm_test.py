@@ -4,6 +4,7 @@ import os
 import sys
 
 import unittest
+import tempfile
 import copy
 import random
 
@@ -11,10 +12,16 @@ current_path = os.path.dirname(__file__)
 src_path = os.path.abspath(os.path.join(current_path, "../src"))
 sys.path.insert(0, src_path)
 
-from adjlist import AdjacencyList
-from algorithm import dijkstra, prim, warshall, floyd
+from adjlist import AdjacencyList, UndirectedAdjacencyList
+import stats
+from algorithm import dijkstra, dijkstra_iter, dijkstra_many, nearest_k, within, prim, warshall, floyd, floyd_path
 from math import inf
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class TestAlgorithm(unittest.TestCase):
     def test_dijkstra(self):
         for table in [
@@ -59,6 +66,115 @@ class TestAlgorithm(unittest.TestCase):
                 l = l.add_edge(src, dst, weight)
             self.assertEqual(dijkstra(l, start_node), want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
 
+    def test_dijkstra_iter(self):
+        for table in [
+            (["a"], [], "a", [("a",0,None)]),
+            (["a","b"], [("b","a",1)], "a", [("a",0,None)]),
+            (["a","b","c"], [("a","b",1),("b","c",2)], "a", [("a",0,None),("b",1,"a"),("c",3,"b")]),
+            (["a","b","c","d"], [("a","b",3),("a","c",1),("c","b",1),("b","d",1)], "a", [("a",0,None),("c",1,"a"),("b",2,"c"),("d",3,"b")]),
+        ]:
+            in_nodes, in_edges, start_node, want = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            self.assertEqual(list(dijkstra_iter(l, start_node)), want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
+
+    def test_dijkstra_iter_lazy(self):
+        nodes = [ "n{:02}".format(i) for i in range(100) ]
+        for table in [
+            # k, list steps: cells and edges walked up to the last settled node
+            (1, 2 + 2),
+            (2, 100 + 2),
+            (3, 100 + 2),
+        ]:
+            k, want = table
+            for l in [AdjacencyList(), UndirectedAdjacencyList()]:
+                l = l.extend(nodes, [("n00","n01",1),("n01","n99",1)])
+                msg = "k={} ({})".format(k, type(l).__name__)
+                stats.reset()
+                stats.enable()
+                nearest_k(l, "n00", k)
+                stats.enable(False)
+                self.assertEqual(stats.stats()["counts"].get("list_steps"), want, msg)
+                self.assertIsNone(l.memoized("adjacency_csr"), msg)
+
+    def test_deleted_node(self):
+        # deleting c without its edges leaves a->c (or {a,c}) behind
+        for table in [
+            # cls, function, want
+            (AdjacencyList, lambda l: list(dijkstra_iter(l, "a")), [("a",0,None),("b",2,"a")]),
+            (AdjacencyList, lambda l: nearest_k(l, "a", 5), [("b",2,"a")]),
+            (AdjacencyList, lambda l: within(l, "a", 9), [("b",2,"a")]),
+            (AdjacencyList, lambda l: dijkstra(l, "a"), ([None,2], [None,"a"])),
+            (AdjacencyList, floyd, [[0,2],[inf,0]]),
+            (AdjacencyList, warshall, [[True,True],[False,True]]),
+            (AdjacencyList, lambda l: l.summary().get_edge_cardinality(), 1),
+            (UndirectedAdjacencyList, lambda l: nearest_k(l, "b", 5), [("a",2,"b")]),
+            (UndirectedAdjacencyList, lambda l: dijkstra(l, "a"), ([None,2], [None,"a"])),
+            (UndirectedAdjacencyList, floyd, [[0,2],[2,0]]),
+            (UndirectedAdjacencyList, lambda l: prim(l, "a"), ([None,2], [None,"a"])),
+        ]:
+            cls, func, want = table
+            l = cls().extend(["a","b","c"], [("a","c",5),("a","b",2)]).delete_node("c")
+            self.assertEqual(func(l), want, "{} after deleting c".format(cls.__name__))
+
+    def test_nearest_k_within(self):
+        in_nodes = ["a","b","c","d","e"]
+        in_edges = [("a","b",2),("a","c",5),("b","c",1),("b","d",3),("c","d",1),("c","e",10),("d","e",7)]
+        l = AdjacencyList()
+        for name in in_nodes:
+            l = l.add_node(name)
+        for (src, dst, weight) in in_edges:
+            l = l.add_edge(src, dst, weight)
+        for table in [
+            (0, []),
+            (1, [("b",2,"a")]),
+            (3, [("b",2,"a"),("c",3,"b"),("d",4,"c")]),
+            (9, [("b",2,"a"),("c",3,"b"),("d",4,"c"),("e",11,"d")]),
+        ]:
+            k, want = table
+            self.assertEqual(nearest_k(l, "a", k), want, "k={}".format(k))
+        for table in [
+            (0, []),
+            (2, [("b",2,"a")]),
+            (4, [("b",2,"a"),("c",3,"b"),("d",4,"c")]),
+            (inf, [("b",2,"a"),("c",3,"b"),("d",4,"c"),("e",11,"d")]),
+        ]:
+            radius, want = table
+            self.assertEqual(within(l, "a", radius), want, "radius={}".format(radius))
+
+    def test_dijkstra_many(self):
+        for table in self.make_floyd_tables():
+            in_nodes, in_edges, want = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            weights = { (in_nodes.index(src), in_nodes.index(dst)): weight for (src, dst, weight) in in_edges }
+
+            d, e = dijkstra_many(l, in_nodes)
+            self.assertEqual([ list(row) for row in d ], want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
+            for s, (dist, prev) in enumerate(zip(d, e)):
+                for v, u in enumerate(prev):
+                    if u == -1:
+                        self.assertTrue(v == s or dist[v] == inf)
+                    else:
+                        self.assertEqual(dist[u] + weights[(u, v)], dist[v])
+
+            sources = in_nodes[::2]
+            dist, origin = dijkstra_many(l, sources, multi_source=True)
+            for v in range(len(in_nodes)):
+                nearest = min([ want[in_nodes.index(s)][v] for s in sources ])
+                self.assertEqual(dist[v], nearest, "Sources {}, edges {}".format(sources, in_edges))
+                if nearest == inf:
+                    self.assertEqual(origin[v], -1)
+                else:
+                    self.assertIn(in_nodes[origin[v]], sources)
+                    self.assertEqual(want[origin[v]][v], nearest)
+
     def test_prim(self):
         for table in [
             # Basic
@@ -113,6 +229,9 @@ class TestAlgorithm(unittest.TestCase):
                 l = l.add_edge(dst, src, weight)
             self.assertEqual(prim(l, start_node), want, "Added nodes {}, added unidirectional edges {}".format(in_nodes, in_edges))
 
+            u = UndirectedAdjacencyList().extend(in_nodes, in_edges)
+            self.assertEqual(prim(u, start_node), want, "Added nodes {}, added undirected edges {}".format(in_nodes, in_edges))
+
     def test_warshall(self):
         for table in self.make_warshall_tables():
             in_nodes, in_edges, want = table
@@ -133,6 +252,76 @@ class TestAlgorithm(unittest.TestCase):
                 l = l.add_edge(src, dst, weight)
             self.assertEqual(floyd(l), want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
 
+    def test_typed_backend(self):
+        for table in self.make_floyd_tables():
+            in_nodes, in_edges, want = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            msg = "Added nodes {}, added edges {}".format(in_nodes, in_edges)
+            paths = floyd(l, backend="array")
+            self.assertEqual((paths.typecode(), paths.nbytes()), ("d", 8*len(in_nodes)**2), msg)
+            self.assertEqual(paths.tolist(), want, msg)
+            paths = warshall(l, backend="array")
+            self.assertEqual((paths.typecode(), paths.nbytes()), ("b", len(in_nodes)**2), msg)
+            self.assertEqual(paths.tolist(), [ [ v != inf for v in row ] for row in want ], msg)
+            dist, nxt = floyd(l, next_hop=True, backend="array")
+            self.assertEqual(dist, want, msg)
+            self.assertEqual(nxt, floyd(l, next_hop=True)[1], msg)
+
+    def test_mmap_output(self):
+        for table in self.make_floyd_tables():
+            in_nodes, in_edges, want = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            msg = "Added nodes {}, added edges {}".format(in_nodes, in_edges)
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = floyd(l, out=os.path.join(tmp, "floyd.mat"))
+                self.assertEqual([ row for row in paths ], want, msg)
+                paths.close()
+                paths = warshall(l, out=os.path.join(tmp, "warshall.mat"))
+                self.assertEqual([ row for row in paths ], warshall(l), msg)
+                paths.close()
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_backend(self):
+        for table in self.make_floyd_tables():
+            in_nodes, in_edges, want = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            msg = "Added nodes {}, added edges {}".format(in_nodes, in_edges)
+            self.assertEqual(floyd(l, backend="numpy").tolist(), want, msg)
+            self.assertEqual(warshall(l, backend="numpy").tolist(), warshall(l), msg)
+
+    def test_floyd_path(self):
+        for table in self.make_floyd_tables():
+            in_nodes, in_edges, want = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            dist, nxt = floyd(l, next_hop=True)
+            self.assertEqual(dist, want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
+            weights = { (src, dst): weight for (src, dst, weight) in in_edges }
+            for i in range(len(in_nodes)):
+                for j in range(len(in_nodes)):
+                    path = floyd_path(nxt, i, j)
+                    if want[i][j] == inf:
+                        self.assertEqual(path, [], "No path {}->{} in {}".format(i, j, in_edges))
+                        continue
+                    self.assertEqual((path[0], path[-1]), (i, j))
+                    cost = sum([ weights[(in_nodes[a], in_nodes[b])] for a, b in zip(path, path[1:]) ])
+                    self.assertEqual(cost, want[i][j], "Path {} in {}".format(path, in_edges))
+
     def make_warshall_tables(self):
         tables = []
         for (n, e, m) in self.make_floyd_tables():
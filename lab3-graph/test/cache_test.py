@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import time
+import unittest
+import tempfile
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList
+from algorithm import floyd, warshall
+from cache import ResultCache, graph_key
+from math import inf
+import matfile
+
+class TestResultCache(unittest.TestCase):
+    def test_matfile(self):
+        for table in [
+            ([[]], "b"),
+            ([[0]], "q"),
+            ([[True,False],[False,True]], "b"),
+            ([[0,1],[inf,0]], "q"),
+            ([[0,-3],[2**40,0]], "q"),
+            ([[0,1.5],[inf,0]], "d"),
+        ]:
+            matrix, want_code = table
+            self.assertEqual(matfile.typecode(matrix), want_code, "Matrix {}".format(matrix))
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "m.mat")
+                matfile.write(path, matrix)
+                got = matfile.load(path)
+                self.assertEqual(got.tolist(), matrix, "Matrix {}".format(matrix))
+                if want_code != "d":
+                    self.assertEqual([ type(v) for r in got.tolist() for v in r ],
+                                     [ type(v) for r in matrix for v in r ], "Matrix {}".format(matrix))
+                got.close()
+
+    def test_graph_key(self):
+        a = AdjacencyList().add_node("a").add_node("b").add_edge("a", "b", 2)
+        b = AdjacencyList().add_node("b").add_node("a").add_edge("a", "b", 2)
+        c = AdjacencyList().add_node("a").add_node("b").add_edge("a", "b", 3)
+        d = AdjacencyList().add_node("a").add_node("b").add_node("c").add_edge("a", "b", 2)
+        self.assertEqual(graph_key(a), graph_key(b))
+        self.assertNotEqual(graph_key(a), graph_key(c))
+        self.assertNotEqual(graph_key(a), graph_key(d))
+
+    def test_get_put(self):
+        l = AdjacencyList().add_node("a").add_node("b").add_edge("a", "b", 2)
+        key = graph_key(l)
+        with tempfile.TemporaryDirectory() as tmp:
+            results = ResultCache(tmp)
+            self.assertIsNone(results.get("floyd", key))
+            results.put("floyd", key, floyd(l))
+            results.put("warshall", key, warshall(l))
+            self.assertEqual(ResultCache(tmp).get("floyd", key).tolist(), floyd(l))
+            self.assertEqual(ResultCache(tmp).get("warshall", key).tolist(), warshall(l))
+
+    def test_evict(self):
+        matrix = [ [inf]*4 for _ in range(4) ]
+        size = matfile.HEADER.size + 8*4*4
+        with tempfile.TemporaryDirectory() as tmp:
+            results = ResultCache(tmp, max_bytes=2*size)
+            now = time.time()
+            for i, key in enumerate(["k1", "k2"]):
+                results.put("floyd", key, matrix)
+                os.utime(os.path.join(tmp, "{}-floyd.mat".format(key)), (now-10+i, now-10+i))
+            self.assertIsNotNone(results.get("floyd", "k1")) # k2 is now the least recently used
+            results.put("floyd", "k3", matrix)
+            self.assertEqual(sorted(os.listdir(tmp)), ["k1-floyd.mat", "k3-floyd.mat"])
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
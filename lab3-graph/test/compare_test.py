@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import io
+import json
+import unittest
+import tempfile
+import contextlib
+
+current_path = os.path.dirname(__file__)
+bench_path = os.path.abspath(os.path.join(current_path, "../bench"))
+sys.path.insert(0, bench_path)
+
+import compare
+
+BASE = [ 1.00, 1.02, 0.98, 1.01, 0.99, 1.03, 0.97 ]
+
+def scaled(factor, samples=BASE):
+    return [ t*factor for t in samples ]
+
+class TestCompare(unittest.TestCase):
+    def test_compare(self):
+        for table in [
+            # candidate samples, thresholds, want: (ratio, verdict)
+            (scaled(1.0), { None: 0.25 }, (1.0, "unchanged")),
+            (scaled(2.0), { None: 0.25 }, (2.0, "regression")),
+            (scaled(1.2), { None: 0.25 }, (1.2, "unchanged")), # below threshold
+            (scaled(1.2), { None: 0.1 }, (1.2, "regression")),
+            (scaled(2.0), { None: 0.25, "floyd": 1.5 }, (2.0, "unchanged")),
+            (scaled(2.0), { None: 0.25, "prim": 1.5 }, (2.0, "regression")),
+            (scaled(0.5), { None: 0.25 }, (0.5, "improvement")),
+            (scaled(2.0, BASE[:2]), { None: 0.25 }, (2.02, "too few")),
+            (scaled(1.0) + [ 3.0 ]*6, { None: 0.25 }, (1.03, "unchanged")),
+            (scaled(1.0) + [ 3.0 ]*8, { None: 0.25 }, (3.0, "unchanged")), # interval includes 1
+        ]:
+            cand, thresholds, want = table
+            key = ("sparse", 100, "floyd")
+            rows = compare.compare({ key: BASE }, { key: cand }, thresholds)
+            self.assertEqual(len(rows), 1, "Candidate {}".format(cand))
+            got = (round(rows[0]["ratio"], 2), rows[0]["verdict"])
+            self.assertEqual(got, want, "Candidate {}, thresholds {}".format(cand, thresholds))
+            if rows[0]["low"] is not None:
+                self.assertLessEqual(rows[0]["low"], rows[0]["high"])
+
+    def test_compare_skipped(self):
+        base = { ("a", 1, "floyd"): BASE, ("a", 1, "prim"): [0.0]*7,
+                 ("a", 1, "find_edge"): [], ("b", 1, "floyd"): BASE }
+        cand = { ("a", 1, "floyd"): scaled(2.0), ("a", 1, "prim"): BASE,
+                 ("a", 1, "find_edge"): BASE, ("c", 1, "floyd"): BASE }
+        self.assertEqual(compare.common(base, cand),
+            ([("a", 1, "floyd")], [("a", 1, "find_edge"), ("a", 1, "prim")]))
+        self.assertEqual([ r["op"] for r in compare.compare(base, cand, { None: 0.25 }) ], ["floyd"])
+        self.assertEqual(compare.drift(base, cand), 2.0)
+
+    def test_get_thresholds(self):
+        for table in [
+            # --op-threshold values, want
+            ([], ({ None: 0.25 }, None)),
+            (["floyd=0.5", "prim=1"], ({ None: 0.25, "floyd": 0.5, "prim": 1.0 }, None)),
+            (["floyd=x"], (None, "invalid --op-threshold: floyd=x")),
+            (["floyd"], (None, "invalid --op-threshold: floyd")),
+            (["bogus=1"], (None, "invalid op in --op-threshold: bogus")),
+        ]:
+            specs, want = table
+            args = compare.get_args(["base.json", "cand.json"] +
+                                    [ "--op-threshold=" + spec for spec in specs ])
+            self.assertEqual(compare.get_thresholds(args), want, "Specs {}".format(specs))
+
+    def test_exit_codes(self):
+        def results(samples):
+            return { "meta": {}, "results": [ { "graph": "sparse", "n": 100,
+                "op": op, "samples": s } for (op, s) in samples.items() ] }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {
+                "base": results({ "floyd": BASE, "prim": BASE }),
+                "same": results({ "floyd": scaled(1.05), "prim": scaled(0.95) }),
+                "slow": results({ "floyd": scaled(2.0), "prim": BASE }),
+                "zero": results({ "floyd": [0.0]*7 }),
+                "other": results({ "dijkstra": BASE }),
+            }
+            for name, data in files.items():
+                with open(os.path.join(tmp, name + ".json"), "w") as f:
+                    json.dump(data, f)
+            with open(os.path.join(tmp, "broken.json"), "w") as f:
+                f.write("{")
+
+            for table in [
+                # arguments, want
+                (["base", "same"], 0),
+                (["base", "slow"], 1),
+                (["base", "slow", "--op-threshold", "floyd=1.5"], 0),
+                (["base", "slow", "--normalize"], 1), # divided by 1.5, floyd still regressed
+                (["base", "zero"], 2), # nothing left to compare
+                (["base", "other"], 2),
+                (["base", "missing"], 2),
+                (["base", "broken"], 2),
+                (["base"], 2), # neither a candidate nor --quick
+                (["base", "same", "--op-threshold", "floyd=x"], 2),
+            ]:
+                argv, want = table
+                argv = [ os.path.join(tmp, a + ".json") if not a.startswith("-") and "=" not in a
+                         else a for a in argv ]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    got = compare.main(compare.get_args(argv))
+                self.assertEqual(got, want, "Arguments {}".format(table[0]))
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
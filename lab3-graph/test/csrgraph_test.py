@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import unittest
+import tempfile
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList
+from algorithm import dijkstra, dijkstra_many, floyd, warshall
+import csrgraph
+
+class TestCSRGraph(unittest.TestCase):
+    def test_save_load(self):
+        for table in [
+            ([], []),
+            (["a"], []),
+            (["a"], [("a","a",1)]),
+            (["a","b","c"], [("a","b",1),("a","c",2),("c","a",3),("c","c",4)]),
+            (["a","b","c","d"], [("d","a",1.5),("b","c",2),("b","b",0.25)]),
+            (["alpha","beta","gamma","ångström"], [("alpha","beta",7),("ångström","alpha",3)]),
+        ]:
+            in_nodes, in_edges = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "graph.bin")
+                l.save_binary(path)
+                g = csrgraph.load(path)
+                msg = "Added nodes {}, added edges {}".format(in_nodes, in_edges)
+                self.assertEqual(g.is_empty(), l.is_empty(), msg)
+                self.assertEqual(g.node_cardinality(), l.node_cardinality(), msg)
+                self.assertEqual(g.edge_cardinality(), l.edge_cardinality(), msg)
+                self.assertEqual(g.self_loops(), l.self_loops(), msg)
+                self.assertEqual(g.list_nodes(), l.list_nodes(), msg)
+                self.assertEqual(g.list_edges(), l.list_edges(), msg)
+                self.assertEqual(g.adjacency_matrix(), l.adjacency_matrix(), msg)
+                for src in in_nodes + ["x"]:
+                    self.assertEqual(g.find_node(src), l.find_node(src), msg)
+                    for dst in in_nodes + ["x"]:
+                        self.assertEqual(g.find_edge(src, dst), l.find_edge(src, dst), msg)
+                if not l.is_empty():
+                    self.assertEqual(floyd(g), floyd(l), msg)
+                    self.assertEqual(warshall(g), warshall(l), msg)
+                    self.assertEqual(dijkstra_many(g, in_nodes), dijkstra_many(l, in_nodes), msg)
+                    for start_node in in_nodes:
+                        self.assertEqual(dijkstra(g, start_node), dijkstra(l, start_node), msg)
+                g.close()
+
+    def test_load_invalid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.bin")
+            with open(path, "wb") as f:
+                f.write(b"\0" * csrgraph.HEADER.size)
+            with self.assertRaises(ValueError):
+                csrgraph.load(path)
+
+    def test_load_truncated(self):
+        l = AdjacencyList().extend(["a","b","c"], [("a","b",1),("b","c",2),("c","a",3)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.bin")
+            l.save_binary(path)
+            with open(path, "rb") as f:
+                data = f.read()
+            # the file ends with 3 targets of 4 bytes and 4 bytes of padding
+            for size in [0, 2, csrgraph.HEADER.size, len(data) // 2, len(data) - 5]:
+                with open(path, "wb") as f:
+                    f.write(data[:size])
+                with self.assertRaises(ValueError, msg="Truncated to {} bytes".format(size)):
+                    csrgraph.load(path)
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+bench_path = os.path.abspath(os.path.join(current_path, "../bench"))
+sys.path.insert(0, src_path)
+sys.path.insert(0, bench_path)
+
+import generators
+
+class TestGenerators(unittest.TestCase):
+    def test_counts(self):
+        for table in [
+            # generator, args, want: (nodes, edges)
+            (generators.erdos_renyi, (10, 30, 1), (10, 30)),
+            (generators.erdos_renyi, (3, 100, 1), (3, 9)), # at most n*n pairs
+            (generators.dense, (10, 1.0, 1), (10, 90)),
+            (generators.dense, (10, 0.0, 1), (10, 0)),
+            (generators.grid, (0, 1), (0, 0)),
+            (generators.grid, (1, 1), (1, 0)),
+            (generators.grid, (9, 1), (9, 24)), # 3x3, 12 pairs of neighbours
+            (generators.grid, (10, 1), (10, 26)), # 4 wide, 13 pairs of neighbours
+            (generators.scale_free, (1, 3, 1), (1, 0)),
+            (generators.scale_free, (10, 3, 1), (10, 1+2+7*3)),
+            (generators.chain, (10, 1), (10, 9)),
+            (generators.tree, (10, 1), (10, 9)),
+        ]:
+            func, args, want = table
+            nodes, edges = func(*args)
+            msg = "{}{}".format(func.__name__, args)
+            self.assertEqual((len(nodes), len(edges)), want, msg)
+            self.assertEqual(nodes, sorted(nodes), msg)
+            self.assertEqual(len(set(nodes)), len(nodes), msg)
+            for (src, dst, weight) in edges:
+                self.assertIn(src, nodes, msg)
+                self.assertIn(dst, nodes, msg)
+                self.assertTrue(type(weight) is int and 1 <= weight <= 99, msg)
+
+    def test_deterministic(self):
+        for table in [
+            # kind, n
+            ("sparse", 50),
+            ("dense", 20),
+            ("grid", 50),
+            ("scale-free", 50),
+            ("chain", 50),
+            ("tree", 50),
+        ]:
+            kind, n = table
+            nodes, edges = generators.generate(kind, n, 7)
+            self.assertEqual(generators.generate(kind, n, 7), (nodes, edges), kind)
+            self.assertNotEqual(generators.generate(kind, n, 8)[1], edges, kind)
+            pairs = [ (src, dst) for (src, dst, _) in edges ]
+            self.assertEqual(len(set(pairs)), len(pairs), "{}: duplicate pairs".format(kind))
+            l = generators.build(kind, n, 7)
+            self.assertEqual((l.node_cardinality(), l.edge_cardinality()),
+                             (len(nodes), len(edges)), kind)
+
+    def test_erdos_renyi(self):
+        for table in [
+            # n, m, seed
+            (1, 1, 1),
+            (5, 25, 2),
+            (100, 400, 3),
+            (1000, 100, 4),
+        ]:
+            n, m, seed = table
+            nodes, edges = generators.erdos_renyi(n, m, seed)
+            pairs = [ (src, dst) for (src, dst, _) in edges ]
+            msg = "erdos_renyi({}, {}, {})".format(n, m, seed)
+            self.assertEqual(len(set(pairs)), m, msg)
+            self.assertEqual(pairs, sorted(pairs), msg)
+
+    def test_grid(self):
+        for n in [2, 3, 4, 16, 17, 100]:
+            nodes, edges = generators.grid(n, 1)
+            degrees = { name: 0 for name in nodes }
+            for (src, dst, _) in edges:
+                degrees[src] += 1
+            pairs = set([ (src, dst) for (src, dst, _) in edges ])
+            self.assertLessEqual(max(degrees.values()), 4, "grid({})".format(n))
+            self.assertTrue(all([ (dst, src) in pairs for (src, dst) in pairs ]),
+                            "grid({}) is not symmetric".format(n))
+            self.assertNotIn(0, degrees.values(), "grid({}) has an isolated node".format(n))
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
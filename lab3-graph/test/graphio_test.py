@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import io
+import unittest
+import tempfile
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList
+import graphio
+
+class TestGraphIO(unittest.TestCase):
+    def test_read_edges(self):
+        for table in [
+            ("", "edgelist", []),
+            ("a\n", "edgelist", [("a",None,None)]),
+            ("a b\n", "edgelist", [("a","b",1)]),
+            ("# comment\n\na  b\t2\nb c 1.5", "edgelist", [("a","b",2),("b","c",1.5)]),
+            ("a,b,2\r\nb,c\r\nc\r\n", "csv", [("a","b",2),("b","c",1),("c",None,None)]),
+            ('"a,1",b,3\n', "csv", [("a,1","b",3)]),
+            ("a\tb\t2\nb\tc\n", "tsv", [("a","b",2),("b","c",1)]),
+        ]:
+            buf, fmt, want = table
+            for chunk_size in [1, 2, 3, graphio.CHUNK_SIZE]:
+                got = list(graphio.read_edges(io.StringIO(buf), fmt, chunk_size))
+                self.assertEqual(got, want, "Read {!r} as {} in chunks of {}".format(buf, fmt, chunk_size))
+
+    def test_read_edges_invalid(self):
+        for table in [
+            ("a b c d\n", "edgelist"),
+            ("a b x\n", "edgelist"),
+            ("a,b,\n", "csv"),
+        ]:
+            buf, fmt = table
+            with self.assertRaises(ValueError):
+                list(graphio.read_edges(io.StringIO(buf), fmt))
+
+    def test_save_load(self):
+        for table in [
+            ([], []),
+            (["a"], []),
+            (["a","b","c"], [("a","b",1),("a","c",2),("c","a",3),("c","c",4)]),
+            (["a","b","c","d"], [("d","a",1),("b","c",2)]),
+        ]:
+            in_nodes, in_edges = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst, weight) in in_edges:
+                l = l.add_edge(src, dst, weight)
+            for ext in [".txt", ".csv", ".tsv", ".bin"]:
+                with tempfile.TemporaryDirectory() as tmp:
+                    path = os.path.join(tmp, "graph" + ext)
+                    graphio.save(l, path)
+                    got = graphio.load(path)
+                self.assertEqual(got.list_nodes(), l.list_nodes(), "Saved {} to {}".format(in_edges, ext))
+                self.assertEqual(got.list_edges(), l.list_edges(), "Saved {} to {}".format(in_edges, ext))
+
+    def test_load_undirected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.txt")
+            with open(path, "w") as f:
+                f.write("a b 2\nb c 3\n")
+            l = AdjacencyList().add_node("d")
+            l = graphio.load(path, l, undirected=True)
+        self.assertEqual(l.list_nodes(), ["a","b","c","d"])
+        self.assertEqual(l.list_edges(), [("a","b",2),("b","a",2),("b","c",3),("c","b",3)])
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
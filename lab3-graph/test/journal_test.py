@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import random
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList, UndirectedAdjacencyList
+from journal import Journal, replay
+
+def random_op(rng, names):
+    '''
+    Returns a random (op, *args) mutation on nodes named in `names`.
+    '''
+    op = rng.choice(["add_node", "add_node", "delete_node", "add_edge",
+                     "add_edge", "add_edge", "delete_edge", "delete_edges"])
+    a, b = rng.choice(names), rng.choice(names)
+    if op == "add_node":
+        return (op, a, None)
+    if op == "add_edge":
+        return (op, a, b, rng.randint(1, 9))
+    if op == "delete_edge":
+        return (op, a, b)
+    return (op, a)
+
+class TestJournal(unittest.TestCase):
+    def test_changes_since(self):
+        l = AdjacencyList()
+        j = l.get_journal()
+        self.assertEqual(j.changes_since(l.get_version()), [])
+        l = l.add_node("b").add_node("a")
+        v = l.get_version()
+        l = l.add_edge("a", "b", 2)
+        l = l.add_edge("a", "c", 2) # non-member, not a mutation
+        l = l.delete_edge("b", "a") # non-member, not a mutation
+        with l.batch():
+            l.add_node("c")
+            l.add_edge("c", "a", 3)
+        self.assertEqual(j.changes_since(v), [
+            (v+1, "add_edge", ("a","b",2)),
+            (v+2, "add_node", ("c",None)),
+            (v+2, "add_edge", ("c","a",3)),
+        ])
+        self.assertEqual(j.changes_since(l.get_version()), [])
+        self.assertEqual(len(j.changes_since(0)), 5)
+
+    def test_replay(self):
+        names = ["a","b","c","d","e"]
+        for (cls, retain) in [
+            (AdjacencyList, 4096),
+            (AdjacencyList, 8),
+            (UndirectedAdjacencyList, 4096),
+            (UndirectedAdjacencyList, 8),
+        ]:
+            rng = random.Random(retain)
+            l = cls().extend(names[:2])
+            j = l.get_journal(retain)
+            mirror, version = cls().extend(names[:2]), l.get_version()
+            for step in range(300):
+                ops = [ random_op(rng, names) for i in range(rng.randint(1, 3)) ]
+                ops = sum([ [("delete_edges", op[1]), op] if op[0] == "delete_node"
+                            else [op] for op in ops ], []) # as in the UI
+                if len(ops) == 1:
+                    op, *args = ops[0]
+                    l = getattr(l, op)(*args)
+                else:
+                    with l.batch():
+                        for (op, *args) in ops:
+                            getattr(l, op)(*args)
+
+                if rng.random() < 0.7:
+                    continue # let the mirror fall behind
+                changes = j.changes_since(version)
+                if changes is None:
+                    self.assertGreater(j.oldest(), version)
+                    mirror = cls().extend(l.list_nodes(), l.list_edges())
+                else:
+                    mirror = replay(mirror, changes)
+                version = l.get_version()
+                msg = "{} at version {} with retain={}".format(cls.__name__, version, retain)
+                self.assertEqual(mirror.list_nodes(), l.list_nodes(), msg)
+                self.assertEqual(mirror.adjacency_matrix(), l.adjacency_matrix(), msg)
+            self.assertLessEqual(len(j), retain)
+
+    def test_compact(self):
+        for table in [
+            # in_entries, want_entries
+            ([], []),
+            ([(1,"add_edge",("a","b",1)),(2,"add_edge",("a","b",2))], [(2,"add_edge",("a","b",2))]),
+            ([(1,"add_edge",("a","b",1)),(2,"delete_edge",("a","b")),(3,"add_edge",("b","a",1))], [(2,"delete_edge",("a","b")),(3,"add_edge",("b","a",1))]),
+            ([(1,"add_edge",("a","b",1)),(2,"delete_node",("b",)),(3,"add_edge",("a","b",2))], [(1,"add_edge",("a","b",1)),(2,"delete_node",("b",)),(3,"add_edge",("a","b",2))]),
+            ([(1,"add_edge",("a","b",1)),(2,"delete_edges",("c",)),(3,"add_edge",("a","b",2))], [(2,"delete_edges",("c",)),(3,"add_edge",("a","b",2))]),
+        ]:
+            in_entries, want_entries = table
+            j = Journal()
+            for entry in in_entries:
+                j.append(*entry)
+            j.compact()
+            self.assertEqual(j.changes_since(0), want_entries, "Compacted {}".format(in_entries))
+
+    def test_retain(self):
+        j = Journal(10, retain=4)
+        for v in range(11, 20):
+            j.append(v, "add_node", (str(v), None))
+        self.assertLessEqual(len(j), 4)
+        self.assertIsNone(j.changes_since(10))
+        self.assertIsNone(j.changes_since(j.oldest()-1))
+        self.assertEqual([ e[0] for e in j.changes_since(j.oldest()) ], list(range(j.oldest()+1, 20)))
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import unittest
+import copy
+import random
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList
+from algorithm import warshall
+from reachability import ReachabilityIndex
+
+class TestReachabilityIndex(unittest.TestCase):
+    def test_reaches(self):
+        for table in [
+            (["a"], []),
+            (["a","b"], [("a","b")]),
+            (["a","b"], [("a","b"),("b","a")]),
+            (["a","b","c"], [("a","b"),("b","c")]),
+            (["a","b","c"], [("a","a"),("c","b")]),
+            (["a","b","c","d"], [("a","b"),("b","c"),("c","a"),("c","d")]),
+            (["a","b","c","d","e"], [("a","b"),("a","c"),("b","d"),("c","d"),("d","e")]),
+            (["a","b","c","d","e","f"], [("a","b"),("b","a"),("c","d"),("d","c"),("e","f"),("b","e"),("d","e")]),
+        ] + self.make_random_tables():
+            in_nodes, in_edges = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst) in in_edges:
+                l = l.add_edge(src, dst)
+            want = warshall(l)
+            index = ReachabilityIndex(l)
+            nodes = l.list_nodes()
+            got = [ [ index.reaches(src, dst) for dst in nodes ] for src in nodes ]
+            self.assertEqual(got, want, "Added nodes {}, added edges {}".format(in_nodes, in_edges))
+
+    def test_deleted_node(self):
+        # deleting c without its edges leaves a->c behind
+        l = AdjacencyList().extend(["a","b","c"], [("a","c",1),("c","b",1),("b","b",1)])
+        l = l.delete_node("c")
+        index = ReachabilityIndex(l)
+        for table in [
+            # src, dst, want
+            ("a", "a", True),
+            ("a", "b", False),
+            ("b", "b", True),
+            ("a", "c", False),
+            ("c", "b", False),
+            ("x", "x", False),
+        ]:
+            src, dst, want = table
+            self.assertEqual(index.reaches(src, dst), want, "{} reaches {}".format(src, dst))
+
+    def test_size(self):
+        for table in [
+            # a chain and a tree need a single interval per component
+            (["a","b","c","d"], [("a","b"),("b","c"),("c","d")], 4, 4),
+            (["a","b","c","d"], [("a","b"),("a","c"),("c","d")], 4, 4),
+            # a cycle collapses into one component
+            (["a","b","c","d"], [("a","b"),("b","c"),("c","d"),("d","a")], 1, 1),
+        ]:
+            in_nodes, in_edges, want_comps, want_size = table
+            l = AdjacencyList()
+            for name in in_nodes:
+                l = l.add_node(name)
+            for (src, dst) in in_edges:
+                l = l.add_edge(src, dst)
+            index = ReachabilityIndex(l)
+            self.assertEqual(index.component_cardinality(), want_comps, "Added edges {}".format(in_edges))
+            self.assertEqual(index.size(), want_size, "Added edges {}".format(in_edges))
+
+    def make_random_tables(self):
+        tables, rand = [], random.Random(1337)
+        for n in [5, 10, 20]:
+            for m in [n//2, n, 2*n]:
+                nodes = [ chr(ord("a")+i) for i in range(n) ]
+                edges = [ (rand.choice(nodes), rand.choice(nodes)) for _ in range(m) ]
+                tables.append((nodes, edges))
+        return tables
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import json
+import asyncio
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from server import GraphServer
+
+class TestGraphServer(unittest.TestCase):
+    def test_execute(self):
+        for table in [
+            # mode, requests, want
+            ("directed", [
+                ("add_node", {"name": "a"}),
+                ("add_node", {"name": "b"}),
+                ("add_edge", {"src": "a", "dst": "b", "weight": 3}),
+                ("add_edge", {"src": "a", "dst": "c"}),
+                ("find_edge", {"src": "a", "dst": "b"}),
+                ("find_edge", {"src": "b", "dst": "a"}),
+                ("list_edges", {}),
+                ("delete_node", {"name": "b"}),
+                ("cardinality", {}),
+                ("add_node", {"nam": "c"}),
+            ], [
+                (None, None),
+                (None, None),
+                (None, None),
+                (None, "node 'c' is a non-member"),
+                (True, None),
+                (False, None),
+                ([("a","b",3)], None),
+                (None, None),
+                ({"nodes": 1, "edges": 0}, None),
+                (None, "invalid args for add_node: GraphServer.add_node() got an unexpected keyword argument 'nam'"),
+            ]),
+            ("undirected", [
+                ("add_node", {"name": "b"}),
+                ("add_node", {"name": "a"}),
+                ("add_edge", {"src": "b", "dst": "a", "weight": 2}),
+                ("find_edge", {"src": "a", "dst": "b"}),
+                ("delete_edge", {"src": "a", "dst": "b"}),
+                ("delete_edge", {"src": "a", "dst": "b"}),
+                ("list_nodes", {}),
+            ], [
+                (None, None),
+                (None, None),
+                (None, None),
+                (True, None),
+                (None, None),
+                (None, "edge (a,b) is non-member"),
+                (["a","b"], None),
+            ]),
+        ]:
+            mode, requests, want = table
+            server = GraphServer(mode)
+            got = [ server.execute({ "op": op, "args": args }) for (op, args) in requests ]
+            self.assertEqual(got, want, "Executed {} in {} mode".format(requests, mode))
+
+    def test_pipeline(self):
+        requests = [
+            { "id": 1, "op": "add_node", "args": { "name": "a" } },
+            { "id": 2, "op": "add_node", "args": { "name": "b" } },
+            { "id": 3, "op": "add_edge", "args": { "src": "a", "dst": "b", "weight": 2 } },
+            { "id": 4, "op": "floyd" },
+            { "id": 5, "op": "add_edge", "args": { "src": "b", "dst": "a", "weight": 5 } },
+            { "id": 6, "op": "dijkstra", "args": { "start": "b" } },
+            { "id": 7, "op": "prim", "args": { "start": "a" } },
+            { "id": 8, "op": "nope" },
+        ]
+        want = {
+            1: { "id": 1, "result": None },
+            2: { "id": 2, "result": None },
+            3: { "id": 3, "result": None },
+            4: { "id": 4, "result": { "nodes": ["a","b"], "paths": [[0,2],[None,0]] } },
+            5: { "id": 5, "result": None },
+            6: { "id": 6, "result": { "nodes": ["a","b"], "distance": [5,None], "previous": ["b",None] } },
+            7: { "id": 7, "error": "invalid graph mode" },
+            8: { "id": 8, "error": "invalid op: nope" },
+        }
+
+        async def run():
+            server = GraphServer()
+            listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"".join([ json.dumps(r).encode() + b"\n" for r in requests ]) + b"{\n")
+            await writer.drain()
+            got = [ json.loads(await reader.readline()) for _ in range(len(requests)+1) ]
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            return got
+
+        got = asyncio.run(run())
+        self.maxDiff = None
+        self.assertIn({ "id": None, "error": "invalid request (not JSON)" }, got)
+        self.assertEqual({ r["id"]: r for r in got if r["id"] is not None }, want)
+
+    def test_offload(self):
+        class Writer:
+            def __init__(self):
+                self.lines = []
+            def is_closing(self):
+                return False
+            def write(self, data):
+                self.lines.append(json.loads(data))
+
+        def pid(progress=None):
+            return os.getpid()
+        def fail(progress=None):
+            raise ValueError("boom")
+
+        server, writer = GraphServer(), Writer()
+        for (rid, work) in [(1, pid), (2, fail)]:
+            asyncio.run(server.offload(writer, { "id": rid, "op": "floyd" }, work))
+        self.assertNotEqual(writer.lines[0], { "id": 1, "result": os.getpid() })
+        self.assertEqual(writer.lines[1], { "id": 2, "error": "floyd failed: ValueError: boom" })
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
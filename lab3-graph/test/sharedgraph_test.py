@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import time
+import threading
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList
+from algorithm import dijkstra
+from sharedgraph import RWLock, SharedGraph
+
+class TestSharedGraph(unittest.TestCase):
+    def test_rwlock(self):
+        lock, events = RWLock(), []
+        lock.acquire_read()
+        lock.acquire_read() # readers share the lock
+
+        def writer():
+            with lock.writing():
+                events.append("write")
+        t = threading.Thread(target=writer)
+        t.start()
+        time.sleep(0.05)
+        self.assertEqual(events, []) # blocked by the readers
+        lock.release_read()
+        lock.release_read()
+        t.join(1)
+        self.assertEqual(events, ["write"])
+
+        with lock.writing():
+            t = threading.Thread(target=lambda: lock.acquire_read() or events.append("read"))
+            t.start()
+            time.sleep(0.05)
+            self.assertEqual(events, ["write"]) # blocked by the writer
+        t.join(1)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_concurrent(self):
+        names = [ "n{:02d}".format(i) for i in range(20) ]
+        shared = SharedGraph(AdjacencyList().extend(names))
+        stop, errors = threading.Event(), []
+
+        def writer():
+            for i in range(300):
+                src, dst = names[i % 20], names[(i*7+3) % 20]
+                with shared.batch() as l: # edges always come in pairs
+                    if l.find_edge(src, dst):
+                        l.delete_edge(src, dst)
+                        l.delete_edge(dst, src)
+                    else:
+                        l.add_edge(src, dst, i)
+                        l.add_edge(dst, src, i)
+            stop.set()
+
+        def reader(locked):
+            while not stop.is_set():
+                if locked:
+                    edges = shared.list_edges()
+                    shared.read(dijkstra, names[0])
+                else:
+                    snapshot = shared.snapshot()
+                    edges = snapshot.list_edges()
+                    dijkstra(snapshot, names[0])
+                if set(edges) != set([ (dst, src, w) for (src, dst, w) in edges ]):
+                    errors.append(edges)
+
+        threads = [ threading.Thread(target=reader, args=(i % 2 == 0,)) for i in range(4) ]
+        threads.append(threading.Thread(target=writer))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        self.assertEqual(errors, [])
+        self.assertEqual(shared.edge_cardinality() % 2, 0)
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+import stats
+from adjlist import AdjacencyList, UndirectedAdjacencyList
+from algorithm import dijkstra, prim, floyd
+
+class TestStats(unittest.TestCase):
+    def tearDown(self):
+        stats.enable(False)
+        stats.reset()
+
+    def test_disabled(self):
+        plain = AdjacencyList.add_node
+        stats.enable()
+        self.assertIsNot(AdjacencyList.add_node, plain)
+        stats.enable(False)
+        self.assertIs(AdjacencyList.add_node, plain)
+
+        l = AdjacencyList().add_node("a").add_node("b").add_edge("a", "b", 1)
+        dijkstra(l, "a")
+        self.assertEqual(stats.stats(), { "counts": {}, "timings": {} })
+
+    def test_counts(self):
+        for table in [
+            # name, func, want
+            ("find", lambda l, u: l.find_node("c"), {
+                "list_steps": 2,
+            }),
+            ("dijkstra", lambda l, u: dijkstra(l, "a"), {
+                "heap_pops": 4, "heap_pushes": 4, "edge_relaxations": 3, # c twice
+            }),
+            ("prim", lambda l, u: prim(u, "a"), {
+                "heap_pops": 4, "heap_pushes": 4, "edge_relaxations": 6,
+            }),
+            ("floyd", lambda l, u: floyd(l), {
+                # 3x3 init + 3 edges, then rows a;a,b;a,b,c through k=a,b,c
+                "matrix_cells": 9 + 3 + 6*3,
+            }),
+        ]:
+            name, func, want = table
+            l = AdjacencyList().extend(["a","b","c"], [("a","b",1),("b","c",2),("a","c",5)])
+            u = UndirectedAdjacencyList().extend(["a","b","c"], [("a","b",1),("b","c",2),("a","c",5)])
+            l.adjacency_csr(), u.adjacency_csr() # only count the operation itself
+            stats.reset()
+            stats.enable()
+            func(l, u)
+            stats.enable(False)
+            got = stats.stats()["counts"]
+            self.assertEqual(got, want, "Counted {}".format(name))
+
+    def test_timings(self):
+        stats.enable()
+        l = AdjacencyList().add_node("a").add_node("b")
+        l = l.add_edge("a", "b", 1)
+        dijkstra(l, "a")
+        timings = stats.stats()["timings"]
+        self.assertEqual(timings["AdjacencyList.add_node"]["calls"], 2)
+        self.assertEqual(timings["AdjacencyList.add_edge"]["calls"], 1)
+        self.assertEqual(timings["dijkstra"]["calls"], 1)
+        self.assertTrue(all([ t["seconds"] >= 0 for t in timings.values() ]))
+
+        merged = stats.stats()
+        stats.merge(merged)
+        self.assertEqual(stats.stats()["timings"]["dijkstra"]["calls"], 2)
+        self.assertIn("dijkstra", stats.report())
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList, UndirectedAdjacencyList
+
+class TestSummary(unittest.TestCase):
+    def test_summary(self):
+        for table in [
+            # cls, nodes, edges, want: (nodes, edges, loops, degrees, density)
+            (AdjacencyList, [], [], ([], 0, 0, {}, 0.0)),
+            (AdjacencyList, ["a"], [], (["a"], 0, 0, {0:1}, 0.0)),
+            (AdjacencyList, ["a","b","c"], [("a","a",1),("a","b",2),("b","a",3),("c","a",4)],
+                (["a","b","c"], 4, 1, {1:2, 2:1}, 4/9)),
+            (UndirectedAdjacencyList, ["a","b","c"], [("a","a",1),("b","a",2),("a","c",4)],
+                (["a","b","c"], 3, 1, {1:2, 3:1}, 3/6)),
+            (UndirectedAdjacencyList, ["a","b"], [("b","a",2)],
+                (["a","b"], 1, 0, {1:2}, 1/3)),
+        ]:
+            cls, nodes, edges, want = table
+            l = cls().extend(nodes, edges)
+            s = l.summary()
+            got = (s.get_nodes(), s.get_edge_cardinality(), s.get_self_loops(),
+                   s.get_degrees(), s.get_density())
+            self.assertEqual(got, want, "{} {} {}".format(cls.__name__, nodes, edges))
+            self.assertEqual(s.get_node_cardinality(), l.node_cardinality())
+            self.assertEqual(s.get_edge_cardinality(), l.edge_cardinality())
+            self.assertEqual(s.get_self_loops(), l.self_loops())
+
+    def test_summary_cached(self):
+        l = AdjacencyList().extend(["a","b"], [("a","b",1)])
+        s = l.summary()
+        self.assertIs(l.summary(), s)
+        l = l.add_edge("b", "a", 1)
+        self.assertIsNot(l.summary(), s)
+        self.assertEqual(l.summary().get_edge_cardinality(), 2)
+        self.assertEqual(s.get_edge_cardinality(), 1)
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
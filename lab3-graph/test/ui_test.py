@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import io
+import unittest
+import tempfile
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from ui import TerminalUI
+from cache import ResultCache
+
+class TestTerminalUI(unittest.TestCase):
+    def test_script(self):
+        for table in [
+            # mode, script, want
+            ("directed", "a\nx\na\ny\nb\nx\ny\n7\nf\nx\ng\ny\nx\nq\n", [
+                "\tNode x is a member",
+                "\tEdge (y,x) is a non-member",
+            ]),
+            ("directed", "z\nf\nx\nP\n", [
+                "error> invalid choice",
+                "\tNode x is a non-member",
+                "error> invalid graph mode",
+            ]),
+            ("undirected", "a\nx\r\na\ny\r\nb\nx\ny\n7\ng\ny\nx\nq\n", [
+                "\tEdge (y,x) is a member",
+            ]),
+        ]:
+            mode, script, want = table
+            out = io.StringIO()
+            ui = TerminalUI(mode, script=io.StringIO(script), out=out)
+            try:
+                ui.run()
+            except EOFError:
+                pass
+            got = out.getvalue().splitlines()
+            self.assertEqual(got, want, "Script {!r} in {} mode".format(script, mode))
+
+    def test_names(self):
+        script = "a\nalpha\na\nbeta-long-name\nb\nalpha\nbeta-long-name\n42\nv\n" \
+                 "a\ntwo words\nf\nbeta-long-name\n"
+        want = [
+            "",
+            "               |     alpha       beta-long-name ",
+            "---------------+--------------------------------",
+            "          alpha|       *               42       ",
+            " beta-long-name|       *               *        ",
+            "",
+            "node cardinality: 2",
+            "edge cardinality: 1",
+            "self-loops: 0",
+            "density: 0.250",
+            "out-degrees: 0:1 1:1",
+            "",
+            "error> invalid input (node names cannot contain whitespace)",
+            "\tNode beta-long-name is a member",
+        ]
+        out = io.StringIO()
+        ui = TerminalUI(script=io.StringIO(script), out=out)
+        with self.assertRaises(EOFError):
+            ui.run()
+        self.assertEqual(out.getvalue().splitlines(), want)
+
+    def test_cached_results(self):
+        script = "a\na\na\nb\nb\na\nb\n3\n"
+        for table in [
+            # command, matrix as displayed
+            ("F", [ "    |  a    b  ", "   a|  0    3  ", "   b|  *    0  " ]),
+            ("W", [ "    |  a    b  ", "   a|  1    1  ", "   b|  0    1  " ]),
+        ]:
+            command, want = table
+            hits = []
+            class Recording(ResultCache):
+                def get(self, algorithm, key):
+                    matrix = super().get(algorithm, key)
+                    if matrix is not None:
+                        hits.append(matrix)
+                    return matrix
+
+            with tempfile.TemporaryDirectory() as tmp:
+                out = io.StringIO()
+                ui = TerminalUI(script=io.StringIO(script + (command + "\n")*2 + "q\n"),
+                                out=out, results=Recording(tmp))
+                ui.run()
+            got = [ line for line in out.getvalue().splitlines() if "|" in line ]
+            self.assertEqual(got, want*2, "Ran {} twice".format(command))
+            self.assertEqual(len(hits), 1, "Ran {} twice".format(command))
+            self.assertTrue(hits[0]._mmap.closed, "Ran {} twice".format(command))
+
+    def test_window(self):
+        script = "".join([ "a\n{}\n".format(c) for c in "abcdef" ])
+        for table in [
+            # threshold, commands, want
+            (3, "W\n", [
+                "    |  a    b    c  ",
+                "\tshowing nodes a..c of 6, select w to move the window",
+            ]),
+            (3, "w\n3\ne\nW\n", [
+                "    |  d    e    f  ",
+                "\tshowing nodes d..f of 6, select w to move the window",
+            ]),
+            (3, "w\n2\nc\nW\n", [
+                "    |  b    c  ",
+                "\tshowing nodes b..c of 6, select w to move the window",
+            ]),
+            (3, "w\n0\nW\n", [
+                "    |  a    b    c    d    e    f  ",
+            ]),
+            (32, "w\n-1\n", [
+                "error> invalid input (window size must be non-negative)",
+            ]),
+        ]:
+            threshold, commands, want = table
+            out = io.StringIO()
+            ui = TerminalUI(script=io.StringIO(script + commands), out=out,
+                            sparse_threshold=threshold)
+            try:
+                ui.run()
+            except EOFError:
+                pass
+            got = [ line for line in out.getvalue().splitlines()
+                    if line.startswith(("    |", "error>", "\tshowing")) ]
+            self.assertEqual(got, want, "Commands {!r}".format(commands))
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+import time
+import unittest
+
+current_path = os.path.dirname(__file__)
+src_path = os.path.abspath(os.path.join(current_path, "../src"))
+sys.path.insert(0, src_path)
+
+from adjlist import AdjacencyList
+from algorithm import floyd
+import worker
+
+def count(n, progress=None):
+    for k in range(n):
+        progress(k, n)
+    return n
+
+def sleep(seconds, progress=None):
+    time.sleep(seconds)
+    return seconds
+
+def fail(msg, progress=None):
+    raise ValueError(msg)
+
+class TestWorker(unittest.TestCase):
+    def test_run(self):
+        for table in [
+            (count, (3,), None, (3, None), [(0,3),(1,3),(2,3)]),
+            (sleep, (0,), None, (0, None), []),
+            (sleep, (10,), 0.2, (None, "time budget of 0.2s exceeded"), []),
+            (fail, ("oops",), None, (None, "ValueError: oops"), []),
+        ]:
+            func, args, budget, want, want_progress = table
+            got_progress = []
+            got = worker.run(func, args, budget, lambda k, n: got_progress.append((k, n)))
+            self.assertEqual(got, want, "Ran {}{}".format(func.__name__, args))
+            self.assertEqual(got_progress, want_progress, "Ran {}{}".format(func.__name__, args))
+
+    def test_run_floyd(self):
+        l = AdjacencyList().add_node("a").add_node("b").add_node("c")
+        l = l.add_edge("a", "b", 1).add_edge("b", "c", 2)
+        self.assertEqual(worker.run(floyd, (l,)), (floyd(l), None))
+
+if __name__ == "__main__":
+    try:
+        sys.exit(unittest.main())
+    except KeyboardInterrupt:
+        print("")
+        sys.exit(1)